@@ -1,22 +1,58 @@
 from contextlib import asynccontextmanager
 import asyncio
 import logging
+import os
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from knowledge_based.website.routes.route import router as website_router
 from db.supabase.connectDB import init_db
 from knowledge_based.pdf.router.router import router as pdf_router
 from rpc.server import serve as grpc_serve, stop as grpc_stop
+from knowledge_based.pdf.embedding.extract import shutdown_pool as shutdown_pdf_extract_pool
+from knowledge_based.executors import cpu_executor, browser_executor
+from knowledge_based.jobs.jobs import job_queue
+from knowledge_based.jobs.router import router as jobs_router
+from knowledge_based.search.router import router as search_router
+from knowledge_based.website.crawl.crawl import browser_pool
+from db.qdrant.qdrant_client import ensure_collection
+from db.qdrant.connectDB import async_client as qdrant_async_client
+from knowledge_based.embedding.engine import (
+    engine as embedding_engine,
+    models as embedding_models,
+    warm_up as warm_up_embedding_model,
+)
+from knowledge_based.embedding.cache import cache as embedding_cache
 
 logger = logging.getLogger(__name__)
 
+# Only large bodies (embedding dumps, big crawls) are worth the CPU of compressing.
+RESPONSE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", "65536"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
-
     loop = asyncio.get_running_loop()
+    if embedding_engine.workers:
+        # Embedding workers are forked from this process, so they start first, before the Qdrant
+        # bootstrap opens gRPC channels and before the gRPC server; this waits for the model load.
+        await loop.run_in_executor(None, embedding_engine.start_workers)
+    try:
+        schema = await loop.run_in_executor(None, ensure_collection)
+        logger.info("Qdrant collection ready: %s", schema)
+    except Exception as e:
+        # Requests retry the bootstrap on first use, so a Qdrant outage does not block startup.
+        logger.exception("Qdrant collection bootstrap failed: %s", e)
+    # Load and warm the embedding model in the background; /ready reports 503 until it is done.
+    loop.run_in_executor(None, warm_up_embedding_model)
+    job_queue.start()
+
+    # Pre-warm browsers in the background so startup is not blocked on Chromium.
+    loop.run_in_executor(None, browser_pool.warm)
     try:
         grpc_server = await loop.run_in_executor(None, grpc_serve)
         logger.info("gRPC server started on port 50051 alongside agent-core")
@@ -29,6 +65,14 @@ async def lifespan(app: FastAPI):
     await loop.run_in_executor(None, grpc_stop, grpc_server)
     logger.info("gRPC server stopped")
 
+    job_queue.stop()
+    await loop.run_in_executor(None, browser_pool.close)
+    shutdown_pdf_extract_pool()
+    cpu_executor.shutdown()
+    embedding_engine.shutdown_workers()
+    browser_executor.shutdown()
+    await qdrant_async_client.close()
+
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
@@ -38,6 +82,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_GZIP_MIN_BYTES, compresslevel=RESPONSE_GZIP_LEVEL)
 
 
 @app.get("/")
@@ -45,5 +90,20 @@ def read_root():
     return {"message": "yep agent-core server running boi :)"}
 
 
+@app.get("/ready")
+def readiness():
+    status = embedding_models.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/embedding/cache")
+def embedding_cache_stats():
+    if embedding_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **embedding_cache.stats()}
+
+
 app.include_router(website_router, prefix="/website")
-app.include_router(pdf_router, prefix="/pdf")
\ No newline at end of file
+app.include_router(pdf_router, prefix="/pdf")
+app.include_router(jobs_router, prefix="/jobs")
+app.include_router(search_router, prefix="/search")
\ No newline at end of file
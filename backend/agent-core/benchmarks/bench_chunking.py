@@ -0,0 +1,59 @@
+# Chunking throughput on multi-MB texts: the old whitespace word windows (500 words, 50 overlap)
+# vs the tokenizer-aware chunker, plus how many tokens each feeds past the model window.
+# Usage: python -m benchmarks.bench_chunking [--mb 1 4 8] [--page-chars 3000] [--repeat 3]
+import argparse
+import time
+
+from benchmarks.synthetic import make_document
+from knowledge_based.embedding.chunking import chunk_pages, count_tokens, model_max_tokens
+
+
+def word_windows(text: str, chunk_size: int = 500, overlap: int = 50):
+    words = text.split()
+    return [" ".join(words[i:i + chunk_size]) for i in range(0, len(words), chunk_size - overlap)]
+
+
+def token_chunks(pages: list):
+    return [chunk["text"] for chunk in chunk_pages(pages)]
+
+
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--page-chars", type=int, default=3000, help="page size for the paged (PDF-like) run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    window = model_max_tokens()
+    print(f"model window: {window} tokens (excluding [CLS]/[SEP])")
+    print(f"{'MB':>5} {'chunker':>14} {'MB/s':>8} {'chunks':>7} {'max tok':>8} {'over window':>12} {'tokens lost':>12}")
+    for mb in args.mb:
+        text = make_document(int(mb * 2**20))
+        pages = [text[i:i + args.page_chars] for i in range(0, len(text), args.page_chars)]
+        runs = {
+            "word-500": lambda: word_windows(text),
+            "token/single": lambda: token_chunks([text]),
+            "token/paged": lambda: token_chunks(pages),
+        }
+        for name, fn in runs.items():
+            seconds, chunks = timed(fn, args.repeat)
+            tokens = [count_tokens(chunk) for chunk in chunks]
+            over = sum(count > window for count in tokens)
+            lost = sum(max(0, count - window) for count in tokens)
+            print(
+                f"{mb:>5g} {name:>14} {mb / seconds:>8.2f} {len(chunks):>7} {max(tokens):>8} "
+                f"{over / len(chunks):>11.0%} {lost / sum(tokens):>11.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Pages per second for the static HTTP fetch path vs the headless browser, against a local site.
+# Usage: python -m benchmarks.bench_crawl_modes [--pages 40] [--concurrency 1 4] [--modes static browser]
+import argparse
+import time
+
+from benchmarks.site_server import SyntheticSite
+from knowledge_based.website.crawl.crawl import browser_pool, crawl_website
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--modes", nargs="+", default=["static", "browser"])
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'concurrency':>12} {'pages':>6} {'seconds':>9} {'pages/s':>9}")
+    with SyntheticSite(args.pages) as site:
+        for mode in args.modes:
+            if mode == "browser":
+                try:
+                    with browser_pool.lease():
+                        pass
+                    browser_pool.warm(max(args.concurrency))
+                except Exception as e:
+                    print(f"browser mode skipped: {e}")
+                    continue
+            for concurrency in args.concurrency:
+                start = time.perf_counter()
+                results = crawl_website(site.url, max_pages=args.pages, max_depth=10, concurrency=concurrency, mode=mode)
+                elapsed = time.perf_counter() - start
+                print(f"{mode:>8} {concurrency:>12} {len(results):>6} {elapsed:>9.3f} {len(results) / max(elapsed, 1e-9):>9.1f}")
+    browser_pool.close()
+
+
+if __name__ == "__main__":
+    main()
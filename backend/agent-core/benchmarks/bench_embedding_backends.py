@@ -0,0 +1,101 @@
+# Parity and throughput of the embedding backends: PyTorch vs the int8 ONNX Runtime export.
+# Parity: per-chunk cosine between the two backends' vectors and top-k neighbour agreement on the
+# same corpus; the script exits non-zero when the minimum cosine is below --min-cosine, so it can
+# gate switching EMBED_BACKEND. Throughput: chunks/s per backend and intra-op thread count.
+# The onnx backend needs optimum-onnx, installed separately (uv pip install "optimum-onnx[onnxruntime]").
+# Usage: python -m benchmarks.bench_embedding_backends [--chunks 1024] [--threads 1 2 4] [--min-cosine 0.98]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_document
+from knowledge_based.embedding.engine import load_model, model_id, onnx_quantized_file
+
+
+def make_chunks(count: int, words: int = 180):
+    # Sentence-structured text cut to roughly one model window per chunk.
+    text = make_document(count * words * 8, seed=7).split()
+    return [" ".join(text[i:i + words]) for i in range(0, count * words, words)]
+
+
+def encode(model, texts, batch_size: int):
+    return model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+
+def neighbours(vectors, k: int):
+    scores = vectors @ vectors.T
+    np.fill_diagonal(scores, -np.inf)
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def parity(reference, candidate, k: int) -> dict:
+    cosine = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    ref_nn, cand_nn = neighbours(reference, k), neighbours(candidate, k)
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_nn, cand_nn)])
+    return {
+        "min": float(cosine.min()),
+        "p01": float(np.percentile(cosine, 1)),
+        "mean": float(cosine.mean()),
+        "topk_overlap": float(overlap),
+        "max_abs_norm_diff": float(np.abs(np.linalg.norm(candidate, axis=1) - 1).max()),
+    }
+
+
+def throughput(model, texts, batch_size: int, repeat: int) -> float:
+    encode(model, texts[:batch_size], batch_size)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(model, texts, batch_size)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--onnx-file", default="", help=f"defaults to {onnx_quantized_file()} on this CPU")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = make_chunks(args.chunks)
+    print(f"{len(texts)} chunks, batch size {args.batch_size}")
+
+    torch_model = load_model("torch")
+    onnx_model = load_model("onnx", onnx_file=args.onnx_file)
+    reference = encode(torch_model, texts, args.batch_size)
+    candidate = encode(onnx_model, texts, args.batch_size)
+    if reference.shape != candidate.shape:
+        print(f"shape mismatch: torch {reference.shape} vs onnx {candidate.shape}")
+        sys.exit(1)
+    result = parity(reference, candidate, args.k)
+    print(f"parity torch vs {model_id('onnx', args.onnx_file)}:")
+    print(
+        f"  cosine min {result['min']:.4f}  p01 {result['p01']:.4f}  mean {result['mean']:.4f}  "
+        f"top-{args.k} overlap {result['topk_overlap']:.3f}  max |norm-1| {result['max_abs_norm_diff']:.1e}"
+    )
+
+    print(f"{'backend':>8} {'threads':>8} {'chunks/s':>10}")
+    for threads in args.threads:
+        for backend in ("torch", "onnx"):
+            model = load_model(backend, threads, args.onnx_file)
+            rate = throughput(model, texts, args.batch_size, args.repeat)
+            print(f"{backend:>8} {threads:>8} {rate:>10.1f}")
+
+    if result["min"] < args.min_cosine:
+        print(f"FAIL: minimum cosine {result['min']:.4f} < {args.min_cosine}")
+        sys.exit(1)
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Body size and serialization time of the /pdf/embedding and /website/embedding response formats for
+# a large document, before and after gzip, including the old dict -> jsonable_encoder path.
+# Usage: python -m benchmarks.bench_embedding_transport [--chunks 2000 10000] [--dim 384]
+import argparse
+import gzip
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.synthetic import make_text
+from knowledge_based.embedding.transport import embedding_options, embedding_response, ndjson_lines
+
+VARIANTS = [
+    ("json list", {"format": "json"}),
+    ("json base64 f16", {"format": "json", "vectors": "base64", "dtype": "float16"}),
+    ("json no vectors", {"format": "json", "vectors": "none"}),
+    ("ndjson list", {"format": "ndjson"}),
+    ("msgpack f32", {"format": "msgpack"}),
+    ("msgpack f16", {"format": "msgpack", "dtype": "float16"}),
+    ("raw f32", {"format": "raw"}),
+    ("raw f16", {"format": "raw", "dtype": "float16"}),
+]
+
+
+def legacy_body(meta: dict, chunks: list, embeddings) -> bytes:
+    # What the endpoints did before: a dict of Python float lists through FastAPI's encoder.
+    content = {**meta, "chunks": chunks, "embeddings": embeddings.tolist(), "total_chunks": len(chunks)}
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def render(meta: dict, chunks: list, embeddings, options: dict) -> bytes:
+    if options["format"] == "ndjson":
+        return "".join(ndjson_lines(meta, [(chunks, embeddings)], options)).encode()
+    return embedding_response(meta, chunks, embeddings, options).body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--gzip-level", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    meta = {"status": "success", "message": "PDF embedded successfully", "pdf_id": "0" * 64}
+    print(f"{'chunks':>7} {'format':>16} {'MB':>8} {'gzip MB':>8} {'encode ms':>10} {'gzip ms':>8}")
+    for count in args.chunks:
+        embeddings = rng.standard_normal((count, args.dim), dtype=np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        chunks = [make_text(180, seed) for seed in range(count)]
+        variants = [("legacy dict", None)] + VARIANTS
+        for name, params in variants:
+            start = time.perf_counter()
+            if params is None:
+                body = legacy_body(meta, chunks, embeddings)
+            else:
+                body = render(meta, chunks, embeddings, embedding_options(**params))
+            encoded = time.perf_counter()
+            compressed = gzip.compress(body, compresslevel=args.gzip_level)
+            zipped = time.perf_counter()
+            print(
+                f"{count:>7} {name:>16} {len(body) / 2**20:>8.2f} {len(compressed) / 2**20:>8.2f} "
+                f"{(encoded - start) * 1000:>10.1f} {(zipped - encoded) * 1000:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Embedding throughput as EMBED_WORKERS grows: concurrent clients push chunks through the batching
+# engine, encoded in-process (0) or by forked worker processes pinned to their own cores. Also
+# reports how much of the workers' memory is shared with the parent (Rss vs Pss from smaps_rollup),
+# i.e. whether the model weights stayed copy-on-write instead of being duplicated per worker.
+# Usage: python -m benchmarks.bench_embedding_workers [--workers 0 1 2 4] [--chunks 2048] [--clients 8]
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.bench_embedding_backends import make_chunks
+from knowledge_based.embedding.engine import EMBED_BACKEND, EmbeddingEngine, load_model
+
+
+def memory_mb(pid: int) -> dict:
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        pass
+    return values
+
+
+def run_clients(engine, texts, clients: int, request_size: int) -> float:
+    requests = [texts[i:i + request_size] for i in range(0, len(texts), request_size)]
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                if not requests:
+                    return
+                request = requests.pop()
+            engine.encode(request)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({0, 1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads per worker, 0 = cores per worker")
+    parser.add_argument("--backend", default=EMBED_BACKEND, choices=["torch", "onnx"])
+    parser.add_argument("--chunks", type=int, default=2048)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--request-size", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = make_chunks(args.chunks)
+    print(f"{len(texts)} chunks, {args.clients} clients x {args.request_size} chunks, {os.cpu_count()} cpus, {args.backend}")
+    print(f"{'workers':>8} {'chunks/s':>10} {'speedup':>8} {'rss MB':>8} {'pss MB':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        # A fresh model per run: the workers must fork from a parent that has not run a forward pass.
+        model = load_model(args.backend, args.threads)
+        reload = (lambda threads: load_model("onnx", threads)) if args.backend == "onnx" else None
+        engine = EmbeddingEngine(
+            lambda: model, batch_size=args.batch_size, workers=workers,
+            worker_threads=args.threads, reload_in_worker=reload,
+        )
+        engine.encode(texts[:args.batch_size * max(1, workers)])
+        rate = run_clients(engine, texts, args.clients, args.request_size)
+        baseline = baseline or rate
+
+        pids = [os.getpid()] + (list(engine._pool._executor._processes) if engine._pool else [])
+        usage = [memory_mb(pid) for pid in pids]
+        rss = sum(u.get("Rss", 0) for u in usage)
+        pss = sum(u.get("Pss", 0) for u in usage)
+        print(f"{workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x {rss:>8.0f} {pss:>8.0f}")
+        engine.shutdown_workers()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Serial vs process-pool PDF text extraction on synthetic multi-hundred-page PDFs.
+# Usage: python -m benchmarks.bench_pdf_extract [--pages 300 500] [--workers 1 2 4 8]
+import argparse
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+from benchmarks.synthetic import make_pdf
+from knowledge_based.pdf.embedding.extract import iter_pdf_pages_parallel, iter_pdf_pages_serial
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[200, 500])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"cpu_count={os.cpu_count()}")
+    print(f"{'pages':>6} {'mode':>10} {'workers':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+
+    for pages in args.pages:
+        pdf_bytes = make_pdf(pages)
+        serial = timed(lambda: list(iter_pdf_pages_serial(PdfReader(io.BytesIO(pdf_bytes)))), args.repeat)
+        print(f"{pages:>6} {'serial':>10} {1:>8} {serial:>9.3f} {pages / serial:>9.1f} {1.0:>8.2f}")
+
+        for workers in args.workers:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Warm the workers so interpreter start-up is not counted.
+                list(pool.map(abs, range(workers)))
+                elapsed = timed(
+                    lambda: list(iter_pdf_pages_parallel(pdf_bytes, pages, pool, args.pages_per_task)), args.repeat
+                )
+            print(f"{pages:>6} {'parallel':>10} {workers:>8} {elapsed:>9.3f} {pages / elapsed:>9.1f} {serial / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
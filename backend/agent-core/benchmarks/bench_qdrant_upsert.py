@@ -0,0 +1,81 @@
+# Single-request upsert vs BulkWriter (batched, parallel, wait only on the last batch)
+# against Qdrant's local in-process mode. Pass --url to run against a real server instead.
+# Usage: python -m benchmarks.bench_qdrant_upsert [--points 20000] [--batch-sizes 128 512] [--concurrency 1 4]
+import argparse
+import threading
+import time
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from db.qdrant.bulk_writer import BulkWriter
+
+COLLECTION = "bench_upsert"
+
+
+def make_points(count: int, dim: int):
+    vectors = np.random.default_rng(0).standard_normal((count, dim), dtype=np.float32)
+    return [
+        PointStruct(
+            id=str(uuid4()),
+            vector=vector.tolist(),
+            payload={"user_id": "bench", "source_id": "bench", "chunk_index": i, "text": "x" * 400},
+        )
+        for i, vector in enumerate(vectors)
+    ]
+
+
+class SerializedClient:
+    # The local in-process client is not thread-safe, so parallel batches are funnelled through a lock.
+    # Against a real server (--url) the writer talks to the client directly.
+    def __init__(self, client: QdrantClient):
+        self.client = client
+        self.lock = threading.Lock()
+
+    def upsert(self, **kwargs):
+        with self.lock:
+            return self.client.upsert(**kwargs)
+
+
+def reset(client: QdrantClient, dim: int):
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(COLLECTION, vectors_config=VectorParams(size=dim, distance=Distance.COSINE))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[128, 256, 1024])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(":memory:")
+    points = make_points(args.points, args.dim)
+
+    print(f"{'mode':>10} {'batch':>6} {'conc':>5} {'seconds':>9} {'points/s':>10}")
+
+    reset(client, args.dim)
+    start = time.perf_counter()
+    client.upsert(collection_name=COLLECTION, points=points, wait=True)
+    elapsed = time.perf_counter() - start
+    print(f"{'single':>10} {args.points:>6} {1:>5} {elapsed:>9.3f} {args.points / elapsed:>10.0f}")
+
+    for batch_size in args.batch_sizes:
+        for concurrency in args.concurrency:
+            reset(client, args.dim)
+            target = client if args.url else SerializedClient(client)
+            writer = BulkWriter(target, COLLECTION, batch_size=batch_size, concurrency=concurrency)
+            start = time.perf_counter()
+            result = writer.write(iter(points))
+            elapsed = time.perf_counter() - start
+            assert client.count(COLLECTION).count == result["points_upserted"] == args.points
+            print(f"{'bulk':>10} {batch_size:>6} {concurrency:>5} {elapsed:>9.3f} {args.points / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# Recall@k and query latency of the Qdrant storage profiles (memory / scalar int8 / binary) on a
+# synthetic clustered corpus, against exact float32 search as ground truth.
+# With --url each profile gets its own collection on a real server. Qdrant's local mode ignores
+# quantization, so without --url the quantized scoring + oversampled rescoring is emulated in numpy.
+# Usage: python -m benchmarks.bench_storage_profiles [--points 20000] [--queries 200] [--url http://localhost:6333]
+import argparse
+import time
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import CollectionStatus, PointStruct
+
+from db.qdrant.bulk_writer import BulkWriter
+from db.qdrant.schema import (
+    STORAGE_PROFILES,
+    QDRANT_SCALAR_QUANTILE,
+    hnsw_config,
+    quantization_config,
+    search_params,
+    storage_profile,
+    vectors_config,
+)
+
+
+def make_corpus(points: int, queries: int, dim: int, clusters: int = 64, seed: int = 0):
+    # Embeddings of real text cluster by topic; uniform noise would make every profile look worse.
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, points)
+    corpus = centers[labels] + 0.6 * rng.standard_normal((points, dim), dtype=np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    picks = rng.integers(0, points, queries)
+    query = corpus[picks] + 0.3 * rng.standard_normal((queries, dim), dtype=np.float32)
+    query /= np.linalg.norm(query, axis=1, keepdims=True)
+    return corpus, query
+
+
+def exact_top_k(corpus, query, k: int):
+    scores = query @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall(found, truth) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def ram_bytes_per_vector(profile: dict, dim: int) -> int:
+    if profile["quantization"] == "int8":
+        return dim
+    if profile["quantization"] == "binary":
+        return dim // 8
+    return dim * 4
+
+
+class Emulated:
+    # Mirrors what Qdrant does: score candidates on the quantized vectors, take limit * oversampling,
+    # then rescore those candidates with the original float32 vectors.
+    def __init__(self, corpus, profile: dict):
+        self.corpus = corpus
+        self.profile = profile
+        if profile["quantization"] == "int8":
+            low, high = np.quantile(corpus, [1 - QDRANT_SCALAR_QUANTILE, QDRANT_SCALAR_QUANTILE])
+            scale = (high - low) / 255
+            codes = np.clip(np.round((corpus - low) / scale), 0, 255).astype(np.uint8)
+            # Keep the int8 rounding error but score in float so latency tracks the memory profile.
+            self.dequantized = codes.astype(np.float32) * scale + low
+        elif profile["quantization"] == "binary":
+            self.bits = np.packbits(corpus > 0, axis=1)
+
+    def search(self, q, k: int):
+        if self.profile["quantization"] is None:
+            return np.argsort(-(self.corpus @ q))[:k]
+        candidates = int(k * self.profile["oversampling"])
+        if self.profile["quantization"] == "int8":
+            approx = self.dequantized @ q
+        else:
+            q_bits = np.packbits(q > 0)
+            approx = -np.unpackbits(self.bits ^ q_bits, axis=1).sum(axis=1)
+        shortlist = np.argpartition(-approx, candidates)[:candidates]
+        rescored = self.corpus[shortlist] @ q
+        return shortlist[np.argsort(-rescored)[:k]]
+
+
+def run_emulated(corpus, queries, k: int, profile: dict):
+    index = Emulated(corpus, profile)
+    found, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        found.append(index.search(q, k))
+        latencies.append(time.perf_counter() - start)
+    return found, latencies
+
+
+def run_server(client: QdrantClient, corpus, queries, k: int, profile: dict, hnsw_ef: int):
+    collection = f"bench_storage_{profile['name']}"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    client.create_collection(
+        collection_name=collection,
+        vectors_config=vectors_config(profile),
+        hnsw_config=hnsw_config(),
+        quantization_config=quantization_config(profile),
+        on_disk_payload=profile["payload_on_disk"],
+    )
+    ids = [str(uuid4()) for _ in range(len(corpus))]
+    points = (
+        PointStruct(id=pid, vector=vector.tolist(), payload={"i": i, "text": "x" * 400})
+        for i, (pid, vector) in enumerate(zip(ids, corpus))
+    )
+    BulkWriter(client, collection).write(points)
+    while client.get_collection(collection).status != CollectionStatus.GREEN:
+        time.sleep(1)
+
+    params = search_params(hnsw_ef, profile)
+    found, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        hits = client.query_points(collection, query=q.tolist(), limit=k, search_params=params, with_payload=["i"]).points
+        latencies.append(time.perf_counter() - start)
+        found.append([hit.payload["i"] for hit in hits])
+    client.delete_collection(collection)
+    return found, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, default=128)
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    parser.add_argument("--oversampling", type=float, default=None, help="override the profile oversampling")
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    corpus, queries = make_corpus(args.points, args.queries, args.dim)
+    truth = exact_top_k(corpus, queries, args.k)
+    client = QdrantClient(url=args.url) if args.url else None
+
+    mode = "server" if client else "emulated: numpy brute force, latency is not Qdrant's"
+    print(f"{args.points} points x {args.dim} dims, {args.queries} queries, recall@{args.k} ({mode})")
+    print(f"{'profile':>8} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'RAM MB / 1M vectors':>20}")
+    for name in args.profiles:
+        profile = storage_profile(name)
+        if args.oversampling and profile["quantization"] is not None:
+            profile["oversampling"] = args.oversampling
+        if client:
+            found, latencies = run_server(client, corpus, queries, args.k, profile, args.hnsw_ef)
+        else:
+            found, latencies = run_emulated(corpus, queries, args.k, profile)
+        latencies_ms = np.array(latencies) * 1000
+        ram_mb = ram_bytes_per_vector(profile, args.dim) * 1_000_000 / 2**20
+        print(
+            f"{name:>8} {recall(found, truth):>7.3f} {np.percentile(latencies_ms, 50):>8.2f} "
+            f"{np.percentile(latencies_ms, 95):>8.2f} {ram_mb:>20.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Filtered (per-user) search latency as the number of tenants sharing the collection grows,
+# comparing the shared layout (global HNSW, plain user_id index) with the tenant layout
+# (is_tenant user_id index, m=0 / payload_m per-tenant graphs).
+# Layouts only differ on a real server (--url); Qdrant's local mode ignores HNSW and index settings
+# and scans, so without --url the numbers show the unpartitioned baseline for both.
+# Usage: python -m benchmarks.bench_tenant_search [--tenants 10 50 200] [--points-per-tenant 100] [--url http://localhost:6333]
+import argparse
+import time
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    CollectionStatus,
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PayloadSchemaType,
+    PointStruct,
+    VectorParams,
+)
+
+from benchmarks.bench_storage_profiles import make_corpus
+from db.qdrant.bulk_writer import BulkWriter
+from db.qdrant.schema import PAYLOAD_INDEXES, hnsw_config
+
+COLLECTION = "bench_tenants"
+LAYOUTS = {
+    "shared": {"hnsw": hnsw_config(tenant=False), "user_index": PayloadSchemaType.KEYWORD},
+    "tenant": {"hnsw": hnsw_config(tenant=True), "user_index": PAYLOAD_INDEXES["user_id"]},
+}
+
+
+def load(client: QdrantClient, layout: dict, corpus, tenants: int, concurrency: int):
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        COLLECTION,
+        vectors_config=VectorParams(size=corpus.shape[1], distance=Distance.COSINE),
+        hnsw_config=layout["hnsw"],
+    )
+    client.create_payload_index(COLLECTION, "user_id", field_schema=layout["user_index"], wait=True)
+    points = (
+        PointStruct(id=str(uuid4()), vector=vector.tolist(), payload={"user_id": f"user-{i % tenants}", "text": "x" * 200})
+        for i, vector in enumerate(corpus)
+    )
+    BulkWriter(client, COLLECTION, concurrency=concurrency).write(points)
+    while client.get_collection(COLLECTION).status != CollectionStatus.GREEN:
+        time.sleep(1)
+
+
+def run_queries(client: QdrantClient, queries, tenants: int, k: int, hnsw_ef: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    latencies = []
+    for q in queries:
+        user_id = f"user-{rng.integers(0, tenants)}"
+        start = time.perf_counter()
+        client.query_points(
+            COLLECTION,
+            query=q.tolist(),
+            query_filter=Filter(must=[FieldCondition(key="user_id", match=MatchValue(value=user_id))]),
+            limit=k,
+            search_params={"hnsw_ef": hnsw_ef},
+            with_payload=False,
+        )
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenants", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--points-per-tenant", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--hnsw-ef", type=int, default=64)
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS), choices=list(LAYOUTS))
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(":memory:")
+    # The local in-process client is not thread-safe, so load it with a single writer.
+    concurrency = 4 if args.url else 1
+    if not args.url:
+        print("local mode: HNSW/index settings are ignored, both layouts scan; pass --url to compare them")
+
+    print(f"{'tenants':>8} {'points':>8} {'layout':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for tenants in args.tenants:
+        corpus, queries = make_corpus(tenants * args.points_per_tenant, args.queries, args.dim)
+        for name in args.layouts:
+            load(client, LAYOUTS[name], corpus, tenants, concurrency)
+            latencies = run_queries(client, queries, tenants, args.k, args.hnsw_ef)
+            print(
+                f"{tenants:>8} {len(corpus):>8} {name:>7} {np.percentile(latencies, 50):>8.2f} "
+                f"{np.percentile(latencies, 95):>8.2f} {np.percentile(latencies, 99):>8.2f}"
+            )
+    client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
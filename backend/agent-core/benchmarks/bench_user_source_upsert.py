@@ -0,0 +1,91 @@
+# user_sources upsert cost: the old SELECT + INSERT/UPDATE + refresh path against the single
+# INSERT ... ON CONFLICT statement, as statements per call and upserts/s from concurrent clients
+# sharing the engine's pool (DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_PRE_PING apply).
+# Runs against a throwaway SQLite file by default; pass --url for a local Postgres. The table is
+# dropped and recreated, so never point it at a real database.
+# Usage: python -m benchmarks.bench_user_source_upsert [--url postgresql://localhost/bench] [--sources 500] [--clients 1 4 8]
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from db.supabase.connectDB import engine_options
+from db.supabase.crud import create_user_source, get_user_source, upsert_user_source
+from db.supabase.models.userModel import UserSource
+
+
+def upsert_select_first(db, user_id: str, source_id: str, source_title: str, source_type: str = "pdf"):
+    # The previous implementation, kept here as the baseline.
+    existing = get_user_source(db, user_id, source_id, source_title)
+    if existing:
+        existing.updated_at = datetime.utcnow()
+        db.commit()
+        db.refresh(existing)
+        return existing, False
+    return create_user_source(db, user_id, source_id, source_title, source_type), True
+
+
+def run(session_factory, upsert, keys: list, clients: int) -> float:
+    pending = list(keys)
+    lock = threading.Lock()
+
+    def client():
+        db = session_factory()
+        try:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    user_id, source_id = pending.pop()
+                upsert(db, user_id, source_id, f"title {source_id}", "pdf")[0].id
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(keys) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="")
+    parser.add_argument("--sources", type=int, default=500)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url, **engine_options(url))
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *event_args: statements.append(1))
+    keys = [(f"user-{i % args.users}", f"source-{i}") for i in range(args.sources)]
+    print(f"{engine.dialect.name}, {len(keys)} sources over {args.users} users")
+    print(f"{'path':>14} {'clients':>8} {'insert/s':>10} {'update/s':>10} {'stmts/call':>11}")
+
+    for name, upsert in (("select-first", upsert_select_first), ("on-conflict", upsert_user_source)):
+        for clients in args.clients:
+            UserSource.__table__.drop(engine, checkfirst=True)
+            UserSource.__table__.create(engine)
+            statements.clear()
+            inserts = run(session_factory, upsert, keys, clients)
+            # Every key exists now, so the second pass only updates.
+            updates = run(session_factory, upsert, keys, clients)
+            per_call = len(statements) / (2 * len(keys))
+            print(f"{name:>14} {clients:>8} {inserts:>10.0f} {updates:>10.0f} {per_call:>11.1f}")
+
+    UserSource.__table__.drop(engine, checkfirst=True)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import make_text
+
+
+def make_page(index: int, pages: int, fanout: int = 3, js_only: bool = False) -> bytes:
+    links = "".join(f'<a href="/page/{(index * fanout + k + 1) % pages}">next {k}</a>' for k in range(fanout))
+    text = make_text(300, seed=index)
+    if js_only:
+        body = f'<div id="app"></div><script>document.getElementById("app").innerHTML = "<main><p>{text}</p></main>";</script>'
+    else:
+        body = f"<header>site header</header><main><h1>Page {index}</h1><p>{text}</p></main><footer>footer</footer>"
+    return f"<html><head><title>Page {index}</title></head><body>{body}<nav>{links}</nav></body></html>".encode()
+
+
+class SyntheticSite:
+    # Local server with `pages` linked pages at /page/<n>; js_only pages render their text client-side.
+    # Responses carry an ETag and honour If-None-Match; `edits` overrides page bodies and `removed` 404s pages.
+    def __init__(self, pages: int = 50, js_only: bool = False):
+        self.pages = pages
+        self.js_only = js_only
+        self.edits = {}
+        self.removed = set()
+        self.requests = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    index = int(self.path.rstrip("/").rsplit("/", 1)[1])
+                except (IndexError, ValueError):
+                    index = 0 if self.path == "/" else -1
+                site.requests += 1
+                if not 0 <= index < site.pages or index in site.removed:
+                    self.send_error(404)
+                    return
+                body = site.edits.get(index) or make_page(index, site.pages, js_only=site.js_only)
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/page/0"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
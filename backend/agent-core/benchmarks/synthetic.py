@@ -0,0 +1,67 @@
+import random
+
+WORDS = (
+    "invoice order shipment customer refund warranty product catalogue price discount "
+    "delivery support account payment subscription report quarter revenue policy contact "
+    "SKU-4821 ERR-503 +91-98765-43210 agent message reply knowledge document page section"
+).split()
+
+
+def make_text(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_document(chars: int, seed: int = 0) -> str:
+    # Sentences of 4-30 words grouped into paragraphs, so sentence-aware chunking has boundaries to find.
+    rng = random.Random(seed)
+    paragraphs, size = [], 0
+    while size < chars:
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30))).capitalize() + rng.choice(".!?")
+            for _ in range(rng.randint(2, 8))
+        ]
+        paragraphs.append(" ".join(sentences))
+        size += len(paragraphs[-1]) + 2
+    return "\n\n".join(paragraphs)[:chars]
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int, words_per_page: int = 400, seed: int = 0) -> bytes:
+    # Minimal hand-written PDF (Helvetica text pages) so benchmarks need no extra dependencies.
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", b""]
+    pages_ref = 2
+    kids = []
+
+    for page in range(pages):
+        text = make_text(words_per_page, seed + page)
+        lines = [text[i:i + 90] for i in range(0, len(text), 90)]
+        content = ("BT /F1 10 Tf 40 800 Td 12 TL " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET").encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_ref, content_ref)
+        )
+        kids.append(len(objects))
+
+    objects[pages_ref - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_ref)
+    catalog_ref = len(objects)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_ref, xref)
+    return out
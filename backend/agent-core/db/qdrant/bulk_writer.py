@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+QDRANT_UPSERT_CONCURRENCY = int(os.getenv("QDRANT_UPSERT_CONCURRENCY", "4"))
+QDRANT_UPSERT_RETRIES = int(os.getenv("QDRANT_UPSERT_RETRIES", "3"))
+QDRANT_UPSERT_RETRY_BACKOFF = float(os.getenv("QDRANT_UPSERT_RETRY_BACKOFF", "0.5"))
+
+_executor = ThreadPoolExecutor(max_workers=QDRANT_UPSERT_CONCURRENCY, thread_name_prefix="qdrant-upsert")
+
+
+class BulkWriter:
+    # Streams points to Qdrant in fixed-size batches with up to `concurrency` requests in flight.
+    # Intermediate batches use wait=False; the last batch is sent with wait=True once all others
+    # have been acknowledged, so a successful write() means the whole source is applied.
+    def __init__(
+        self,
+        client,
+        collection_name: str,
+        batch_size: int = QDRANT_UPSERT_BATCH_SIZE,
+        concurrency: int = QDRANT_UPSERT_CONCURRENCY,
+        retries: int = QDRANT_UPSERT_RETRIES,
+        backoff: float = QDRANT_UPSERT_RETRY_BACKOFF,
+        executor: ThreadPoolExecutor = None,
+        async_client=None,
+    ):
+        self.client = client
+        self.async_client = async_client
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.executor = executor or _executor
+
+    def _send(self, points: list, wait: bool, shard_key=None):
+        attempt = 0
+        while True:
+            try:
+                return self.client.upsert(
+                    collection_name=self.collection_name, points=points, wait=wait, shard_key_selector=shard_key
+                )
+            except Exception as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                attempt += 1
+                logger.warning(
+                    "Qdrant upsert of %s points failed (attempt %s/%s), retrying in %.1fs: %s",
+                    len(points), attempt, self.retries, delay, e,
+                )
+                time.sleep(delay)
+
+    def _batches(self, points):
+        batch = []
+        for point in points:
+            batch.append(point)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def write(self, points, progress=None, shard_key=None) -> dict:
+        slots = threading.BoundedSemaphore(self.concurrency)
+        futures = []
+        batch_sizes = []
+        written = 0
+        lock = threading.Lock()
+        errors = []
+
+        def on_done(future, size):
+            nonlocal written
+            if future.exception() is not None:
+                # Record the error before freeing the slot so the producer stops submitting.
+                errors.append(future.exception())
+                slots.release()
+                return
+            slots.release()
+            with lock:
+                written += size
+                total = written
+            if progress is not None:
+                progress(total)
+
+        pending = None
+        try:
+            for batch in self._batches(points):
+                # Hold one batch back so the final one can be sent with wait=True.
+                if pending is not None:
+                    slots.acquire()
+                    if errors:
+                        slots.release()
+                        break
+                    future = self.executor.submit(self._send, pending, False, shard_key)
+                    future.add_done_callback(lambda f, size=len(pending): on_done(f, size))
+                    futures.append(future)
+                    batch_sizes.append(len(pending))
+                pending = batch
+        finally:
+            # Never return (or raise) with requests still in flight: callers clean up by filter on failure.
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    pass
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+        written = sum(batch_sizes)
+
+        operation_info = None
+        if pending:
+            operation_info = self._send(pending, True, shard_key)
+            written += len(pending)
+            if progress is not None:
+                progress(written)
+
+        return {
+            "points_upserted": written,
+            "batches": len(futures) + (1 if pending else 0),
+            "operation_id": getattr(operation_info, "operation_id", None),
+        }
+
+    async def _send_async(self, points: list, wait: bool, shard_key=None):
+        attempt = 0
+        while True:
+            try:
+                return await self.async_client.upsert(
+                    collection_name=self.collection_name, points=points, wait=wait, shard_key_selector=shard_key
+                )
+            except Exception as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                attempt += 1
+                logger.warning(
+                    "Qdrant upsert of %s points failed (attempt %s/%s), retrying in %.1fs: %s",
+                    len(points), attempt, self.retries, delay, e,
+                )
+                await asyncio.sleep(delay)
+
+    async def write_async(self, points, progress=None, shard_key=None) -> dict:
+        # Same batching and ordering guarantees as write(), driven by the event loop instead of threads.
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        batch_sizes = []
+        written = 0
+
+        async def send(batch):
+            nonlocal written
+            try:
+                await self._send_async(batch, False, shard_key)
+            finally:
+                slots.release()
+            written += len(batch)
+            if progress is not None:
+                progress(written)
+
+        pending = None
+        try:
+            for batch in self._batches(points):
+                if pending is not None:
+                    await slots.acquire()
+                    if any(task.done() and task.exception() is not None for task in tasks):
+                        slots.release()
+                        break
+                    tasks.append(asyncio.create_task(send(pending)))
+                    batch_sizes.append(len(pending))
+                pending = batch
+        finally:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        written = sum(batch_sizes)
+
+        operation_info = None
+        if pending:
+            operation_info = await self._send_async(pending, True, shard_key)
+            written += len(pending)
+            if progress is not None:
+                progress(written)
+
+        return {
+            "points_upserted": written,
+            "batches": len(tasks) + (1 if pending else 0),
+            "operation_id": getattr(operation_info, "operation_id", None),
+        }
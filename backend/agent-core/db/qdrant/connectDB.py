@@ -1,11 +1,21 @@
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 import os
 
 qdrant_url = os.getenv("Qdrant_APIURL")
 qdrant_api_key = os.getenv("Qdrant_APIKEY")
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "true").lower() in ("1", "true", "yes")
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "30"))
 
+client_options = {
+    "url": qdrant_url,
+    "api_key": qdrant_api_key,
+    "prefer_grpc": QDRANT_PREFER_GRPC,
+    "grpc_port": QDRANT_GRPC_PORT,
+    "timeout": QDRANT_TIMEOUT,
+}
 
-client = QdrantClient(
-    url=qdrant_url,
-    api_key=qdrant_api_key,
-)
\ No newline at end of file
+# Both clients are process-wide singletons so their channels/connection pools are reused.
+# The sync client serves worker threads and the gRPC servicer; async routes use async_client.
+client = QdrantClient(**client_options)
+async_client = AsyncQdrantClient(**client_options)
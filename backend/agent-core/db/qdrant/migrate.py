@@ -0,0 +1,265 @@
+# Maintenance commands for an existing collection.
+# Usage: python -m db.qdrant.migrate storage --profile scalar [--collection OmniAgent] [--dry-run] [--wait]
+#        python -m db.qdrant.migrate backfill-source-type [--dry-run]
+#        python -m db.qdrant.migrate tenants [--dry-run]                     (tenant index + per-tenant HNSW, in place)
+#        python -m db.qdrant.migrate tenants --copy-to OmniAgent_sharded     (copy into a custom-sharded collection)
+#        python -m db.qdrant.migrate hybrid [--dry-run]                      (backfill bm25 vectors, in place)
+#        python -m db.qdrant.migrate hybrid --copy-to OmniAgent_hybrid       (copy into a collection with the bm25 vector)
+import argparse
+import logging
+import time
+
+from qdrant_client.models import CollectionStatus, PointStruct, PointVectors
+
+from db.supabase.connectDB import get_db_session, engine
+from db.supabase.models.userModel import UserSource
+from .bulk_writer import BulkWriter
+from .connectDB import client
+from .sparse import encode_document as encode_sparse_document
+from .qdrant_client import collection_name as default_collection, source_filter
+from .schema import (
+    PAYLOAD_INDEXES,
+    QDRANT_TENANT_HNSW,
+    SPARSE_VECTOR_NAME,
+    STORAGE_PROFILES,
+    apply_storage_profile,
+    bootstrap_collection,
+    describe_storage,
+    has_sparse_vector,
+    hnsw_config,
+    is_tenant_indexed,
+    shard_key_for,
+    sharding_enabled,
+    storage_matches,
+    storage_profile,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def wait_until_green(collection: str, timeout: float, poll: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        info = client.get_collection(collection)
+        if info.status == CollectionStatus.GREEN:
+            return info
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"collection '{collection}' still {info.status} after {timeout}s")
+        time.sleep(poll)
+
+
+def migrate_storage(collection: str, profile_name: str, dry_run: bool = False, wait: bool = False, timeout: float = 3600) -> dict:
+    profile = storage_profile(profile_name)
+    info = client.get_collection(collection)
+    before = describe_storage(info)
+    if storage_matches(info, profile):
+        return {"status": "success", "collection": collection, "changed": False, "storage": before}
+    if dry_run:
+        return {"status": "dry_run", "collection": collection, "changed": False, "storage": before, "target": profile}
+
+    logger.info("Migrating '%s' storage %s -> profile '%s'", collection, before, profile["name"])
+    apply_storage_profile(client, collection, profile)
+    if wait:
+        info = wait_until_green(collection, timeout)
+    else:
+        info = client.get_collection(collection)
+    return {
+        "status": "success",
+        "collection": collection,
+        "changed": True,
+        "before": before,
+        "storage": describe_storage(info),
+        "collection_status": str(info.status),
+    }
+
+
+def backfill_source_type(collection: str, dry_run: bool = False) -> dict:
+    # Points written before source_type was part of the payload cannot be filtered by it;
+    # copy the type over from user_sources, one set_payload per source.
+    if engine is None:
+        return {"status": "error", "message": "Database not configured: source types live in user_sources"}
+    with get_db_session() as db:
+        sources = [(s.user_id, s.source_id, s.source_type) for s in db.query(UserSource).all()]
+
+    updated = 0
+    for user_id, source_id, source_type in sources:
+        if not dry_run:
+            client.set_payload(
+                collection_name=collection,
+                payload={"source_type": source_type},
+                points=source_filter(user_id, source_id),
+                wait=True,
+                shard_key_selector=shard_key_for(user_id),
+            )
+        updated += 1
+    return {"status": "dry_run" if dry_run else "success", "collection": collection, "sources": updated}
+
+
+def migrate_tenants_in_place(collection: str, dry_run: bool = False) -> dict:
+    info = client.get_collection(collection)
+    steps = []
+    if not is_tenant_indexed(info):
+        steps.append("tenant_index")
+    if QDRANT_TENANT_HNSW and info.config.hnsw_config.m != 0:
+        steps.append("tenant_hnsw")
+    if dry_run or not steps:
+        return {"status": "dry_run" if dry_run else "success", "collection": collection, "steps": steps}
+
+    if "tenant_index" in steps:
+        # Recreating the index is the only way to flip is_tenant; filters fall back to a scan meanwhile.
+        if "user_id" in (info.payload_schema or {}):
+            client.delete_payload_index(collection, "user_id", wait=True)
+        client.create_payload_index(collection, "user_id", field_schema=PAYLOAD_INDEXES["user_id"], wait=True)
+    if "tenant_hnsw" in steps:
+        client.update_collection(collection_name=collection, hnsw_config=hnsw_config(tenant=True))
+    return {"status": "success", "collection": collection, "steps": steps}
+
+
+def _copy_vector(point, hybrid: bool):
+    dense = point.vector.get("") if isinstance(point.vector, dict) else point.vector
+    if not hybrid:
+        return dense
+    return {"": dense, SPARSE_VECTOR_NAME: encode_sparse_document((point.payload or {}).get("text"))}
+
+
+def copy_collection(source: str, target: str, batch_size: int = 1000, dry_run: bool = False) -> dict:
+    # Point ids are kept, so an interrupted copy can simply be run again.
+    # The target gets the current schema: shard keys when sharding is on, bm25 vectors when sparse is on.
+    total = client.count(source, exact=True).count
+    if dry_run:
+        return {"status": "dry_run", "source": source, "target": target, "points": total, "sharded": sharding_enabled()}
+
+    schema = bootstrap_collection(client, target)
+    hybrid = schema["sparse_vector"] is not None
+    writer = BulkWriter(client, target)
+    copied = 0
+    skipped = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        by_shard = {}
+        for point in points:
+            user_id = (point.payload or {}).get("user_id")
+            if not user_id:
+                skipped += 1
+                continue
+            by_shard.setdefault(shard_key_for(user_id), []).append(point)
+        for shard_key, group in by_shard.items():
+            copied += writer.write(
+                (PointStruct(id=point.id, vector=_copy_vector(point, hybrid), payload=point.payload) for point in group),
+                shard_key=shard_key,
+            )["points_upserted"]
+        logger.info("Copied %s/%s points into '%s'", copied, total, target)
+        if offset is None:
+            break
+
+    return {
+        "status": "success",
+        "source": source,
+        "target": target,
+        "points_copied": copied,
+        "points_skipped": skipped,
+        "target_count": client.count(target, exact=True).count,
+        "shard_keys": schema["shard_keys"],
+        "sparse_vector": schema["sparse_vector"],
+        "next_step": f"set QDRANT_COLLECTION={target} and restart agent-core",
+    }
+
+
+def backfill_sparse_vectors(collection: str, batch_size: int = 1000, dry_run: bool = False) -> dict:
+    # Named vectors cannot be added to an existing collection; this only fills points that were
+    # written into a sparse-enabled collection before ingestion produced bm25 vectors.
+    info = client.get_collection(collection)
+    if not has_sparse_vector(info):
+        return {
+            "status": "error",
+            "collection": collection,
+            "message": f"no '{SPARSE_VECTOR_NAME}' sparse vector in this collection; use --copy-to",
+        }
+    total = client.count(collection, exact=True).count
+    if dry_run:
+        return {"status": "dry_run", "collection": collection, "points": total}
+
+    updated = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=["user_id", "text"],
+            with_vectors=False,
+        )
+        by_shard = {}
+        for point in points:
+            by_shard.setdefault(shard_key_for((point.payload or {}).get("user_id") or ""), []).append(point)
+        for shard_key, group in by_shard.items():
+            client.update_vectors(
+                collection_name=collection,
+                points=[
+                    PointVectors(id=point.id, vector={SPARSE_VECTOR_NAME: encode_sparse_document(point.payload.get("text"))})
+                    for point in group
+                ],
+                wait=True,
+                shard_key_selector=shard_key,
+            )
+            updated += len(group)
+        logger.info("Backfilled %s/%s points in '%s'", updated, total, collection)
+        if offset is None:
+            break
+    return {"status": "success", "collection": collection, "points_updated": updated}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    storage = commands.add_parser("storage", help="switch quantization / on-disk storage profile")
+    storage.add_argument("--profile", required=True, choices=sorted(STORAGE_PROFILES))
+    storage.add_argument("--collection", default=default_collection)
+    storage.add_argument("--dry-run", action="store_true")
+    storage.add_argument("--wait", action="store_true", help="block until the optimizer has rebuilt all segments")
+    storage.add_argument("--timeout", type=float, default=3600)
+
+    backfill = commands.add_parser("backfill-source-type", help="add source_type to points written before it was stored")
+    backfill.add_argument("--collection", default=default_collection)
+    backfill.add_argument("--dry-run", action="store_true")
+
+    tenants = commands.add_parser("tenants", help="switch to the tenant-partitioned layout")
+    tenants.add_argument("--collection", default=default_collection)
+    tenants.add_argument("--copy-to", default=None, help="copy points into a new (custom-sharded) collection")
+    tenants.add_argument("--batch-size", type=int, default=1000)
+    tenants.add_argument("--dry-run", action="store_true")
+
+    hybrid = commands.add_parser("hybrid", help="add bm25 sparse vectors for hybrid retrieval")
+    hybrid.add_argument("--collection", default=default_collection)
+    hybrid.add_argument("--copy-to", default=None, help="copy points into a new collection with the sparse vector")
+    hybrid.add_argument("--batch-size", type=int, default=1000)
+    hybrid.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "storage":
+        print(migrate_storage(args.collection, args.profile, args.dry_run, args.wait, args.timeout))
+    elif args.command == "backfill-source-type":
+        print(backfill_source_type(args.collection, args.dry_run))
+    elif args.command == "tenants":
+        if args.copy_to:
+            print(copy_collection(args.collection, args.copy_to, args.batch_size, args.dry_run))
+        else:
+            print(migrate_tenants_in_place(args.collection, args.dry_run))
+    elif args.command == "hybrid":
+        if args.copy_to:
+            print(copy_collection(args.collection, args.copy_to, args.batch_size, args.dry_run))
+        else:
+            print(backfill_sparse_vectors(args.collection, args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,141 +1,329 @@
+import asyncio
+import hashlib
 import logging
-from qdrant_client.models import PointStruct, Filter, FilterSelector, FieldCondition, MatchValue
-from uuid import uuid4
-
-from .connectDB import client
+import os
+from qdrant_client.models import (
+    PointStruct, PointIdsList, Filter, FilterSelector, FieldCondition, MatchValue, MatchAny, HasIdCondition,
+    Fusion, FusionQuery, Prefetch,
+)
+from uuid import UUID, uuid5
+
+from .connectDB import client, async_client
+from .bulk_writer import BulkWriter
+from .sparse import encode_document as encode_sparse_document
+from .schema import (
+    ensure_collection as ensure_collection_schema, cached_schema_state, search_params, shard_key_for, SPARSE_VECTOR_NAME,
+)
 from db.supabase.connectDB import get_db_session, engine
-from db.supabase.crud import upsert_user_source, delete_user_source as delete_supabase_source
+from db.supabase.crud import (
+    upsert_user_source, delete_user_source as delete_supabase_source, delete_source_pages, delete_user_sources_by_source_id,
+)
 from db.supabase.models.userModel import UserSource
 
 logger = logging.getLogger(__name__)
 
-collection_name = "OmniAgent"
+collection_name = os.getenv("QDRANT_COLLECTION", "OmniAgent")
+SEARCH_HYBRID_PREFETCH = int(os.getenv("SEARCH_HYBRID_PREFETCH", "2"))
+SEARCH_PAYLOAD_FIELDS = ["text", "source_id", "source_type", "chunk_index", "page_url"]
+bulk_writer = BulkWriter(client, collection_name, async_client=async_client)
+
+POINT_ID_NAMESPACE = UUID("6f1d3c1e-5a0b-4c43-9a57-0d8f3b2e7c41")
+DELETE_BATCH_SIZE = 1000
+# Source ids used to be the first 6 hex chars of the same sha256 that is now used in full.
+LEGACY_SOURCE_ID_LENGTH = 6
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def point_id(user_id: str, source_id: str, chunk_index, content_hash: str) -> str:
+    # Same chunk of the same source always maps to the same point, so re-ingesting overwrites in place.
+    return str(uuid5(POINT_ID_NAMESPACE, f"{user_id}\x00{source_id}\x00{chunk_index}\x00{content_hash}"))
+
+
+def ensure_collection() -> dict:
+    return ensure_collection_schema(client, collection_name)
+
+
+async def ensure_collection_async() -> dict:
+    state = cached_schema_state(collection_name)
+    if state is not None:
+        return state
+    return await asyncio.to_thread(ensure_collection)
 
 
-def upsert_embedding(user_id: str, source_id: str, source_title: str, chunks: list, embeddings: list, source_type: str):
-    file_exist = check_if_file_exists(user_id, source_id)
-    if file_exist:
-        scroll_result = client.scroll(
+def hybrid_enabled() -> bool:
+    return ensure_collection().get("sparse_vector") is not None
+
+
+async def hybrid_enabled_async() -> bool:
+    return (await ensure_collection_async()).get("sparse_vector") is not None
+
+
+def point_vector(chunk: str, embedding, hybrid: bool):
+    if not hybrid:
+        return embedding.tolist()
+    # "" is the collection's unnamed dense vector.
+    return {"": embedding.tolist(), SPARSE_VECTOR_NAME: encode_sparse_document(chunk)}
+
+
+def source_filter(user_id: str, source_id: str) -> Filter:
+    return Filter(
+        must=[
+            FieldCondition(key="user_id", match=MatchValue(value=user_id)),
+            FieldCondition(key="source_id", match=MatchValue(value=source_id)),
+        ]
+    )
+
+
+def get_source_point_ids(user_id: str, source_id: str) -> set:
+    ensure_collection()
+    ids = set()
+    offset = None
+    while True:
+        points, offset = client.scroll(
             collection_name=collection_name,
-            scroll_filter=Filter(
-                must=[
-                    FieldCondition(
-                        key="source_id",
-                        match=MatchValue(value=source_id)
-                    )
-                ]
-            ),
-            limit=1000,
+            scroll_filter=source_filter(user_id, source_id),
+            limit=DELETE_BATCH_SIZE,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+            shard_key_selector=shard_key_for(user_id),
         )
-        points = scroll_result[0] if scroll_result else []
-
-        if engine is not None:
-            try:
-                with get_db_session() as db:
-                    upsert_user_source(db, user_id, source_id, source_title, source_type)
-            except Exception as e:
-                logger.exception("File already exists but failed to update metadata in Supabase")
-                return {
-                    "status": "error",
-                    "message": "file already exists but failed to update metadata",
-                    "supabase_status": "failed",
-                    "supabase_error": str(e)
-                }
+        ids.update(str(point.id) for point in points)
+        if offset is None:
+            return ids
+
+
+def delete_point_ids(user_id: str, point_ids):
+    point_ids = list(point_ids)
+    for i in range(0, len(point_ids), DELETE_BATCH_SIZE):
+        client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=point_ids[i:i + DELETE_BATCH_SIZE]),
+            wait=True,
+            shard_key_selector=shard_key_for(user_id),
+        )
+
+
+async def get_source_point_ids_async(user_id: str, source_id: str) -> set:
+    await ensure_collection_async()
+    ids = set()
+    offset = None
+    while True:
+        points, offset = await async_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=source_filter(user_id, source_id),
+            limit=DELETE_BATCH_SIZE,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+            shard_key_selector=shard_key_for(user_id),
+        )
+        ids.update(str(point.id) for point in points)
+        if offset is None:
+            return ids
+
+
+async def delete_point_ids_async(user_id: str, point_ids):
+    point_ids = list(point_ids)
+    for i in range(0, len(point_ids), DELETE_BATCH_SIZE):
+        await async_client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=point_ids[i:i + DELETE_BATCH_SIZE]),
+            wait=True,
+            shard_key_selector=shard_key_for(user_id),
+        )
+
+
+def _upsert_supabase_source(user_id: str, source_id: str, source_title: str, source_type: str):
+    if engine is None:
+        return None, False
+    with get_db_session() as db:
+        supabase_user_source, supabase_is_new = upsert_user_source(
+            db, user_id, source_id, source_title, source_type
+        )
+        record_id = supabase_user_source.id
+        logger.info(
+            "%s user_source in Supabase: %s",
+            "Created" if supabase_is_new else "Updated",
+            supabase_user_source,
+        )
+    return record_id, supabase_is_new
 
-        return {
-            "status": "success",
-            "message": "file already exists",
-            "user_id": user_id,
-            "collection": collection_name,
-            "source_id": source_id,
-            "points_upserted": len(points),
-            "file_replaced": False,
-            "operation_id": None,
-            "existing_points": len(points),
-            "supabase_status": "updated" if engine is not None else "not_configured"
-        }
 
+def _rollback_supabase_source(user_id: str, source_id: str, source_title: str):
     try:
+        with get_db_session() as db:
+            delete_supabase_source(db, user_id, source_id, source_title)
+        logger.info("Rolled back Supabase record for user=%s, source=%s", user_id, source_id)
+    except Exception as rollback_error:
+        logger.warning("Failed to rollback Supabase: %s", rollback_error)
+
+
+def _legacy_source_id(user_id: str, source_id: str):
+    # The legacy id of a source that was ingested before full-length ids, if there is one to retire.
+    legacy_id = source_id[:LEGACY_SOURCE_ID_LENGTH]
+    if legacy_id == source_id:
+        return None
+    if engine is None:
+        return legacy_id
+    with get_db_session() as db:
+        removed = delete_user_sources_by_source_id(db, user_id, legacy_id)
+    return legacy_id if removed else None
+
+
+def retire_legacy_source(user_id: str, source_id: str):
+    # Called once the full-id version is written: the legacy row and points are now duplicates.
+    try:
+        legacy_id = _legacy_source_id(user_id, source_id)
+        if legacy_id is None:
+            return
+        client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=source_filter(user_id, legacy_id)),
+            wait=True,
+            shard_key_selector=shard_key_for(user_id),
+        )
+        logger.info("Retired legacy source %s of user=%s (now %s)", legacy_id, user_id, source_id)
+    except Exception as e:
+        logger.warning("Failed to retire legacy source for user=%s, source=%s: %s", user_id, source_id, e)
+
+
+async def retire_legacy_source_async(user_id: str, source_id: str):
+    try:
+        legacy_id = await asyncio.to_thread(_legacy_source_id, user_id, source_id)
+        if legacy_id is None:
+            return
+        await async_client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=source_filter(user_id, legacy_id)),
+            wait=True,
+            shard_key_selector=shard_key_for(user_id),
+        )
+        logger.info("Retired legacy source %s of user=%s (now %s)", legacy_id, user_id, source_id)
+    except Exception as e:
+        logger.warning("Failed to retire legacy source for user=%s, source=%s: %s", user_id, source_id, e)
+
+
+def _plan_points(user_id: str, source_id: str, source_type: str, batches, existing_ids: set, plan: dict, hybrid: bool):
+    # Yields only points whose id is not already stored; plan collects every id of the new version.
+    chunk_index = 0
+    for chunks, embeddings in batches:
         if len(chunks) != len(embeddings):
             raise ValueError("mismatch in the chunks and embeddings")
 
-        supabase_user_source = None
-        supabase_is_new = False
-
-        if engine is not None:
-            try:
-                with get_db_session() as db:
-                    supabase_user_source, supabase_is_new = upsert_user_source(
-                        db, user_id, source_id, source_title, source_type
-                    )
-                logger.info(
-                    "%s user_source in Supabase: %s",
-                    "Created" if supabase_is_new else "Updated",
-                    supabase_user_source,
-                )
-            except Exception as supabase_error:
-                logger.exception("Supabase upsert failed")
-                return {
-                    "status": "error",
-                    "message": "Failed to upsert metadata to Supabase",
-                    "supabase_status": "failed",
-                    "supabase_error": str(supabase_error)
-                }
-
-        points = []
-        for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            point_id = str(uuid4())
-            point = PointStruct(
-                id=point_id,
-                vector=embedding,
+        for chunk, embedding in zip(chunks, embeddings):
+            content_hash = chunk_hash(chunk)
+            pid = point_id(user_id, source_id, chunk_index, content_hash)
+            plan["ids"].add(pid)
+            chunk_index += 1
+            if pid in existing_ids:
+                plan["unchanged"] += 1
+                continue
+            yield PointStruct(
+                id=pid,
+                vector=point_vector(chunk, embedding, hybrid),
                 payload={
                     "user_id": user_id,
                     "source_id": source_id,
-                    "chunk_index": idx,
+                    "source_type": source_type,
+                    "chunk_index": chunk_index - 1,
+                    "content_hash": content_hash,
                     "text": chunk,
                     "chunk_length": len(chunk)
                 }
             )
-            points.append(point)
 
+
+def _existing_points_error(e: Exception) -> dict:
+    return {
+        "status": "error",
+        "message": f"Failed to read existing points from Qdrant: {str(e)}",
+        "qdrant_status": "failed",
+        "qdrant_error": str(e)
+    }
+
+
+def _supabase_error(e: Exception) -> dict:
+    return {
+        "status": "error",
+        "message": "Failed to upsert metadata to Supabase",
+        "supabase_status": "failed",
+        "supabase_error": str(e)
+    }
+
+
+def _upsert_success(user_id, source_id, write_result, plan, existing_ids, stale_ids, record_id, supabase_is_new) -> dict:
+    # stale_ids: old versions of changed chunks and indices past the new end of the source.
+    logger.info(
+        "Source %s: upserted %s points in %s batches, %s unchanged, %s deleted",
+        source_id, write_result["points_upserted"], write_result["batches"], plan["unchanged"], len(stale_ids),
+    )
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "collection": collection_name,
+        "source_id": source_id,
+        "points_upserted": write_result["points_upserted"],
+        "points_unchanged": plan["unchanged"],
+        "points_deleted": len(stale_ids),
+        "file_replaced": bool(existing_ids),
+        "operation_id": write_result["operation_id"],
+        "supabase_status": ("created" if supabase_is_new else "updated") if engine is not None else "not_configured",
+        "supabase_record_id": record_id
+    }
+
+
+def _upsert_failure(qdrant_error: Exception, supabase_is_new: bool) -> dict:
+    return {
+        "status": "error",
+        "message": f"Failed to upsert embeddings to Qdrant: {str(qdrant_error)}",
+        "qdrant_status": "failed",
+        "qdrant_error": str(qdrant_error),
+        "supabase_status": "rolled_back" if (engine is not None and supabase_is_new) else "not_affected"
+    }
+
+
+def upsert_embedding(user_id: str, source_id: str, source_title: str, chunks: list, embeddings, source_type: str):
+    return upsert_embedding_batches(user_id, source_id, source_title, [(chunks, embeddings)], source_type)
+
+
+def upsert_embedding_batches(user_id: str, source_id: str, source_title: str, batches, source_type: str, progress=None):
+    try:
+        existing_ids = get_source_point_ids(user_id, source_id)
+    except Exception as e:
+        logger.exception("Failed to load existing points for source %s", source_id)
+        return _existing_points_error(e)
+
+    try:
         try:
-            operation_info = client.upsert(
-                collection_name=collection_name,
-                points=points,
-                wait=True
+            record_id, supabase_is_new = _upsert_supabase_source(user_id, source_id, source_title, source_type)
+        except Exception as supabase_error:
+            logger.exception("Supabase upsert failed")
+            return _supabase_error(supabase_error)
+
+        plan = {"ids": set(), "unchanged": 0}
+        try:
+            write_result = bulk_writer.write(
+                _plan_points(user_id, source_id, source_type, batches, existing_ids, plan, hybrid_enabled()),
+                progress=progress,
+                shard_key=shard_key_for(user_id),
             )
-            logger.info("Upserted %s points to collection '%s'", len(points), collection_name)
-
-            return {
-                "status": "success",
-                "user_id": user_id,
-                "collection": collection_name,
-                "source_id": source_id,
-                "points_upserted": len(points),
-                "file_replaced": file_exist,
-                "operation_id": operation_info.operation_id if hasattr(operation_info, "operation_id") else None,
-                "supabase_status": ("created" if supabase_is_new else "updated") if engine is not None else "not_configured",
-                "supabase_record_id": supabase_user_source.id if supabase_user_source else None
-            }
+            stale_ids = existing_ids - plan["ids"]
+            delete_point_ids(user_id, stale_ids)
+            retire_legacy_source(user_id, source_id)
+            return _upsert_success(user_id, source_id, write_result, plan, existing_ids, stale_ids, record_id, supabase_is_new)
 
         except Exception as qdrant_error:
             logger.exception("Qdrant upsert failed")
 
-            if engine is not None and supabase_user_source and supabase_is_new:
-                try:
-                    with get_db_session() as db:
-                        delete_supabase_source(db, user_id, source_id, source_title)
-                    logger.info("Rolled back Supabase record for user=%s, source=%s", user_id, source_id)
-                except Exception as rollback_error:
-                    logger.warning("Failed to rollback Supabase: %s", rollback_error)
-
-            return {
-                "status": "error",
-                "message": f"Failed to upsert embeddings to Qdrant: {str(qdrant_error)}",
-                "qdrant_status": "failed",
-                "qdrant_error": str(qdrant_error),
-                "supabase_status": "rolled_back" if (engine is not None and supabase_is_new) else "not_affected"
-            }
+            # Points already written keep their deterministic ids, so they are left in place:
+            # retrying the same source skips them and only writes what is still missing.
+            if engine is not None and supabase_is_new:
+                _rollback_supabase_source(user_id, source_id, source_title)
+            return _upsert_failure(qdrant_error, supabase_is_new)
 
     except Exception as e:
         logger.exception("Error upserting embeddings")
@@ -145,35 +333,122 @@ def upsert_embedding(user_id: str, source_id: str, source_title: str, chunks: li
         }
 
 
-def ensure_payload_indexes():
+async def upsert_embedding_async(user_id: str, source_id: str, source_title: str, chunks: list, embeddings, source_type: str):
     try:
-        client.create_payload_index(collection_name, "user_id", field_schema="keyword")
-    except Exception:
-        pass
+        existing_ids = await get_source_point_ids_async(user_id, source_id)
+    except Exception as e:
+        logger.exception("Failed to load existing points for source %s", source_id)
+        return _existing_points_error(e)
+
     try:
-        client.create_payload_index(collection_name, "source_id", field_schema="keyword")
-    except Exception:
-        pass
+        try:
+            record_id, supabase_is_new = await asyncio.to_thread(
+                _upsert_supabase_source, user_id, source_id, source_title, source_type
+            )
+        except Exception as supabase_error:
+            logger.exception("Supabase upsert failed")
+            return _supabase_error(supabase_error)
+
+        plan = {"ids": set(), "unchanged": 0}
+        try:
+            write_result = await bulk_writer.write_async(
+                _plan_points(
+                    user_id, source_id, source_type, [(chunks, embeddings)], existing_ids, plan,
+                    await hybrid_enabled_async(),
+                ),
+                shard_key=shard_key_for(user_id),
+            )
+            stale_ids = existing_ids - plan["ids"]
+            await delete_point_ids_async(user_id, stale_ids)
+            await retire_legacy_source_async(user_id, source_id)
+            return _upsert_success(user_id, source_id, write_result, plan, existing_ids, stale_ids, record_id, supabase_is_new)
+
+        except Exception as qdrant_error:
+            logger.exception("Qdrant upsert failed")
+            if engine is not None and supabase_is_new:
+                await asyncio.to_thread(_rollback_supabase_source, user_id, source_id, source_title)
+            return _upsert_failure(qdrant_error, supabase_is_new)
+
+    except Exception as e:
+        logger.exception("Error upserting embeddings")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+
+def delete_page_points(user_id: str, source_id: str, page_urls: list = None, keep_ids=None):
+    must = [
+        FieldCondition(key="user_id", match=MatchValue(value=user_id)),
+        FieldCondition(key="source_id", match=MatchValue(value=source_id)),
+    ]
+    if page_urls is not None:
+        if not page_urls:
+            return
+        must.append(FieldCondition(key="page_url", match=MatchAny(any=list(page_urls))))
+    must_not = [HasIdCondition(has_id=list(keep_ids))] if keep_ids else None
+
+    client.delete(
+        collection_name=collection_name,
+        points_selector=FilterSelector(filter=Filter(must=must, must_not=must_not)),
+        wait=True,
+        shard_key_selector=shard_key_for(user_id),
+    )
+
+
+def upsert_page_points(user_id: str, source_id: str, pages: list):
+    # pages: [(page_url, chunks, embeddings)]; chunk_index restarts per page so a page can be replaced on its own.
+    points = []
+    hybrid = hybrid_enabled()
+    for page_url, chunks, embeddings in pages:
+        if len(chunks) != len(embeddings):
+            raise ValueError("mismatch in the chunks and embeddings")
+        for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+            content_hash = chunk_hash(chunk)
+            points.append(PointStruct(
+                id=point_id(user_id, source_id, f"{page_url}#{idx}", content_hash),
+                vector=point_vector(chunk, embedding, hybrid),
+                payload={
+                    "user_id": user_id,
+                    "source_id": source_id,
+                    "source_type": "website",
+                    "page_url": page_url,
+                    "chunk_index": idx,
+                    "content_hash": content_hash,
+                    "text": chunk,
+                    "chunk_length": len(chunk)
+                }
+            ))
+
+    points_upserted = bulk_writer.write(points, shard_key=shard_key_for(user_id))["points_upserted"]
+    return points_upserted, [point.id for point in points]
 
 
 def check_if_file_exists(user_id: str, source_id: str):
     try:
-        collections = client.get_collections().collections
-        collection_names = [col.name for col in collections]
+        ensure_collection()
+        results = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=source_filter(user_id, source_id),
+            limit=1,
+            with_payload=False,
+            shard_key_selector=shard_key_for(user_id),
+        )
+        return len(results[0]) > 0
+    except Exception as e:
+        logger.exception("Error checking file existence")
+        return False
 
-        if collection_name not in collection_names:
-            return False
 
-        ensure_payload_indexes()
-        results = client.scroll(
+async def check_if_file_exists_async(user_id: str, source_id: str):
+    try:
+        await ensure_collection_async()
+        results = await async_client.scroll(
             collection_name=collection_name,
-            scroll_filter=Filter(
-                must=[
-                    FieldCondition(key="user_id", match=MatchValue(value=user_id)),
-                    FieldCondition(key="source_id", match=MatchValue(value=source_id))
-                ]
-            ),
-            limit=1
+            scroll_filter=source_filter(user_id, source_id),
+            limit=1,
+            with_payload=False,
+            shard_key_selector=shard_key_for(user_id),
         )
         return len(results[0]) > 0
     except Exception as e:
@@ -181,6 +456,19 @@ def check_if_file_exists(user_id: str, source_id: str):
         return False
 
 
+def _delete_supabase_file(user_id: str, source_id: str, source_title: str):
+    if engine is None:
+        return
+    try:
+        with get_db_session() as db:
+            deleted = delete_supabase_source(db, user_id, source_id, source_title)
+            delete_source_pages(db, user_id, source_id)
+            if deleted:
+                logger.info("Deleted user_source from Supabase: user=%s, source=%s", user_id, source_id)
+    except Exception as e:
+        logger.warning("Qdrant delete succeeded but Supabase delete failed: %s", e)
+
+
 def delete_user_file(user_id: str, source_title: str):
     source_id = get_source_id_by_title(user_id, source_title)
 
@@ -193,24 +481,39 @@ def delete_user_file(user_id: str, source_title: str):
     try:
         client.delete(
             collection_name=collection_name,
-            points_selector=FilterSelector(
-                filter=Filter(
-                    must=[
-                        FieldCondition(key="user_id", match=MatchValue(value=user_id)),
-                        FieldCondition(key="source_id", match=MatchValue(value=source_id)),
-                    ]
-                )
-            ),
+            points_selector=FilterSelector(filter=source_filter(user_id, source_id)),
+            shard_key_selector=shard_key_for(user_id),
         )
+        _delete_supabase_file(user_id, source_id, source_title)
+
+        return {
+            "status": "success",
+            "message": f"Deleted file {source_id} for user {user_id}"
+        }
+    except Exception as e:
+        logger.exception("Error deleting user file")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
 
-        if engine is not None:
-            try:
-                with get_db_session() as db:
-                    deleted = delete_supabase_source(db, user_id, source_id, source_title)
-                    if deleted:
-                        logger.info("Deleted user_source from Supabase: user=%s, source=%s", user_id, source_id)
-            except Exception as e:
-                logger.warning("Qdrant delete succeeded but Supabase delete failed: %s", e)
+
+async def delete_user_file_async(user_id: str, source_title: str):
+    source_id = await asyncio.to_thread(get_source_id_by_title, user_id, source_title)
+
+    if not source_id:
+        return {
+            "status": "error",
+            "message": "file not found"
+        }
+
+    try:
+        await async_client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=source_filter(user_id, source_id)),
+            shard_key_selector=shard_key_for(user_id),
+        )
+        await asyncio.to_thread(_delete_supabase_file, user_id, source_id, source_title)
 
         return {
             "status": "success",
@@ -224,6 +527,60 @@ def delete_user_file(user_id: str, source_title: str):
         }
 
 
+def _search_filter(user_id: str, source_ids: list = None, source_type: str = None) -> Filter:
+    must = [FieldCondition(key="user_id", match=MatchValue(value=user_id))]
+    if source_ids:
+        must.append(FieldCondition(key="source_id", match=MatchAny(any=list(source_ids))))
+    if source_type:
+        must.append(FieldCondition(key="source_type", match=MatchValue(value=source_type)))
+    return Filter(must=must)
+
+
+def _search_request(user_id: str, vector, sparse, top_k: int, source_ids: list, source_type: str,
+                    hnsw_ef: int, score_threshold: float) -> dict:
+    query_filter = _search_filter(user_id, source_ids, source_type)
+    request = {
+        "collection_name": collection_name,
+        "query_filter": query_filter,
+        "limit": top_k,
+        "with_payload": SEARCH_PAYLOAD_FIELDS,
+        "shard_key_selector": shard_key_for(user_id),
+    }
+    if sparse is None:
+        request.update(query=vector.tolist(), search_params=search_params(hnsw_ef), score_threshold=score_threshold)
+    elif vector is None:
+        request.update(query=sparse, using=SPARSE_VECTOR_NAME)
+    else:
+        # Reciprocal rank fusion of two short candidate lists: exact identifier hits come from the
+        # sparse side, so the dense side does not need a deep over-fetch to surface them.
+        # score_threshold keeps its cosine meaning by applying to the dense candidates only.
+        limit = top_k * SEARCH_HYBRID_PREFETCH
+        request.update(
+            prefetch=[
+                Prefetch(query=vector.tolist(), filter=query_filter, limit=limit,
+                         params=search_params(hnsw_ef), score_threshold=score_threshold),
+                Prefetch(query=sparse, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=limit),
+            ],
+            query=FusionQuery(fusion=Fusion.RRF),
+        )
+    return request
+
+
+def search_points(user_id: str, vector, top_k: int, source_ids: list = None, source_type: str = None,
+                  hnsw_ef: int = None, score_threshold: float = None, sparse=None):
+    ensure_collection()
+    request = _search_request(user_id, vector, sparse, top_k, source_ids, source_type, hnsw_ef, score_threshold)
+    return client.query_points(**request).points
+
+
+async def search_points_async(user_id: str, vector, top_k: int, source_ids: list = None, source_type: str = None,
+                              hnsw_ef: int = None, score_threshold: float = None, sparse=None):
+    await ensure_collection_async()
+    request = _search_request(user_id, vector, sparse, top_k, source_ids, source_type, hnsw_ef, score_threshold)
+    response = await async_client.query_points(**request)
+    return response.points
+
+
 def get_user_all_sources(user_id: str):
     if engine is None:
         return []
@@ -247,6 +604,7 @@ def get_source_id_by_title(user_id: str, source_title: str):
                     UserSource.user_id == user_id,
                     UserSource.source_title == source_title
                 )
+                .order_by(UserSource.updated_at.desc())
                 .first()
             )
             return result.source_id if result else None
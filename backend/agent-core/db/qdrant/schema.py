@@ -0,0 +1,311 @@
+import logging
+import os
+import threading
+import zlib
+
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionParamsDiff,
+    Disabled,
+    Distance,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    Modifier,
+    OptimizersConfigDiff,
+    PayloadSchemaType,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    ShardingMethod,
+    SparseIndexParams,
+    SparseVectorParams,
+    VectorParams,
+    VectorParamsDiff,
+)
+
+logger = logging.getLogger(__name__)
+
+QDRANT_VECTOR_SIZE = int(os.getenv("QDRANT_VECTOR_SIZE", "384"))
+QDRANT_DISTANCE = os.getenv("QDRANT_DISTANCE", "Cosine")
+QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+QDRANT_HNSW_FULL_SCAN_THRESHOLD = int(os.getenv("QDRANT_HNSW_FULL_SCAN_THRESHOLD", "10000"))
+QDRANT_INDEXING_THRESHOLD = int(os.getenv("QDRANT_INDEXING_THRESHOLD", "20000"))
+QDRANT_DEFAULT_SEGMENTS = int(os.getenv("QDRANT_DEFAULT_SEGMENTS", "0"))
+QDRANT_TENANT_HNSW = os.getenv("QDRANT_TENANT_HNSW", "true").lower() in ("1", "true", "yes")
+QDRANT_HNSW_PAYLOAD_M = int(os.getenv("QDRANT_HNSW_PAYLOAD_M", "16"))
+QDRANT_SHARD_GROUPS = int(os.getenv("QDRANT_SHARD_GROUPS", "0"))
+QDRANT_DEDICATED_TENANTS = [t.strip() for t in os.getenv("QDRANT_DEDICATED_TENANTS", "").split(",") if t.strip()]
+QDRANT_SHARDS_PER_KEY = int(os.getenv("QDRANT_SHARDS_PER_KEY", "1"))
+QDRANT_SPARSE_ENABLED = os.getenv("QDRANT_SPARSE_ENABLED", "true").lower() in ("1", "true", "yes")
+QDRANT_STORAGE_PROFILE = os.getenv("QDRANT_STORAGE_PROFILE", "memory")
+QDRANT_SCALAR_QUANTILE = float(os.getenv("QDRANT_SCALAR_QUANTILE", "0.99"))
+QDRANT_RESCORE_OVERSAMPLING = float(os.getenv("QDRANT_RESCORE_OVERSAMPLING", "0"))
+
+# memory: float32 vectors and payloads in RAM (the original layout).
+# scalar/binary: only the quantized vectors stay in RAM; originals and payloads live on disk
+# and are read back to rescore the oversampled candidates.
+# Binary keeps 1 bit per dimension and only holds recall on high-dimensional models; at 384 dims
+# scalar is the one to use (see benchmarks/bench_storage_profiles.py).
+STORAGE_PROFILES = {
+    "memory": {"quantization": None, "vectors_on_disk": False, "payload_on_disk": False, "oversampling": None},
+    "scalar": {"quantization": "int8", "vectors_on_disk": True, "payload_on_disk": True, "oversampling": 2.0},
+    "binary": {"quantization": "binary", "vectors_on_disk": True, "payload_on_disk": True, "oversampling": 3.0},
+}
+
+SPARSE_VECTOR_NAME = "bm25"
+
+# Every query is scoped to one user, so user_id is a tenant index: Qdrant co-locates each
+# tenant's points on disk and, with QDRANT_TENANT_HNSW, builds one small HNSW graph per tenant
+# (payload_m) instead of a single global graph (m=0) that filtered search has to fight through.
+PAYLOAD_INDEXES = {
+    "user_id": KeywordIndexParams(type=PayloadSchemaType.KEYWORD, is_tenant=True),
+    "source_id": PayloadSchemaType.KEYWORD,
+    "source_type": PayloadSchemaType.KEYWORD,
+    "page_url": PayloadSchemaType.KEYWORD,
+}
+
+_lock = threading.Lock()
+_state = {}
+
+
+def storage_profile(name: str = None) -> dict:
+    name = name or QDRANT_STORAGE_PROFILE
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown Qdrant storage profile '{name}', expected one of {sorted(STORAGE_PROFILES)}")
+    return dict(STORAGE_PROFILES[name], name=name)
+
+
+def quantization_config(profile: dict):
+    if profile["quantization"] == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=QDRANT_SCALAR_QUANTILE, always_ram=True)
+        )
+    if profile["quantization"] == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def vectors_config(profile: dict = None) -> VectorParams:
+    profile = profile or storage_profile()
+    return VectorParams(
+        size=QDRANT_VECTOR_SIZE,
+        distance=Distance(QDRANT_DISTANCE),
+        on_disk=profile["vectors_on_disk"],
+    )
+
+
+def sparse_vectors_config(profile: dict = None):
+    # BM25 term-frequency weights are written by ingestion; Qdrant supplies the IDF half.
+    if not QDRANT_SPARSE_ENABLED:
+        return None
+    profile = profile or storage_profile()
+    return {
+        SPARSE_VECTOR_NAME: SparseVectorParams(
+            modifier=Modifier.IDF,
+            index=SparseIndexParams(on_disk=profile["vectors_on_disk"]),
+        )
+    }
+
+
+def has_sparse_vector(info) -> bool:
+    return SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+
+
+def search_params(hnsw_ef: int = None, profile: dict = None) -> SearchParams:
+    profile = profile or storage_profile()
+    quantization = None
+    if profile["quantization"] is not None:
+        quantization = QuantizationSearchParams(
+            rescore=True,
+            oversampling=QDRANT_RESCORE_OVERSAMPLING or profile["oversampling"],
+        )
+    return SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+
+def describe_storage(info) -> dict:
+    params = info.config.params
+    quantization = info.config.quantization_config
+    vectors = params.vectors
+    if isinstance(quantization, ScalarQuantization):
+        kind = "int8"
+    elif isinstance(quantization, BinaryQuantization):
+        kind = "binary"
+    else:
+        kind = None
+    return {
+        "quantization": kind,
+        "vectors_on_disk": bool(getattr(vectors, "on_disk", False)),
+        "payload_on_disk": bool(params.on_disk_payload),
+    }
+
+
+def storage_matches(info, profile: dict) -> bool:
+    current = describe_storage(info)
+    return all(current[key] == profile[key] for key in current)
+
+
+def apply_storage_profile(client, collection_name: str, profile: dict):
+    # Qdrant applies this in place; segments are rebuilt by the optimizer in the background
+    # while the collection keeps serving reads and writes.
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={"": VectorParamsDiff(on_disk=profile["vectors_on_disk"])},
+        quantization_config=quantization_config(profile) or Disabled.DISABLED,
+        collection_params=CollectionParamsDiff(on_disk_payload=profile["payload_on_disk"]),
+    )
+
+
+def hnsw_config(tenant: bool = QDRANT_TENANT_HNSW) -> HnswConfigDiff:
+    return HnswConfigDiff(
+        m=0 if tenant else QDRANT_HNSW_M,
+        payload_m=QDRANT_HNSW_PAYLOAD_M if tenant else None,
+        ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+        full_scan_threshold=QDRANT_HNSW_FULL_SCAN_THRESHOLD,
+    )
+
+
+def sharding_enabled() -> bool:
+    return QDRANT_SHARD_GROUPS > 0
+
+
+def shard_key_for(user_id: str):
+    # Heavy tenants get a shard key of their own; everyone else is hashed into a fixed set of groups.
+    if not sharding_enabled():
+        return None
+    if user_id in QDRANT_DEDICATED_TENANTS:
+        return f"tenant-{user_id}"
+    return f"group-{zlib.crc32(user_id.encode()) % QDRANT_SHARD_GROUPS}"
+
+
+def all_shard_keys() -> list:
+    if not sharding_enabled():
+        return []
+    return [f"group-{i}" for i in range(QDRANT_SHARD_GROUPS)] + [f"tenant-{t}" for t in QDRANT_DEDICATED_TENANTS]
+
+
+def ensure_shard_keys(client, collection_name: str) -> list:
+    existing = {str(d.key) for d in (client.list_shard_keys(collection_name).shard_keys or [])}
+    for key in all_shard_keys():
+        if key not in existing:
+            client.create_shard_key(collection_name, key, shards_number=QDRANT_SHARDS_PER_KEY)
+            logger.info("Created shard key '%s' on '%s'", key, collection_name)
+    return all_shard_keys()
+
+
+def is_tenant_indexed(info) -> bool:
+    field = (info.payload_schema or {}).get("user_id")
+    return bool(field is not None and getattr(field.params, "is_tenant", False))
+
+
+def optimizers_config() -> OptimizersConfigDiff:
+    return OptimizersConfigDiff(
+        indexing_threshold=QDRANT_INDEXING_THRESHOLD,
+        default_segment_number=QDRANT_DEFAULT_SEGMENTS or None,
+    )
+
+
+def bootstrap_collection(client, collection_name: str) -> dict:
+    profile = storage_profile()
+    created = False
+    if not client.collection_exists(collection_name):
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=vectors_config(profile),
+            sparse_vectors_config=sparse_vectors_config(profile),
+            hnsw_config=hnsw_config(),
+            optimizers_config=optimizers_config(),
+            quantization_config=quantization_config(profile),
+            on_disk_payload=profile["payload_on_disk"],
+            sharding_method=ShardingMethod.CUSTOM if sharding_enabled() else None,
+        )
+        created = True
+        logger.info(
+            "Created Qdrant collection '%s' (size=%s, distance=%s, storage=%s)",
+            collection_name, QDRANT_VECTOR_SIZE, QDRANT_DISTANCE, profile["name"],
+        )
+
+    info = client.get_collection(collection_name)
+    vectors = info.config.params.vectors
+    size = getattr(vectors, "size", None)
+    if size is not None and size != QDRANT_VECTOR_SIZE:
+        raise ValueError(
+            f"Qdrant collection '{collection_name}' has vector size {size}, expected {QDRANT_VECTOR_SIZE}"
+        )
+
+    if not created and not storage_matches(info, profile):
+        logger.warning(
+            "Qdrant collection '%s' storage %s does not match profile '%s'; "
+            "run `python -m db.qdrant.migrate storage --profile %s` to convert it",
+            collection_name, describe_storage(info), profile["name"], profile["name"],
+        )
+
+    sparse = has_sparse_vector(info)
+    if QDRANT_SPARSE_ENABLED and not sparse:
+        logger.warning(
+            "Qdrant collection '%s' has no '%s' sparse vector, search stays dense-only; "
+            "run `python -m db.qdrant.migrate hybrid --copy-to <new collection>` to enable hybrid retrieval",
+            collection_name, SPARSE_VECTOR_NAME,
+        )
+
+    if sharding_enabled():
+        if info.config.params.sharding_method != ShardingMethod.CUSTOM:
+            raise ValueError(
+                f"QDRANT_SHARD_GROUPS is set but collection '{collection_name}' is not custom-sharded; "
+                "run `python -m db.qdrant.migrate tenants --copy-to <new collection>` and point QDRANT_COLLECTION at it"
+            )
+        ensure_shard_keys(client, collection_name)
+
+    if "user_id" in (info.payload_schema or {}) and not is_tenant_indexed(info):
+        logger.warning(
+            "Qdrant collection '%s' has a plain user_id index; run `python -m db.qdrant.migrate tenants` "
+            "to switch it to a tenant index",
+            collection_name,
+        )
+
+    indexed = set((info.payload_schema or {}).keys())
+    for field, schema in PAYLOAD_INDEXES.items():
+        if field in indexed:
+            continue
+        client.create_payload_index(collection_name, field, field_schema=schema, wait=True)
+        indexed.add(field)
+        logger.info("Created payload index on '%s.%s'", collection_name, field)
+
+    return {
+        "collection": collection_name,
+        "created": created,
+        "storage_profile": profile["name"],
+        "storage": describe_storage(info),
+        "payload_indexes": sorted(indexed),
+        "shard_keys": all_shard_keys(),
+        "sparse_vector": SPARSE_VECTOR_NAME if sparse and QDRANT_SPARSE_ENABLED else None,
+    }
+
+
+def cached_schema_state(collection_name: str):
+    return _state.get(collection_name)
+
+
+def ensure_collection(client, collection_name: str) -> dict:
+    # Only the first call (normally the startup bootstrap) talks to Qdrant; after that the
+    # cached state is returned, so request paths never probe the schema.
+    state = _state.get(collection_name)
+    if state is not None:
+        return state
+    with _lock:
+        state = _state.get(collection_name)
+        if state is None:
+            state = bootstrap_collection(client, collection_name)
+            _state[collection_name] = state
+    return state
+
+
+def reset_schema_state(collection_name: str = None):
+    with _lock:
+        if collection_name is None:
+            _state.clear()
+        else:
+            _state.pop(collection_name, None)
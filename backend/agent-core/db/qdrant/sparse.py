@@ -0,0 +1,81 @@
+import os
+import re
+import zlib
+from collections import Counter
+
+from qdrant_client.models import SparseVector
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+# Chunks fill the model window (~250 word-pieces), roughly 120 terms once stopwords are dropped;
+# used as the BM25 average document length.
+BM25_AVG_DOC_LEN = float(os.getenv("BM25_AVG_DOC_LEN", "120"))
+
+# Identifiers such as SKU-4821, ERR_503, v2.1.0 or +91-98765-43210 are kept whole (plus their parts).
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./+:#][a-z0-9]+)*")
+SPLIT_RE = re.compile(r"[-_./+:#]")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "what which who how when where why do does did can could should would i you he she we they me my our your".split()
+)
+
+
+def _term_id(term: str) -> int:
+    return zlib.crc32(term.encode()) & 0x7FFFFFFF
+
+
+def tokenize(text: str) -> list:
+    terms = []
+    for match in TOKEN_RE.finditer((text or "").lower()):
+        token = match.group()
+        parts = SPLIT_RE.split(token)
+        if len(parts) > 1:
+            terms.append(token)
+            if any(part.isdigit() for part in parts):
+                # Phone numbers and codes are often typed without separators.
+                terms.append("".join(parts))
+            if all(part.isdigit() for part in parts):
+                # ...and without their country / area prefix.
+                terms.extend("".join(parts[i:]) for i in range(1, len(parts) - 1))
+            terms.extend(part for part in parts if part not in STOPWORDS)
+        elif token not in STOPWORDS:
+            terms.append(token)
+    return terms
+
+
+def is_identifier(term: str) -> bool:
+    return any(ch.isdigit() for ch in term)
+
+
+def is_lexical_query(text: str) -> bool:
+    # Queries made only of codes/numbers gain nothing from the dense model.
+    tokens = [match.group() for match in TOKEN_RE.finditer((text or "").lower()) if match.group() not in STOPWORDS]
+    return bool(tokens) and all(is_identifier(token) for token in tokens)
+
+
+def _to_sparse(weights: dict) -> SparseVector:
+    merged = {}
+    for term, weight in weights.items():
+        term_id = _term_id(term)
+        merged[term_id] = merged.get(term_id, 0.0) + weight
+    indices = sorted(merged)
+    return SparseVector(indices=indices, values=[merged[i] for i in indices])
+
+
+def encode_document(text: str) -> SparseVector:
+    # Only the term-frequency half of BM25 is computed here; the collection applies IDF
+    # (Modifier.IDF) at query time, so weights stay valid as the corpus changes.
+    terms = tokenize(text)
+    if not terms:
+        return SparseVector(indices=[], values=[])
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / BM25_AVG_DOC_LEN)
+    return _to_sparse({term: tf * (BM25_K1 + 1) / (tf + norm) for term, tf in Counter(terms).items()})
+
+
+def encode_documents(texts: list) -> list:
+    return [encode_document(text) for text in texts]
+
+
+def encode_query(text: str) -> SparseVector:
+    return _to_sparse({term: 1.0 for term in set(tokenize(text))})
@@ -1,12 +1,39 @@
+import logging
 import os
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, inspect, select
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# 0 disables pooling (NullPool), e.g. behind Supabase's transaction-mode pooler which pools itself.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle connections before the server or a proxy drops them as idle.
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+
+def engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool class per URL; sizing does not apply.
+        return options
+    if DB_POOL_SIZE <= 0:
+        return {"poolclass": NullPool}
+    return {
+        **options,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
 
-engine = create_engine(DATABASE_URL) if DATABASE_URL else None
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL)) if DATABASE_URL else None
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine else None
 Base = declarative_base()
 
@@ -35,4 +62,27 @@ def get_db_session():
 def init_db():
     if engine is None:
         return
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so indexes declared after a table was created are added
+    # here. A failure is raised: upserts rely on the unique ones as their conflict targets.
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            with engine.begin() as connection:
+                if index.unique:
+                    _drop_duplicates(connection, table, list(index.columns))
+                index.create(bind=connection)
+            logger.info("Created index %s on %s", index.name, table.name)
+
+
+def _drop_duplicates(connection, table, columns: list):
+    # Rows written before the unique index existed (e.g. racing select-then-insert upserts);
+    # the oldest row of each group is kept.
+    key = list(table.primary_key.columns)[0]
+    keep = select(func.min(key)).group_by(*columns).scalar_subquery()
+    deleted = connection.execute(table.delete().where(key.not_in(keep))).rowcount
+    if deleted:
+        logger.warning("Removed %s duplicate rows from %s before creating its unique index", deleted, table.name)
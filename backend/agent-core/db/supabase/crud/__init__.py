@@ -4,8 +4,31 @@ from .userSource_crud import (
     get_user_sources,
     delete_user_source,
     upsert_user_source,
+    delete_user_sources_by_source_id,
     get_source_ids_by_type,
 )
+from .ingestionJob_crud import (
+    create_ingestion_job,
+    get_ingestion_job,
+    update_ingestion_job,
+    get_claimable_ingestion_job_ids,
+    claim_ingestion_job,
+    renew_ingestion_job_leases,
+)
+from .sourcePage_crud import (
+    get_source_pages,
+    upsert_source_page,
+    delete_source_pages,
+)
+from .sourceContent_crud import (
+    get_source_content,
+    get_source_content_chunks,
+    start_source_content,
+    add_source_content_chunks,
+    finish_source_content,
+    touch_source_content,
+    delete_source_content,
+)
 
 __all__ = [
     "create_user_source",
@@ -13,5 +36,22 @@ __all__ = [
     "get_user_sources",
     "delete_user_source",
     "upsert_user_source",
+    "delete_user_sources_by_source_id",
     "get_source_ids_by_type",
+    "create_ingestion_job",
+    "get_ingestion_job",
+    "update_ingestion_job",
+    "get_claimable_ingestion_job_ids",
+    "claim_ingestion_job",
+    "renew_ingestion_job_leases",
+    "get_source_pages",
+    "upsert_source_page",
+    "delete_source_pages",
+    "get_source_content",
+    "get_source_content_chunks",
+    "start_source_content",
+    "add_source_content_chunks",
+    "finish_source_content",
+    "touch_source_content",
+    "delete_source_content",
 ]
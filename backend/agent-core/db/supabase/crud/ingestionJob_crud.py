@@ -0,0 +1,83 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from ..models.ingestionJob import IngestionJob
+from datetime import datetime
+
+
+def create_ingestion_job(
+    db: Session,
+    job_id: str,
+    user_id: str,
+    source_type: str,
+    source_title: str = None,
+    source_url: str = None,
+    payload: bytes = None,
+):
+    job = IngestionJob(
+        id=job_id,
+        user_id=user_id,
+        source_type=source_type,
+        source_title=source_title,
+        source_url=source_url,
+        payload=payload,
+        status="queued",
+        stage="queued",
+        chunks_embedded=0,
+        points_upserted=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_ingestion_job(db: Session, job_id: str):
+    return db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+
+
+def update_ingestion_job(db: Session, job_id: str, **fields):
+    fields["updated_at"] = datetime.utcnow()
+    updated = db.query(IngestionJob).filter(IngestionJob.id == job_id).update(fields)
+    db.commit()
+    return updated > 0
+
+
+def _claimable(stale_before: datetime, queued_before: datetime = None):
+    # Queued jobs, and running jobs whose worker stopped renewing the lease (updated_at).
+    queued = IngestionJob.status == "queued"
+    if queued_before is not None:
+        queued = and_(queued, IngestionJob.updated_at < queued_before)
+    return or_(queued, and_(IngestionJob.status == "running", IngestionJob.updated_at < stale_before))
+
+
+def get_claimable_ingestion_job_ids(db: Session, stale_before: datetime, queued_before: datetime = None):
+    results = (
+        db.query(IngestionJob.id)
+        .filter(_claimable(stale_before, queued_before))
+        .order_by(IngestionJob.created_at)
+        .all()
+    )
+    return [result[0] for result in results]
+
+
+def claim_ingestion_job(db: Session, job_id: str, stale_before: datetime) -> bool:
+    # A single conditional UPDATE: of several workers or processes racing for the same job,
+    # exactly one sees a row count of 1.
+    claimed = db.query(IngestionJob).filter(
+        IngestionJob.id == job_id, _claimable(stale_before)
+    ).update(
+        {IngestionJob.status: "running", IngestionJob.updated_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+    db.commit()
+    return claimed == 1
+
+
+def renew_ingestion_job_leases(db: Session, job_ids: list):
+    if not job_ids:
+        return 0
+    renewed = db.query(IngestionJob).filter(
+        IngestionJob.id.in_(job_ids), IngestionJob.status == "running"
+    ).update({IngestionJob.updated_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return renewed
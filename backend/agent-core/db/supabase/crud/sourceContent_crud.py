@@ -0,0 +1,83 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.sourceContent import SourceContent, SourceContentChunk
+from datetime import datetime
+
+
+def get_source_content(db: Session, content_hash: str):
+    return db.query(SourceContent).filter(SourceContent.content_hash == content_hash).first()
+
+
+def get_source_content_chunks(db: Session, content_hash: str, start: int, limit: int):
+    return db.query(SourceContentChunk).filter(
+        SourceContentChunk.content_hash == content_hash,
+        SourceContentChunk.chunk_index >= start,
+        SourceContentChunk.chunk_index < start + limit
+    ).order_by(SourceContentChunk.chunk_index).all()
+
+
+def start_source_content(
+    db: Session,
+    content_hash: str,
+    source_type: str,
+    embedding_model: str,
+    chunking: str,
+    dimension: int,
+):
+    # Replaces any previous entry, e.g. one built with another model or chunk size. chunk_count
+    # stays 0 until finish_source_content, so lookups skip entries that are still being written.
+    delete_source_content(db, content_hash, commit=False)
+    content = SourceContent(
+        content_hash=content_hash,
+        source_type=source_type,
+        embedding_model=embedding_model,
+        chunking=chunking,
+        dimension=dimension,
+        chunk_count=0,
+    )
+    db.add(content)
+    db.commit()
+    return content
+
+
+def add_source_content_chunks(db: Session, content_hash: str, start: int, chunks: list, embeddings: list):
+    db.bulk_insert_mappings(SourceContentChunk, [
+        {"content_hash": content_hash, "chunk_index": start + offset, "text": text, "embedding": embedding}
+        for offset, (text, embedding) in enumerate(zip(chunks, embeddings))
+    ])
+    db.commit()
+
+
+def finish_source_content(db: Session, content_hash: str, chunk_count: int) -> bool:
+    # Only an entry holding every chunk is published; a concurrent writer of the same bytes may
+    # have replaced this one meanwhile.
+    stored = db.query(func.count(SourceContentChunk.chunk_index)).filter(
+        SourceContentChunk.content_hash == content_hash
+    ).scalar()
+    if stored != chunk_count:
+        return False
+    db.query(SourceContent).filter(SourceContent.content_hash == content_hash).update(
+        {SourceContent.chunk_count: chunk_count}, synchronize_session=False
+    )
+    db.commit()
+    return True
+
+
+def touch_source_content(db: Session, content_hash: str):
+    db.query(SourceContent).filter(SourceContent.content_hash == content_hash).update(
+        {SourceContent.hits: SourceContent.hits + 1, SourceContent.last_used_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def delete_source_content(db: Session, content_hash: str, commit: bool = True):
+    db.query(SourceContentChunk).filter(SourceContentChunk.content_hash == content_hash).delete(
+        synchronize_session=False
+    )
+    deleted = db.query(SourceContent).filter(SourceContent.content_hash == content_hash).delete(
+        synchronize_session=False
+    )
+    if commit:
+        db.commit()
+    return deleted
@@ -0,0 +1,44 @@
+from sqlalchemy.orm import Session
+from ..models.sourcePage import SourcePage
+from datetime import datetime
+
+
+def get_source_pages(db: Session, user_id: str, source_id: str):
+    return db.query(SourcePage).filter(
+        SourcePage.user_id == user_id,
+        SourcePage.source_id == source_id
+    ).all()
+
+
+def upsert_source_page(db: Session, user_id: str, source_id: str, url: str, commit: bool = True, **fields):
+    page = db.query(SourcePage).filter(
+        SourcePage.user_id == user_id,
+        SourcePage.source_id == source_id,
+        SourcePage.url == url
+    ).first()
+
+    if page is None:
+        page = SourcePage(user_id=user_id, source_id=source_id, url=url)
+        db.add(page)
+
+    for key, value in fields.items():
+        setattr(page, key, value)
+    page.updated_at = datetime.utcnow()
+
+    if commit:
+        db.commit()
+    return page
+
+
+def delete_source_pages(db: Session, user_id: str, source_id: str, urls: list = None):
+    query = db.query(SourcePage).filter(
+        SourcePage.user_id == user_id,
+        SourcePage.source_id == source_id
+    )
+    if urls is not None:
+        if not urls:
+            return 0
+        query = query.filter(SourcePage.url.in_(urls))
+    deleted = query.delete(synchronize_session=False)
+    db.commit()
+    return deleted
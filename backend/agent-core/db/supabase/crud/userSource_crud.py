@@ -1,3 +1,5 @@
+from sqlalchemy import literal_column
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from ..models.userModel import UserSource
 from datetime import datetime
@@ -38,17 +40,66 @@ def delete_user_source(db: Session, user_id: str, source_id: str, source_title:s
     return False
 
 
+INSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _upsert_statement(dialect: str, user_id: str, source_id: str, source_title: str, source_type: str, now: datetime):
+    statement = INSERT_DIALECTS[dialect](UserSource).values(
+        user_id=user_id,
+        source_id=source_id,
+        source_title=source_title,
+        source_type=source_type,
+        created_at=now,
+        updated_at=now,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "source_id", "source_title"],
+        set_={"source_type": source_type, "updated_at": now},
+    )
+    if dialect == "postgresql":
+        # xmax is 0 only on a freshly inserted row; the conflict update stamps it with its transaction id.
+        return statement.returning(UserSource, literal_column("xmax = 0"))
+    return statement.returning(UserSource)
+
+
 def upsert_user_source(db: Session, user_id: str, source_id: str, source_title:str, source_type: str = "pdf"):
-    existing = get_user_source(db, user_id, source_id, source_title)
-    
-    if existing:
-        existing.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(existing)
-        return existing, False
-    else:
-        new_source = create_user_source(db, user_id, source_id, source_title, source_type)
-        return new_source, True
+    dialect = db.get_bind().dialect.name
+    if dialect not in INSERT_DIALECTS:
+        existing = get_user_source(db, user_id, source_id, source_title)
+        if existing:
+            existing.source_type = source_type
+            existing.updated_at = datetime.utcnow()
+            db.commit()
+            db.refresh(existing)
+            return existing, False
+        return create_user_source(db, user_id, source_id, source_title, source_type), True
+
+    existed = None
+    if dialect != "postgresql":
+        # SQLite has no xmax, so look for the row first, inside the same transaction as the upsert.
+        existed = db.query(UserSource.id).filter(
+            UserSource.user_id == user_id,
+            UserSource.source_id == source_id,
+            UserSource.source_title == source_title
+        ).first() is not None
+
+    # INSERT ... ON CONFLICT DO UPDATE ... RETURNING writes and reads the row in one round trip.
+    statement = _upsert_statement(dialect, user_id, source_id, source_title, source_type, datetime.utcnow())
+    row = db.execute(statement, execution_options={"populate_existing": True}).one()
+    user_source = row[0]
+    # Detached with its loaded state, so the commit does not expire it into another SELECT.
+    db.expunge(user_source)
+    db.commit()
+    return user_source, row[1] if existed is None else not existed
+
+
+def delete_user_sources_by_source_id(db: Session, user_id: str, source_id: str) -> int:
+    deleted = db.query(UserSource).filter(
+        UserSource.user_id == user_id,
+        UserSource.source_id == source_id
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
 
 
 def get_source_ids_by_type(db: Session, user_id: str, source_type: str):
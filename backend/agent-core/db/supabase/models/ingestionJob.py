@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, LargeBinary, JSON, Enum as SQLEnum
+from datetime import datetime
+
+from db.supabase.connectDB import Base
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False, index=True)
+    source_type = Column(
+        SQLEnum("website", "pdf", name="source_type_enum"),
+        nullable=False
+    )
+    source_title = Column(String, nullable=True)
+    source_url = Column(String, nullable=True)
+    source_id = Column(String, nullable=True)
+    status = Column(
+        SQLEnum("queued", "running", "succeeded", "failed", name="ingestion_job_status_enum"),
+        nullable=False,
+        default="queued",
+        index=True,
+    )
+    stage = Column(String, nullable=False, default="queued")
+    chunks_embedded = Column(Integer, nullable=False, default=0)
+    points_upserted = Column(Integer, nullable=False, default=0)
+    # Uploaded PDF bytes are kept until the job finishes so queued jobs survive a restart.
+    payload = Column(LargeBinary, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<IngestionJob(id={self.id}, user_id={self.user_id}, status={self.status}, stage={self.stage})>"
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, LargeBinary, ForeignKey
+from datetime import datetime
+
+from db.supabase.connectDB import Base
+
+
+class SourceContent(Base):
+    __tablename__ = "source_contents"
+
+    # Full sha256 of the uploaded bytes. PDF source_ids are this hash, so the user_sources rows of
+    # every tenant that uploaded the same file link to a single entry.
+    content_hash = Column(String(64), primary_key=True)
+    source_type = Column(String, nullable=False)
+    embedding_model = Column(String, nullable=False)
+    chunking = Column(String, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SourceContent(content_hash={self.content_hash}, chunks={self.chunk_count}, hits={self.hits})>"
+
+
+class SourceContentChunk(Base):
+    __tablename__ = "source_content_chunks"
+
+    content_hash = Column(
+        String(64), ForeignKey("source_contents.content_hash", ondelete="CASCADE"), primary_key=True
+    )
+    chunk_index = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    # float32 vector, dimension taken from the parent entry.
+    embedding = Column(LargeBinary, nullable=False)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from datetime import datetime
+
+from db.supabase.connectDB import Base
+
+
+class SourcePage(Base):
+    __tablename__ = "source_pages"
+    __table_args__ = (
+        UniqueConstraint("user_id", "source_id", "url", name="uq_source_pages_user_source_url"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False, index=True)
+    source_id = Column(String, nullable=False, index=True)
+    url = Column(String, nullable=False)
+    title = Column(String, nullable=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
+    links = Column(JSON, nullable=True)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SourcePage(user_id={self.user_id}, source_id={self.source_id}, url={self.url})>"
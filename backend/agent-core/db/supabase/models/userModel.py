@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Index, Enum as SQLEnum
 from datetime import datetime, timezone
 
 from db.supabase.connectDB import Base
@@ -15,6 +15,10 @@ class User(Base):
 
 class UserSource(Base):
     __tablename__ = "user_sources"
+    __table_args__ = (
+        # Conflict target of upsert_user_source's INSERT ... ON CONFLICT.
+        Index("uq_user_sources_user_source_title", "user_id", "source_id", "source_title", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(String, nullable=False, index=True)
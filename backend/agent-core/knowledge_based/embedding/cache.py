@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Relative paths resolve against the agent-core directory, not the process CWD.
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+EMBED_CACHE_PATH = os.path.join(APP_ROOT, os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite3"))
+EMBED_CACHE_MAX_MB = float(os.getenv("EMBED_CACHE_MAX_MB", "1024"))
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "1") == "1"
+
+# SQLite caps the number of bound parameters per statement.
+_QUERY_BATCH = 500
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+
+    def _connect(self):
+        # Opened on first use (under _lock) so importing the engine never touches the disk.
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        conn.commit()
+        self._total_bytes = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        self._conn = conn
+        logger.info("Embedding cache opened at %s (%s bytes)", self.path, self._total_bytes)
+        return conn
+
+    def get_many(self, keys: list) -> dict:
+        found = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            for i in range(0, len(keys), _QUERY_BATCH):
+                batch = keys[i:i + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, dim, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).reshape(dim)
+                if rows:
+                    conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key, _, _ in rows],
+                    )
+            conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, keys: list, vectors: np.ndarray):
+        if not keys:
+            return
+        now = time.time()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows = [(key, vector.shape[0], vector.tobytes(), now) for key, vector in zip(keys, vectors)]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            self._total_bytes += sum(len(row[2]) for row in rows)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Trim to 90% of the budget so eviction is not triggered on every insert.
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access LIMIT ?", (_QUERY_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                if self._total_bytes <= target:
+                    break
+                victims.append((key,))
+                self._total_bytes -= size
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+            evicted += len(victims)
+        self._conn.commit()
+        logger.info("Evicted %s cached embeddings (%s bytes remain)", evicted, self._total_bytes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "path": self.path,
+            }
+
+
+cache = EmbeddingCache(EMBED_CACHE_PATH, int(EMBED_CACHE_MAX_MB * 1024 * 1024)) if EMBED_CACHE_ENABLED else None
@@ -0,0 +1,138 @@
+import bisect
+import os
+import re
+
+from .engine import models
+
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+
+# A sentence ends at . ! ? (plus any closing quote/bracket) followed by whitespace, or at a blank line.
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n+")
+
+
+def model_max_tokens() -> int:
+    # The model silently truncates beyond max_seq_length; [CLS] and [SEP] take two of those slots.
+    return models.get().max_seq_length - 2
+
+
+def max_chunk_tokens() -> int:
+    return max(1, min(CHUNK_MAX_TOKENS, model_max_tokens()))
+
+
+def token_offsets(text: str) -> list:
+    return models.get().tokenizer(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+        verbose=False,
+    )["offset_mapping"]
+
+
+def count_tokens(text: str) -> int:
+    return len(token_offsets(text))
+
+
+def sentence_spans(text: str) -> list:
+    spans = []
+    start = 0
+    for match in SENTENCE_END_RE.finditer(text):
+        _append_span(spans, text, start, match.start() + len(match.group().rstrip()))
+        start = match.end()
+    _append_span(spans, text, start, len(text))
+    return spans
+
+
+def _append_span(spans: list, text: str, start: int, end: int):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        spans.append((start, end))
+
+
+def _chunk(text: str, page: int, start: int, end: int, tokens: int) -> dict:
+    return {"text": text[start:end], "page": page, "start": start, "end": end, "tokens": tokens}
+
+
+def _split_long(text: str, page: int, offsets: list, first: int, last: int, max_tokens: int, overlap: int):
+    # A single "sentence" longer than the window (tables, URLs, run-on extraction output) is cut on
+    # token boundaries, preferring positions where a new word starts so the pieces re-tokenize identically.
+    def word_start(i):
+        return i == 0 or offsets[i][0] != offsets[i - 1][1]
+
+    while first < last:
+        stop = min(first + max_tokens, last)
+        if stop < last:
+            cut = stop
+            while cut > first + 1 and not word_start(cut):
+                cut -= 1
+            if cut > first + 1:
+                stop = cut
+        start, end = offsets[first][0], offsets[stop - 1][1]
+        clean_cut = word_start(first) and (stop == last or word_start(stop))
+        while not clean_cut and stop - first > 1 and count_tokens(text[start:end]) > max_tokens:
+            stop -= 1
+            end = offsets[stop - 1][1]
+        yield _chunk(text, page, start, end, stop - first)
+        if stop >= last:
+            return
+        nxt = max(stop - overlap, first + 1)
+        while nxt < stop and not word_start(nxt):
+            nxt += 1
+        first = nxt
+
+
+def chunk_page(text: str, page: int = 0, max_tokens: int = None, overlap: int = CHUNK_OVERLAP_TOKENS):
+    max_tokens = max_tokens or max_chunk_tokens()
+    overlap = min(overlap, max_tokens // 2)
+    offsets = token_offsets(text)
+    if not offsets:
+        return
+    token_starts = [start for start, _ in offsets]
+
+    def token_index(char_pos):
+        return bisect.bisect_left(token_starts, char_pos)
+
+    def tokens_between(start, end):
+        return token_index(end) - token_index(start)
+
+    spans = sentence_spans(text)
+    i = 0
+    while i < len(spans):
+        start = spans[i][0]
+        if tokens_between(start, spans[i][1]) > max_tokens:
+            yield from _split_long(
+                text, page, offsets, token_index(start), token_index(spans[i][1]), max_tokens, overlap
+            )
+            i += 1
+            continue
+
+        # Greedily pack whole sentences; the chunk is a slice of the page, never a re-join.
+        j = i
+        while j + 1 < len(spans) and tokens_between(start, spans[j + 1][1]) <= max_tokens:
+            j += 1
+        end = spans[j][1]
+        yield _chunk(text, page, start, end, tokens_between(start, end))
+        if j + 1 >= len(spans):
+            return
+
+        # Carry trailing whole sentences (up to `overlap` tokens) into the next chunk.
+        k = j + 1
+        while k - 1 > i and tokens_between(spans[k - 1][0], end) <= overlap:
+            k -= 1
+        i = k
+
+
+def chunk_pages(pages, max_tokens: int = None, overlap: int = CHUNK_OVERLAP_TOKENS):
+    # Chunks never cross a page, so every chunk maps back to one page and a character range in it.
+    for page, text in enumerate(pages):
+        if text:
+            yield from chunk_page(text, page, max_tokens, overlap)
+
+
+def chunk_text(text: str, max_tokens: int = None, overlap: int = CHUNK_OVERLAP_TOKENS) -> list:
+    return [chunk["text"] for chunk in chunk_page(text or "", 0, max_tokens, overlap)]
@@ -0,0 +1,379 @@
+import logging
+import os
+import platform
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from .cache import cache, cache_key
+from .workers import EmbeddingWorkerPool
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+# torch: the PyTorch SentenceTransformer; onnx: an int8-quantized ONNX export run by ONNX Runtime.
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+# Empty picks the quantized export shipped with the model that matches this CPU.
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE", "")
+# 0 leaves the runtime default (one thread per core).
+EMBED_INTRA_OP_THREADS = int(os.getenv("EMBED_INTRA_OP_THREADS", "0"))
+EMBED_WARMUP_BATCHES = int(os.getenv("EMBED_WARMUP_BATCHES", "2"))
+# >0 encodes in that many forked worker processes, each pinned to its own slice of cores.
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "0"))
+# Intra-op threads per worker; 0 gives each worker one thread per core in its slice.
+EMBED_WORKER_THREADS = int(os.getenv("EMBED_WORKER_THREADS", "0"))
+# After this many worker pools in a row break (workers crash or cannot load the model), the
+# engine gives up on worker processes and encodes in-process.
+EMBED_WORKER_MAX_RESTARTS = int(os.getenv("EMBED_WORKER_MAX_RESTARTS", "3"))
+
+
+def _cpu_flags() -> set:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def onnx_quantized_file() -> str:
+    # all-MiniLM-L6-v2 publishes dynamic int8 exports per instruction set next to the fp32 one.
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    flags = _cpu_flags()
+    if "avx512_vnni" in flags:
+        return "onnx/model_qint8_avx512_vnni.onnx"
+    if "avx512f" in flags:
+        return "onnx/model_qint8_avx512.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+def model_id(backend: str = EMBED_BACKEND, onnx_file: str = EMBED_ONNX_FILE) -> str:
+    # Keys the embedding cache and content registry, so vectors from different backends never mix.
+    if backend == "onnx":
+        return f"{MODEL_NAME}/{onnx_file or onnx_quantized_file()}"
+    return MODEL_NAME
+
+
+def load_model(backend: str = EMBED_BACKEND, threads: int = EMBED_INTRA_OP_THREADS, onnx_file: str = EMBED_ONNX_FILE):
+    # Both backends keep the model's pooling and normalisation modules, so vectors stay
+    # 384-dimensional unit vectors compatible with the existing collection.
+    if backend == "torch":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return SentenceTransformer(MODEL_NAME)
+    if backend == "onnx":
+        try:
+            import onnxruntime
+        except ImportError as e:
+            # Not in the lock: optimum-onnx would pin transformers below 5.x for every install.
+            raise ImportError('EMBED_BACKEND=onnx needs uv pip install "optimum-onnx[onnxruntime]"') from e
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        # Batches are encoded one at a time by the engine thread; parallelism is intra-op only.
+        options.inter_op_num_threads = 1
+        return SentenceTransformer(
+            MODEL_NAME,
+            backend="onnx",
+            model_kwargs={
+                "file_name": onnx_file or onnx_quantized_file(),
+                "provider": "CPUExecutionProvider",
+                "session_options": options,
+            },
+        )
+    raise ValueError(f"Unknown EMBED_BACKEND '{backend}': expected torch or onnx")
+
+
+class ModelRegistry:
+    # The one model instance of the process. Nothing is loaded at import time: the first get()
+    # (normally the lifespan warm-up) loads it, every later caller shares it.
+    def __init__(self, backend: str = EMBED_BACKEND, threads: int = EMBED_INTRA_OP_THREADS):
+        self.backend = backend
+        self.threads = threads
+        self._model = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.load_ms = None
+        self.warmup_ms = None
+        self.error = None
+
+    def get(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                start = time.perf_counter()
+                self._model = load_model(self.backend, self.threads)
+                self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+                logger.info("Embedding model %s loaded in %s ms (backend=%s)", MODEL_ID, self.load_ms, self.backend)
+        return self._model
+
+    def warm_up(self, engine, batches: int = EMBED_WARMUP_BATCHES):
+        # Full-size batches of window-length text, so the first real request finds the weights
+        # paged in, the thread pools started and the largest activation buffers already allocated.
+        try:
+            model = self.get()
+            start = time.perf_counter()
+            text = " ".join(["warm-up"] * model.max_seq_length)
+            # Submitted at once, so with worker processes every worker gets a batch.
+            engine.encode([text] * engine.batch_size * max(1, batches, engine.workers))
+            self.warmup_ms = round((time.perf_counter() - start) * 1000, 1)
+            self.error = None
+            self._ready.set()
+            logger.info("Embedding model warmed up in %s ms", self.warmup_ms)
+        except Exception as e:
+            self.error = str(e)
+            logger.exception("Embedding model warm-up failed")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def load_in_worker(self, threads: int):
+        return load_model(self.backend, threads)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "model": MODEL_ID,
+            "backend": self.backend,
+            "loaded": self._model is not None,
+            "load_ms": self.load_ms,
+            "warmup_ms": self.warmup_ms,
+            "error": self.error,
+        }
+
+
+class _EncodeRequest:
+    def __init__(self, texts: list):
+        self.texts = texts
+        self.taken = 0
+        self.filled = 0
+        self.vectors = None
+        self.future = Future()
+
+
+# Callers block in encode() while one background thread builds batches from the waiting
+# requests, waiting at most max_wait_ms for chunks from other requests before running a shared
+# forward pass. Each batch takes from the requests in turn, so a small request is never queued
+# behind the whole of a large one; priority requests (search queries) go before all of them.
+class EmbeddingEngine:
+    def __init__(
+        self,
+        load_model,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_wait_ms: float = EMBED_MAX_WAIT_MS,
+        workers: int = EMBED_WORKERS,
+        worker_threads: int = EMBED_WORKER_THREADS,
+        reload_in_worker=None,
+    ):
+        self._load_model = load_model
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.workers = max(0, workers)
+        self.worker_threads = worker_threads
+        self._reload_in_worker = reload_in_worker
+        self._pool = None
+        self._pool_failures = 0
+        self._priority = deque()
+        self._requests = deque()
+        self._queued = 0
+        self._ready = threading.Condition()
+        self._deliver_lock = threading.Lock()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return self._load_model()
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: list, priority: bool = False) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        self._ensure_started()
+
+        request = _EncodeRequest(texts)
+        with self._ready:
+            (self._priority if priority else self._requests).append(request)
+            self._queued += len(texts)
+            self._ready.notify()
+        return request.future.result()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-engine", daemon=True)
+                self._thread.start()
+
+    def _take(self, space: int) -> list:
+        # Round-robin: a request that still has chunks left after its share goes to the back.
+        pending = []
+        for requests in (self._priority, self._requests):
+            while space and requests:
+                request = requests.popleft()
+                remaining = len(request.texts) - request.taken
+                if request.future.done():
+                    # An earlier batch of this request failed; drop the rest of it.
+                    self._queued -= remaining
+                    continue
+                count = min(space, remaining)
+                pending.append((request, request.taken, count))
+                request.taken += count
+                self._queued -= count
+                space -= count
+                if count < remaining:
+                    requests.append(request)
+        return pending
+
+    def _collect_batch(self):
+        with self._ready:
+            while True:
+                while not self._queued:
+                    self._ready.wait()
+                deadline = time.monotonic() + self.max_wait
+                while self._queued < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._ready.wait(timeout)
+                pending = self._take(self.batch_size)
+                if pending:
+                    return pending
+
+    def _worker_pool(self):
+        # Created by start_workers() at startup or else before the first batch, so the parent never
+        # runs a forward pass before forking.
+        with self._lock:
+            if self.workers <= 0:
+                return None
+            if self._pool is not None and not self._pool.broken:
+                return self._pool
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+                self._pool_failures += 1
+                if self._pool_failures >= EMBED_WORKER_MAX_RESTARTS:
+                    logger.error("Embedding worker pool broke %s times in a row, encoding in-process", self._pool_failures)
+                    self.workers = 0
+                    return None
+                logger.warning("Embedding worker pool broke, starting a new one")
+            try:
+                self._pool = EmbeddingWorkerPool(
+                    self.model, self.workers, self.worker_threads, self._reload_in_worker, self.batch_size
+                )
+            except Exception:
+                logger.exception("Failed to start embedding workers, encoding in-process")
+                self.workers = 0
+                self._pool = None
+            return self._pool
+
+    def start_workers(self):
+        # Forks the workers now rather than on the first batch. Call it before the process starts
+        # other threads (gRPC server, Qdrant gRPC channels): the children only ever run the model,
+        # but forking a process with those threads running is not safe in general.
+        return self._worker_pool() is not None
+
+    def _pool_done(self, pending, vectors, error):
+        if error is None:
+            self._pool_failures = 0
+        self._deliver(pending, vectors, error)
+
+    def shutdown_workers(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def _deliver(self, pending, vectors, error):
+        # Batches of one request can finish out of order (worker processes), and on different threads.
+        with self._deliver_lock:
+            if error is not None:
+                logger.error("Embedding batch of %s requests failed: %s", len(pending), error)
+                for request, _, _ in pending:
+                    if not request.future.done():
+                        request.future.set_exception(error)
+                return
+            offset = 0
+            for request, start, count in pending:
+                if request.future.done():
+                    offset += count
+                    continue
+                if request.vectors is None:
+                    request.vectors = np.empty((len(request.texts), vectors.shape[1]), dtype=vectors.dtype)
+                request.vectors[start:start + count] = vectors[offset:offset + count]
+                request.filled += count
+                offset += count
+                if request.filled == len(request.texts):
+                    request.future.set_result(request.vectors)
+
+    def _run(self):
+        while True:
+            pending = self._collect_batch()
+            texts = [text for request, start, count in pending for text in request.texts[start:start + count]]
+
+            pool = self._worker_pool()
+            if pool is not None:
+                # Blocks only while every worker is busy; meanwhile the queue fills the next batch.
+                pool.submit(texts, lambda vectors, error, pending=pending: self._pool_done(pending, vectors, error))
+                continue
+
+            try:
+                vectors = self.model.encode(
+                    texts,
+                    batch_size=self.batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                )
+            except Exception as e:
+                logger.exception("Embedding batch of %s chunks failed", len(texts))
+                self._deliver(pending, None, e)
+                continue
+
+            self._deliver(pending, vectors, None)
+
+
+MODEL_ID = model_id()
+models = ModelRegistry()
+engine = EmbeddingEngine(models.get, reload_in_worker=models.load_in_worker if EMBED_BACKEND == "onnx" else None)
+
+
+def warm_up():
+    models.warm_up(engine)
+
+
+def encode(texts: list) -> np.ndarray:
+    texts = list(texts)
+    if cache is None or not texts:
+        return engine.encode(texts)
+
+    keys = [cache_key(MODEL_ID, text) for text in texts]
+    cached = cache.get_many(list(set(keys)))
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+
+    if missing:
+        vectors = engine.encode(list(missing.values()))
+        cache.put_many(list(missing.keys()), vectors)
+        cached.update(zip(missing.keys(), vectors))
+
+    return np.stack([cached[key] for key in keys])
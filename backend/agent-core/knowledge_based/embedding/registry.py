@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+from db.supabase.connectDB import get_db_session, engine
+from db.supabase.crud import (
+    add_source_content_chunks,
+    finish_source_content,
+    get_source_content,
+    get_source_content_chunks,
+    start_source_content,
+    touch_source_content,
+)
+from .chunking import CHUNK_OVERLAP_TOKENS, max_chunk_tokens
+from .engine import MODEL_ID, EMBED_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+SOURCE_REGISTRY_ENABLED = os.getenv("SOURCE_REGISTRY_ENABLED", "1") == "1"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunking_signature() -> str:
+    return f"tokens:{max_chunk_tokens()}:{CHUNK_OVERLAP_TOKENS}"
+
+
+def registry_enabled() -> bool:
+    return SOURCE_REGISTRY_ENABLED and engine is not None
+
+
+def lookup(digest: str):
+    # Entries built with another model or chunk size are ignored and rebuilt on the next upload.
+    with get_db_session() as db:
+        entry = get_source_content(db, digest)
+        if entry is None or entry.embedding_model != MODEL_ID or entry.chunking != chunking_signature():
+            return None
+        if not entry.chunk_count:
+            # Still being written by another upload, or left behind by one that failed.
+            return None
+        touch_source_content(db, digest)
+        return {"chunk_count": entry.chunk_count, "dimension": entry.dimension}
+
+
+def _stored_batches(digest: str, entry: dict, batch_size: int):
+    # A short session per batch so slow consumers (the Qdrant upsert) do not pin a connection.
+    for start in range(0, entry["chunk_count"], batch_size):
+        with get_db_session() as db:
+            rows = get_source_content_chunks(db, digest, start, batch_size)
+            chunks = [row.text for row in rows]
+            embeddings = np.frombuffer(b"".join(row.embedding for row in rows), dtype=np.float32)
+        yield chunks, embeddings.reshape(len(chunks), entry["dimension"])
+
+
+def _store_batch(digest: str, source_type: str, start: int, chunks: list, embeddings) -> bool:
+    try:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        with get_db_session() as db:
+            if start == 0:
+                start_source_content(db, digest, source_type, MODEL_ID, chunking_signature(), vectors.shape[1])
+            add_source_content_chunks(db, digest, start, chunks, [vector.tobytes() for vector in vectors])
+        return True
+    except Exception as e:
+        # Another upload may be registering the same bytes; the ingest itself carries on regardless.
+        logger.warning("Failed to register content %s: %s", digest, e)
+        return False
+
+
+def _finish(digest: str, chunk_count: int):
+    try:
+        with get_db_session() as db:
+            if finish_source_content(db, digest, chunk_count):
+                logger.info("Registered content %s (%s chunks)", digest, chunk_count)
+                return
+        logger.warning("Content %s was rewritten by another upload, not registering it", digest)
+    except Exception as e:
+        logger.warning("Failed to register content %s: %s", digest, e)
+
+
+def source_batches(digest: str, source_type: str, produce, batch_size: int = EMBED_BATCH_SIZE):
+    # Yields (chunks, embeddings) for the content. A repeat upload of the same bytes, by any
+    # tenant, replays the stored batches instead of extracting and embedding again; a first
+    # upload runs produce() and writes each batch once it has been consumed, so memory stays flat.
+    # The entry is only published when every batch was written.
+    if not registry_enabled():
+        yield from produce()
+        return
+
+    try:
+        entry = lookup(digest)
+    except Exception as e:
+        logger.warning("Content registry lookup failed for %s: %s", digest, e)
+        entry = None
+    if entry is not None:
+        logger.info("Content %s found in registry, copying %s chunks", digest, entry["chunk_count"])
+        yield from _stored_batches(digest, entry, batch_size)
+        return
+
+    count, storing = 0, True
+    for batch_chunks, batch_embeddings in produce():
+        yield batch_chunks, batch_embeddings
+        if storing:
+            storing = _store_batch(digest, source_type, count, batch_chunks, batch_embeddings)
+        count += len(batch_chunks)
+    if storing and count:
+        _finish(digest, count)
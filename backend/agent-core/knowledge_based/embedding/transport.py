@@ -0,0 +1,141 @@
+import base64
+import itertools
+import json
+import logging
+import struct
+
+import msgpack
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+EMBED_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "msgpack": "application/x-msgpack",
+    "raw": "application/octet-stream",
+}
+# Alternative media types clients send for the same formats.
+MEDIA_TYPE_ALIASES = {"application/msgpack": "msgpack", "application/vnd.msgpack": "msgpack"}
+EMBED_DTYPES = {"float32": "<f4", "float16": "<f2"}
+# list: JSON floats; base64: packed little-endian buffer; none: chunks only, nothing is encoded.
+VECTOR_MODES = ("list", "base64", "none")
+
+
+def _accepted_formats(accept: str) -> list:
+    ranked = []
+    for position, media_range in enumerate((accept or "").split(",")):
+        media_type, *params = [part.strip().lower() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        name = MEDIA_TYPE_ALIASES.get(media_type) or next(
+            (name for name, served in EMBED_FORMATS.items() if served == media_type), None
+        )
+        if name and quality > 0:
+            ranked.append((-quality, position, name))
+    return [name for _, _, name in sorted(ranked)]
+
+
+def embedding_options(accept: str = None, format: str = None, dtype: str = "float32", vectors: str = "list") -> dict:
+    # An explicit ?format= wins over the Accept header; anything unrecognised falls back to JSON.
+    if format is not None and format not in EMBED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EMBED_FORMATS)}")
+    if dtype not in EMBED_DTYPES:
+        raise HTTPException(status_code=400, detail=f"dtype must be one of {', '.join(EMBED_DTYPES)}")
+    if vectors not in VECTOR_MODES:
+        raise HTTPException(status_code=400, detail=f"vectors must be one of {', '.join(VECTOR_MODES)}")
+    format = format or next(iter(_accepted_formats(accept)), "json")
+    if format == "raw" and vectors == "none":
+        raise HTTPException(status_code=406, detail="raw format carries vectors; use json or ndjson with vectors=none")
+    return {"format": format, "dtype": dtype, "vectors": vectors}
+
+
+def wants_vectors(options: dict) -> bool:
+    return options["vectors"] != "none"
+
+
+def pack_vectors(embeddings, dtype: str) -> bytes:
+    return np.ascontiguousarray(embeddings, dtype=EMBED_DTYPES[dtype]).tobytes()
+
+
+def _vector_fields(embeddings, options: dict) -> dict:
+    if embeddings is None or not wants_vectors(options):
+        return {}
+    if options["vectors"] == "list" and options["format"] in ("json", "ndjson"):
+        return {"embeddings": embeddings.tolist()}
+    packed = pack_vectors(embeddings, options["dtype"])
+    fields = {"dtype": options["dtype"], "shape": list(embeddings.shape)}
+    if options["format"] == "msgpack":
+        return {**fields, "embeddings": packed}
+    return {**fields, "embeddings": base64.b64encode(packed).decode("ascii")}
+
+
+def _raw_body(body: dict, embeddings, dtype: str) -> bytes:
+    # uint32 LE header length | JSON header (metadata + chunks, space-padded so the vectors
+    # start 8-byte aligned) | little-endian vector buffer, read with np.frombuffer(..., dtype).
+    header = json.dumps({**body, "dtype": dtype, "shape": list(embeddings.shape)}).encode()
+    header += b" " * (-(4 + len(header)) % 8)
+    return struct.pack("<I", len(header)) + header + pack_vectors(embeddings, dtype)
+
+
+def embedding_response(meta: dict, chunks: list, embeddings, options: dict) -> Response:
+    body = {**meta, "chunks": chunks, "total_chunks": len(chunks)}
+    if options["format"] == "raw":
+        return Response(
+            _raw_body(body, embeddings, options["dtype"]),
+            media_type=EMBED_FORMATS["raw"],
+            headers={"X-Embedding-Dtype": options["dtype"], "X-Embedding-Shape": ",".join(map(str, embeddings.shape))},
+        )
+    body.update(_vector_fields(embeddings, options))
+    if options["format"] == "msgpack":
+        return Response(msgpack.packb(body, use_bin_type=True), media_type=EMBED_FORMATS["msgpack"])
+    # JSONResponse serializes directly; returning the dict would walk every float through jsonable_encoder.
+    return JSONResponse(body)
+
+
+def _ndjson_rows(embeddings, options: dict) -> list:
+    if embeddings is None or not wants_vectors(options):
+        return None
+    if options["vectors"] == "list":
+        return embeddings.tolist()
+    packed = np.ascontiguousarray(embeddings, dtype=EMBED_DTYPES[options["dtype"]])
+    return [base64.b64encode(row.tobytes()).decode("ascii") for row in packed]
+
+
+def ndjson_lines(meta: dict, batches, options: dict):
+    # The first batch is produced before the meta line, so input that cannot be processed at all
+    # (e.g. a corrupt PDF) raises before anything has been sent, not as an in-band error.
+    batches = iter(batches)
+    first = next(batches, None)
+    if options["vectors"] == "base64":
+        meta = {**meta, "dtype": options["dtype"]}
+    yield json.dumps({"type": "meta", **meta}) + "\n"
+    index = 0
+    try:
+        for chunks, embeddings in itertools.chain([first] if first is not None else [], batches):
+            rows = _ndjson_rows(embeddings, options)
+            lines = []
+            for offset, chunk in enumerate(chunks):
+                line = {"type": "chunk", "index": index + offset, "text": chunk}
+                if rows is not None:
+                    line["embedding"] = rows[offset]
+                lines.append(json.dumps(line))
+            index += len(chunks)
+            yield "\n".join(lines) + "\n"
+    except Exception as e:
+        # Headers are long gone; report the failure in-band so clients can tell it from a clean end.
+        logger.exception("Embedding stream failed after %s chunks", index)
+        yield json.dumps({"type": "error", "message": str(e), "total_chunks": index}) + "\n"
+        return
+    yield json.dumps({"type": "end", "total_chunks": index}) + "\n"
+
+
+def embedding_stream(lines) -> StreamingResponse:
+    return StreamingResponse(lines, media_type=EMBED_FORMATS["ndjson"])
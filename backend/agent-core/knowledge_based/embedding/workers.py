@@ -0,0 +1,107 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Set in the parent before forking and inherited by every worker (or replaced by `reload` there).
+_model = None
+
+
+def core_slices(workers: int, cores: list = None) -> list:
+    cores = sorted(cores if cores is not None else os.sched_getaffinity(0))
+    if workers >= len(cores):
+        # More workers than cores: one core each, wrapping around so workers share cores.
+        return [[cores[i % len(cores)]] for i in range(workers)]
+    size, extra = divmod(len(cores), workers)
+    slices, start = [], 0
+    for i in range(workers):
+        end = start + size + (i < extra)
+        slices.append(cores[start:end])
+        start = end
+    return slices
+
+
+def _init_worker(counter, slices: list, threads: int, reload):
+    global _model
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    cores = slices[slot % len(slices)]
+    threads = threads or len(cores)
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    if reload is not None:
+        # ONNX Runtime sessions own thread pools that do not survive fork; build one per worker.
+        _model = reload(threads)
+    else:
+        import torch
+        torch.set_num_threads(threads)
+    logger.info("Embedding worker %s (pid %s) pinned to cores %s with %s threads", slot, os.getpid(), cores, threads)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _encode(texts: list, batch_size: int):
+    return _model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+
+class EmbeddingWorkerPool:
+    # Forked encoder processes sharing the parent's weights copy-on-write. The parent must not have
+    # run a forward pass before the fork: torch's OpenMP pool does not survive it.
+    def __init__(self, model, workers: int, threads: int = 0, reload=None, batch_size: int = 64):
+        global _model
+        _model = model
+        slices = core_slices(workers)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.broken = False
+        # One batch in flight per worker; while all are busy the engine keeps filling the next batch.
+        self._slots = threading.BoundedSemaphore(workers)
+        context = multiprocessing.get_context("fork")
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(context.Value("i", 0), slices, threads, reload),
+        )
+        try:
+            # With fork every worker is started on the first submit; waiting on it forks them all
+            # now and surfaces a failing initializer (e.g. the model cannot load) as an exception.
+            self._executor.submit(_ping).result()
+        except BaseException:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        logger.info("Started %s embedding workers on cores %s", workers, slices)
+
+    def submit(self, texts: list, callback):
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_encode, texts, self.batch_size)
+        except Exception as e:
+            self._slots.release()
+            self.broken = isinstance(e, (BrokenProcessPool, RuntimeError))
+            callback(None, e)
+            return
+
+        def done(future):
+            self._slots.release()
+            try:
+                vectors = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # A worker died (OOM kill); the engine replaces the whole pool on the next batch.
+                    self.broken = True
+                callback(None, e)
+                return
+            callback(vectors, None)
+
+        future.add_done_callback(done)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", "2"))
+CPU_EXECUTOR_QUEUE = int(os.getenv("CPU_EXECUTOR_QUEUE", "8"))
+BROWSER_EXECUTOR_WORKERS = int(os.getenv("BROWSER_EXECUTOR_WORKERS", "2"))
+BROWSER_EXECUTOR_QUEUE = int(os.getenv("BROWSER_EXECUTOR_QUEUE", "4"))
+EXECUTOR_RETRY_AFTER_SECONDS = int(os.getenv("EXECUTOR_RETRY_AFTER_SECONDS", "10"))
+
+_DONE = object()
+
+
+class BoundedExecutor:
+    # A thread pool that admits at most max_workers running + max_queue waiting jobs.
+    # Anything beyond that is rejected immediately with 503 + Retry-After instead of piling up.
+    def __init__(self, name: str, max_workers: int, max_queue: int, retry_after: int = EXECUTOR_RETRY_AFTER_SECONDS):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _admit(self):
+        if not self._acquire():
+            logger.warning("%s executor saturated (%s in flight), rejecting request", self.name, self._in_flight)
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} workers are busy, retry later",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+    async def run(self, fn, *args, **kwargs):
+        self._admit()
+        try:
+            future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        # The slot is freed when the work itself finishes (or is cancelled before starting),
+        # not when the awaiting request goes away, so disconnects cannot over-admit.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    async def stream(self, iterator):
+        # For streaming responses: admission (503) is decided and the first item is produced before
+        # the caller starts the response, so rejections and bad input still get a proper status.
+        # The slot is held until the iterator is exhausted or the client goes away; each next()
+        # runs on the pool.
+        self._admit()
+        stream = self._drain(iter(iterator))
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            return _empty()
+        except BaseException:
+            await stream.aclose()
+            raise
+        return _prepend(first, stream)
+
+    async def _drain(self, iterator):
+        future = None
+        try:
+            while True:
+                future = self._executor.submit(next, iterator, _DONE)
+                item = await asyncio.wrap_future(future)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            def finish(_=None):
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+                self._release()
+
+            # A next() still running on the pool keeps the slot until it returns.
+            if future is not None and not future.done():
+                future.add_done_callback(finish)
+            else:
+                finish()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.max_workers),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _empty():
+    return
+    yield
+
+
+async def _prepend(first, stream):
+    try:
+        yield first
+        async for item in stream:
+            yield item
+    finally:
+        await stream.aclose()
+
+
+cpu_executor = BoundedExecutor("cpu", CPU_EXECUTOR_WORKERS, CPU_EXECUTOR_QUEUE)
+browser_executor = BoundedExecutor("browser", BROWSER_EXECUTOR_WORKERS, BROWSER_EXECUTOR_QUEUE)
@@ -0,0 +1,217 @@
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from db.supabase.connectDB import get_db_session, engine
+from db.supabase.crud import (
+    create_ingestion_job,
+    get_ingestion_job,
+    update_ingestion_job,
+    get_claimable_ingestion_job_ids,
+    claim_ingestion_job,
+    renew_ingestion_job_leases,
+)
+from db.qdrant.qdrant_client import upsert_embedding_batches
+from knowledge_based.pdf.embedding.embedding import iter_pdf_batches, pdf_source_id, PDF_PIPELINE_QUEUE_SIZE
+from knowledge_based.pipeline import prefetch
+from knowledge_based.website.sync.sync import sync_website
+
+logger = logging.getLogger(__name__)
+
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+# A running job whose updated_at is older than this is considered orphaned (its process died)
+# and may be claimed again. Live jobs renew it every third of the period.
+INGEST_JOB_LEASE_SECONDS = int(os.getenv("INGEST_JOB_LEASE_SECONDS", "300"))
+
+
+def _lease_expired_before() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=INGEST_JOB_LEASE_SECONDS)
+
+
+def _update(job_id: str, **fields):
+    with get_db_session() as db:
+        update_ingestion_job(db, job_id, **fields)
+
+
+def _run_pdf_job(job):
+    pdf_bytes = job.payload
+    source_id = pdf_source_id(pdf_bytes)
+    _update(job.id, stage="embedding", source_id=source_id)
+
+    def counted(batches):
+        chunks_embedded = 0
+        for chunks, embeddings in batches:
+            chunks_embedded += len(chunks)
+            _update(job.id, chunks_embedded=chunks_embedded)
+            yield chunks, embeddings
+
+    return upsert_embedding_batches(
+        user_id=job.user_id,
+        source_id=source_id,
+        source_title=job.source_title,
+        batches=counted(prefetch(iter_pdf_batches(pdf_bytes), PDF_PIPELINE_QUEUE_SIZE)),
+        source_type="pdf",
+        progress=lambda points: _update(job.id, stage="upserting", points_upserted=points),
+    )
+
+
+def _run_website_job(job):
+    def progress(stage, chunks_embedded, points_upserted):
+        _update(job.id, stage=stage, chunks_embedded=chunks_embedded, points_upserted=points_upserted)
+
+    result = sync_website(job.user_id, job.source_url, progress=progress)
+    if result.get("status") == "success":
+        _update(
+            job.id,
+            source_id=result["source_id"],
+            source_title=result["title"],
+            chunks_embedded=result["chunks_embedded"],
+        )
+    return result
+
+
+# Jobs live in Postgres and every process (uvicorn worker, replica) runs one of these queues.
+# A job id may sit in several in-memory queues; whichever worker claims it first runs it.
+class IngestionJobQueue:
+    def __init__(self, workers: int = INGEST_JOB_WORKERS, lease_seconds: int = INGEST_JOB_LEASE_SECONDS):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self._queue = queue.Queue()
+        self._threads = []
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self._threads or engine is None:
+            return
+        self._stopped.clear()
+        self._requeue(all_queued=True)
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"ingestion-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._renew_leases, name="ingestion-job-leases", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        self._stopped.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        self._threads = []
+
+    def _requeue(self, all_queued: bool = False):
+        # At start-up every queued job is picked up; afterwards only jobs nobody has touched for a
+        # whole lease (their process died before or while running them).
+        stale_before = _lease_expired_before()
+        with get_db_session() as db:
+            pending = get_claimable_ingestion_job_ids(db, stale_before, None if all_queued else stale_before)
+        with self._running_lock:
+            pending = [job_id for job_id in pending if job_id not in self._running]
+        for job_id in pending:
+            self._queue.put(job_id)
+        if pending:
+            logger.info("Re-queued %s unfinished ingestion jobs", len(pending))
+
+    def _renew_leases(self):
+        while not self._stopped.wait(self.lease_seconds / 3):
+            with self._running_lock:
+                running = list(self._running)
+            try:
+                with get_db_session() as db:
+                    renew_ingestion_job_leases(db, running)
+                self._requeue()
+            except Exception:
+                logger.exception("Failed to renew ingestion job leases")
+
+    def submit_pdf(self, user_id: str, source_title: str, pdf_bytes: bytes) -> str:
+        return self._submit(user_id, "pdf", source_title=source_title, payload=pdf_bytes)
+
+    def submit_website(self, user_id: str, url: str) -> str:
+        return self._submit(user_id, "website", source_url=url)
+
+    def _submit(self, user_id: str, source_type: str, **fields) -> str:
+        job_id = str(uuid4())
+        with get_db_session() as db:
+            create_ingestion_job(db, job_id, user_id, source_type, **fields)
+        self._queue.put(job_id)
+        return job_id
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception:
+                logger.exception("Ingestion job %s crashed", job_id)
+
+    def _run(self, job_id: str):
+        with get_db_session() as db:
+            if not claim_ingestion_job(db, job_id, _lease_expired_before()):
+                # Finished, or running in another worker or process.
+                return
+            job = get_ingestion_job(db, job_id)
+            db.expunge(job)
+
+        with self._running_lock:
+            self._running.add(job_id)
+        try:
+            self._execute(job)
+        finally:
+            with self._running_lock:
+                self._running.discard(job_id)
+
+    def _execute(self, job):
+        job_id = job.id
+        logger.info("Running ingestion job %s (%s) for user=%s", job_id, job.source_type, job.user_id)
+        try:
+            if job.source_type == "pdf":
+                result = _run_pdf_job(job)
+            else:
+                result = _run_website_job(job)
+        except Exception as e:
+            logger.exception("Ingestion job %s failed", job_id)
+            _update(job_id, status="failed", stage="failed", error=str(e), payload=None)
+            return
+
+        if result.get("status") == "error":
+            _update(job_id, status="failed", stage="failed", error=result.get("message"), result=result, payload=None)
+            return
+
+        _update(
+            job_id,
+            status="succeeded",
+            stage="completed",
+            points_upserted=result.get("points_upserted", 0),
+            result=result,
+            payload=None,
+        )
+
+
+def serialize_job(job) -> dict:
+    return {
+        "job_id": job.id,
+        "user_id": job.user_id,
+        "source_type": job.source_type,
+        "source_title": job.source_title,
+        "source_url": job.source_url,
+        "source_id": job.source_id,
+        "status": job.status,
+        "stage": job.stage,
+        "chunks_embedded": job.chunks_embedded,
+        "points_upserted": job.points_upserted,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+job_queue = IngestionJobQueue()
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from db.supabase.connectDB import get_db_session, engine
+from db.supabase.crud import get_ingestion_job
+from .jobs import serialize_job
+
+router = APIRouter()
+
+
+def _load_job(job_id: str):
+    with get_db_session() as db:
+        job = get_ingestion_job(db, job_id)
+        return serialize_job(job) if job else None
+
+
+@router.get("/{job_id}")
+async def get_job_status(job_id: str):
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Database not configured: ingestion jobs are unavailable")
+    job = await run_in_threadpool(_load_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
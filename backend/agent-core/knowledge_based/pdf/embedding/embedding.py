@@ -1,42 +1,48 @@
-import io
-from sentence_transformers import SentenceTransformer
-from pypdf import PdfReader
-import hashlib
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import os
+import numpy as np
+from knowledge_based.embedding.chunking import chunk_pages
+from knowledge_based.embedding.engine import encode, EMBED_BATCH_SIZE
+from knowledge_based.embedding.registry import content_hash, source_batches
+from knowledge_based.pipeline import batched, prefetch
+from .extract import iter_pdf_pages
 
+PDF_PIPELINE_QUEUE_SIZE = int(os.getenv("PDF_PIPELINE_QUEUE_SIZE", "4"))
 
-def extract_pdf_text(pdf_bytes: bytes) -> str:
-    stream = io.BytesIO(pdf_bytes)
-    reader = PdfReader(stream)
-    text = ""
 
-    for page_num, page in enumerate(reader.pages):
-        page_text = page.extract_text()
-        if page_text:
-            text += f"\n--- Page {page_num + 1} ---\n"
-            text += page_text
+def iter_chunks(pages):
+    # Pages are chunked as they arrive, so only the current page is held in memory.
+    return (chunk["text"] for chunk in chunk_pages(pages))
 
-    return text
+def iter_pdf_embeddings(pdf_bytes: bytes, batch_size: int = EMBED_BATCH_SIZE):
+    # page -> chunks -> embedding batches; extraction and chunking of later pages
+    # run ahead in a background thread while the current batch is being encoded.
+    chunk_batches = prefetch(batched(iter_chunks(iter_pdf_pages(pdf_bytes)), batch_size), PDF_PIPELINE_QUEUE_SIZE)
+    for chunks in chunk_batches:
+        yield chunks, encode(chunks)
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50):
-    words = text.split()
-    chunks = []
+def pdf_source_id(pdf_bytes: bytes) -> str:
+    return content_hash(pdf_bytes)
 
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i:i + chunk_size])
-        if chunk:
-            chunks.append(chunk)
+def iter_pdf_batches(pdf_bytes: bytes):
+    # Same batches as iter_pdf_embeddings, served from the content registry when these bytes were seen before.
+    return source_batches(pdf_source_id(pdf_bytes), "pdf", lambda: iter_pdf_embeddings(pdf_bytes))
 
-    return chunks
+def iter_pdf_chunk_batches(pdf_bytes: bytes, batch_size: int = EMBED_BATCH_SIZE):
+    # For callers that asked for chunks only: nothing is encoded.
+    return ((chunks, None) for chunks in batched(iter_chunks(iter_pdf_pages(pdf_bytes)), batch_size))
 
-def embed_pdf(pdf_bytes: bytes):
-    text = extract_pdf_text(pdf_bytes)
-    chunks = chunk_text(text)
+def embed_pdf(pdf_bytes: bytes, with_vectors: bool = True):
+    chunks = []
     embeddings = []
-    for chunk in chunks:
-        embedding = model.encode(chunk)
-        embeddings.append(embedding.tolist())
-    pdf_id=hashlib.sha256(pdf_bytes).hexdigest()[:6]
+    batches = iter_pdf_batches(pdf_bytes) if with_vectors else iter_pdf_chunk_batches(pdf_bytes)
+    for batch_chunks, batch_embeddings in batches:
+        chunks.extend(batch_chunks)
+        embeddings.append(batch_embeddings)
+    if with_vectors:
+        embeddings = np.concatenate(embeddings) if embeddings else encode([])
+    else:
+        embeddings = None
+    pdf_id = pdf_source_id(pdf_bytes)
     return {
         "status":"success",
         "message":"PDF embedded successfully",
@@ -0,0 +1,104 @@
+import io
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _format_page(page_num: int, page_text: str) -> str:
+    return f"\n--- Page {page_num + 1} ---\n{page_text}"
+
+
+def extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> list:
+    # Runs inside pool workers, so it re-parses the document and only touches its own pages.
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = []
+    for page_num in range(start, stop):
+        page_text = reader.pages[page_num].extract_text()
+        if page_text:
+            pages.append(_format_page(page_num, page_text))
+    return pages
+
+
+def get_pool(workers: int = PDF_EXTRACT_WORKERS) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn starts each worker from a fresh interpreter that imports only this module and
+            # the parent's main module (main.py skips the app import under __mp_main__), so no
+            # model, engine threads or client channels are inherited or loaded there.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def iter_pdf_pages_serial(reader: PdfReader):
+    for page_num, page in enumerate(reader.pages):
+        page_text = page.extract_text()
+        if page_text:
+            yield _format_page(page_num, page_text)
+
+
+def iter_pdf_pages_parallel(
+    pdf_bytes: bytes,
+    page_count: int,
+    pool: ProcessPoolExecutor,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+    max_in_flight: int = PDF_EXTRACT_WORKERS + 1,
+):
+    # A sliding window of ranges: the next one is submitted as each is consumed, so a slow consumer
+    # holds back extraction and only max_in_flight ranges (and pdf_bytes copies) exist at once.
+    starts = iter(range(0, page_count, pages_per_task))
+    in_flight = deque()
+
+    def submit_next():
+        start = next(starts, None)
+        if start is not None:
+            in_flight.append(pool.submit(extract_page_range, pdf_bytes, start, min(start + pages_per_task, page_count)))
+
+    try:
+        for _ in range(max(1, max_in_flight)):
+            submit_next()
+        # Ranges are consumed in submission order, so pages come back in document order.
+        while in_flight:
+            pages = in_flight.popleft().result()
+            submit_next()
+            yield from pages
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def iter_pdf_pages(pdf_bytes: bytes, parallel: bool = None):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    page_count = len(reader.pages)
+
+    if parallel is None:
+        parallel = PDF_EXTRACT_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+
+    if not parallel:
+        yield from iter_pdf_pages_serial(reader)
+        return
+
+    yield from iter_pdf_pages_parallel(pdf_bytes, page_count, get_pool())
+
+
+def extract_pdf_text(pdf_bytes: bytes, parallel: bool = None) -> str:
+    return "".join(iter_pdf_pages(pdf_bytes, parallel))
@@ -1,27 +1,50 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from ..embedding.embedding import embed_pdf
-from db.qdrant.qdrant_client import upsert_embedding
+from typing import Optional
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from ..embedding.embedding import (
+    embed_pdf, iter_pdf_batches, iter_pdf_chunk_batches, pdf_source_id, PDF_PIPELINE_QUEUE_SIZE,
+)
+from knowledge_based.embedding.transport import (
+    embedding_options, embedding_response, embedding_stream, ndjson_lines, wants_vectors,
+)
+from db.qdrant.qdrant_client import upsert_embedding_batches
+from knowledge_based.pipeline import prefetch
+from knowledge_based.executors import cpu_executor
+from knowledge_based.jobs.jobs import job_queue
+from db.supabase.connectDB import engine
 
 router = APIRouter()
 
 
 @router.post("/embedding")
-async def pdf_embed(file: UploadFile = File(...)):
+async def pdf_embed(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None),
+    dtype: str = Query("float32"),
+    vectors: str = Query("list"),
+):
     try:
+        options = embedding_options(request.headers.get("accept"), format, dtype, vectors)
         file_name = file.filename
         pdf_bytes = await file.read()
-        embed_result = embed_pdf(pdf_bytes)
+        meta = {"status": "success", "message": "PDF embedded successfully", "file_name": file_name}
+        if options["format"] == "ndjson":
+            # Lines go out batch by batch while later pages are still being extracted and encoded,
+            # on the cpu executor like the buffered path.
+            batches = iter_pdf_batches(pdf_bytes) if wants_vectors(options) else iter_pdf_chunk_batches(pdf_bytes)
+            lines = ndjson_lines({**meta, "pdf_id": pdf_source_id(pdf_bytes)}, batches, options)
+            return embedding_stream(await cpu_executor.stream(lines))
+        embed_result = await cpu_executor.run(embed_pdf, pdf_bytes, wants_vectors(options))
         if embed_result.get("status") == "error":
             return {"status": "error", "message": embed_result["message"]}
-        return {
-            "status": "success",
-            "message": "PDF embedded successfully",
-            "chunks": embed_result["chunks"],
-            "file_name": file_name,
-            "pdf_id": embed_result["pdf_id"],
-            "embeddings": embed_result["embeddings"],
-            "total_chunks": embed_result["total_chunks"],
-        }
+        return embedding_response(
+            {**meta, "pdf_id": embed_result["pdf_id"]}, embed_result["chunks"], embed_result["embeddings"], options
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -30,19 +53,25 @@ async def pdf_embed(file: UploadFile = File(...)):
 async def pdf_embed_upsert(
     file: UploadFile = File(...),
     user_id: str = Form(...),
+    async_mode: bool = Form(False),
 ):
     try:
         pdf_bytes = await file.read()
         source_title = file.filename
-        embed_result = embed_pdf(pdf_bytes)
-        if embed_result.get("status") == "error":
-            raise HTTPException(status_code=400, detail=embed_result.get("message", "Embed failed"))
-        result = upsert_embedding(
+        if async_mode:
+            if engine is None:
+                raise HTTPException(status_code=503, detail="Database not configured: async ingestion is unavailable")
+            job_id = await run_in_threadpool(job_queue.submit_pdf, user_id, source_title, pdf_bytes)
+            return JSONResponse(
+                status_code=202,
+                content={"status": "accepted", "job_id": job_id, "status_url": f"/jobs/{job_id}"},
+            )
+        result = await cpu_executor.run(
+            upsert_embedding_batches,
             user_id=user_id,
-            source_id=embed_result["pdf_id"],
+            source_id=pdf_source_id(pdf_bytes),
             source_title=source_title,
-            chunks=embed_result["chunks"],
-            embeddings=embed_result["embeddings"],
+            batches=prefetch(iter_pdf_batches(pdf_bytes), PDF_PIPELINE_QUEUE_SIZE),
             source_type="pdf",
         )
         if result.get("status") == "error":
@@ -0,0 +1,43 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from .search import search_async, query_cache, SEARCH_TOP_K
+
+router = APIRouter()
+
+
+class SearchRequest(BaseModel):
+    user_id: str
+    query: str
+    top_k: int = SEARCH_TOP_K
+    source_ids: Optional[List[str]] = None
+    source_type: Optional[Literal["pdf", "website"]] = None
+    hnsw_ef: Optional[int] = None
+    score_threshold: Optional[float] = None
+    mode: Literal["auto", "hybrid", "dense", "sparse"] = "auto"
+
+
+@router.post("")
+async def search_user_knowledge(request: SearchRequest):
+    try:
+        return await search_async(
+            user_id=request.user_id,
+            query=request.query,
+            top_k=request.top_k,
+            source_ids=request.source_ids,
+            source_type=request.source_type,
+            hnsw_ef=request.hnsw_ef,
+            score_threshold=request.score_threshold,
+            mode=request.mode,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache")
+async def search_cache_stats():
+    return query_cache.stats()
@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi.concurrency import run_in_threadpool
+
+from db.qdrant.qdrant_client import hybrid_enabled, hybrid_enabled_async, search_points, search_points_async
+from knowledge_based.embedding.engine import engine
+from db.qdrant.sparse import encode_query as encode_sparse_query, is_lexical_query
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "5"))
+SEARCH_MAX_TOP_K = int(os.getenv("SEARCH_MAX_TOP_K", "50"))
+SEARCH_MAX_HNSW_EF = int(os.getenv("SEARCH_MAX_HNSW_EF", "512"))
+SEARCH_MAX_QUERY_CHARS = int(os.getenv("SEARCH_MAX_QUERY_CHARS", "2000"))
+SEARCH_QUERY_CACHE_SIZE = int(os.getenv("SEARCH_QUERY_CACHE_SIZE", "1024"))
+SEARCH_MODES = ("auto", "hybrid", "dense", "sparse")
+
+
+class QueryEmbeddingCache:
+    # Chat traffic repeats the same short questions; a hit skips the forward pass entirely.
+    def __init__(self, max_entries: int = SEARCH_QUERY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str):
+        with self._lock:
+            vector = self._entries.get(query)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(query)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[query] = vector
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+query_cache = QueryEmbeddingCache()
+
+
+def _clean_query(query: str, top_k: int, hnsw_ef: int = None, mode: str = "auto") -> str:
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("query must not be empty")
+    if len(query) > SEARCH_MAX_QUERY_CHARS:
+        raise ValueError(f"query is longer than {SEARCH_MAX_QUERY_CHARS} characters")
+    if not 1 <= top_k <= SEARCH_MAX_TOP_K:
+        raise ValueError(f"top_k must be between 1 and {SEARCH_MAX_TOP_K}")
+    if hnsw_ef is not None and not top_k <= hnsw_ef <= SEARCH_MAX_HNSW_EF:
+        raise ValueError(f"hnsw_ef must be between top_k and {SEARCH_MAX_HNSW_EF}")
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+    return query
+
+
+def _resolve_mode(mode: str, query: str, hybrid: bool) -> str:
+    if not hybrid:
+        if mode == "sparse":
+            raise ValueError("sparse search is not available: the collection has no sparse vector")
+        return "dense"
+    if mode == "auto":
+        # Codes, SKUs and phone numbers are answered from the lexical index alone, skipping the model.
+        return "sparse" if is_lexical_query(query) else "hybrid"
+    return mode
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _result(user_id: str, mode: str, hits, cache_hit: bool, started: float, embedded: float, searched: float) -> dict:
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "mode": mode,
+        "results": [
+            {
+                "text": hit.payload.get("text"),
+                "score": hit.score,
+                "source_id": hit.payload.get("source_id"),
+                "source_type": hit.payload.get("source_type"),
+                "chunk_index": hit.payload.get("chunk_index"),
+                "page_url": hit.payload.get("page_url"),
+            }
+            for hit in hits
+        ],
+        "query_cache_hit": cache_hit,
+        "timings_ms": {
+            "embed": _ms(embedded - started),
+            "search": _ms(searched - embedded),
+            "total": _ms(searched - started),
+        },
+    }
+
+
+def embed_query(query: str):
+    vector = query_cache.get(query)
+    if vector is not None:
+        return vector, True
+    # Priority lane: the query goes into the next batch, ahead of any queued ingestion chunks.
+    vector = engine.encode([query], priority=True)[0]
+    query_cache.put(query, vector)
+    return vector, False
+
+
+def search(user_id: str, query: str, top_k: int = SEARCH_TOP_K, source_ids: list = None, source_type: str = None,
+           hnsw_ef: int = None, score_threshold: float = None, mode: str = "auto") -> dict:
+    started = time.perf_counter()
+    query = _clean_query(query, top_k, hnsw_ef, mode)
+    resolved = _resolve_mode(mode, query, hybrid_enabled())
+    sparse = encode_sparse_query(query) if resolved != "dense" else None
+    if resolved == "sparse":
+        hits = search_points(user_id, None, top_k, source_ids, source_type, sparse=sparse)
+        if hits or mode == "sparse":
+            return _result(user_id, resolved, hits, False, started, started, time.perf_counter())
+        # Nothing matched the identifier lexically; fall back to the semantic ranking.
+        resolved, sparse = "dense", None
+    vector, cache_hit = embed_query(query)
+    embedded = time.perf_counter()
+    hits = search_points(user_id, vector, top_k, source_ids, source_type, hnsw_ef, score_threshold, sparse)
+    return _result(user_id, resolved, hits, cache_hit, started, embedded, time.perf_counter())
+
+
+async def search_async(user_id: str, query: str, top_k: int = SEARCH_TOP_K, source_ids: list = None,
+                       source_type: str = None, hnsw_ef: int = None, score_threshold: float = None,
+                       mode: str = "auto") -> dict:
+    started = time.perf_counter()
+    query = _clean_query(query, top_k, hnsw_ef, mode)
+    resolved = _resolve_mode(mode, query, await hybrid_enabled_async())
+    sparse = encode_sparse_query(query) if resolved != "dense" else None
+    if resolved == "sparse":
+        hits = await search_points_async(user_id, None, top_k, source_ids, source_type, sparse=sparse)
+        if hits or mode == "sparse":
+            return _result(user_id, resolved, hits, False, started, started, time.perf_counter())
+        resolved, sparse = "dense", None
+    vector = query_cache.get(query)
+    cache_hit = vector is not None
+    if not cache_hit:
+        # A worker thread waits on the shared embedding engine so the event loop stays free;
+        # the ingestion executors are bypassed to keep queries out of their queues.
+        vector = await run_in_threadpool(engine.encode, [query], True)
+        vector = vector[0]
+        query_cache.put(query, vector)
+    embedded = time.perf_counter()
+    hits = await search_points_async(user_id, vector, top_k, source_ids, source_type, hnsw_ef, score_threshold, sparse)
+    return _result(user_id, resolved, hits, cache_hit, started, embedded, time.perf_counter())
@@ -0,0 +1,242 @@
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+BROWSER_POOL_WARM = int(os.getenv("BROWSER_POOL_WARM", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+BROWSER_MAX_MEMORY_MB = float(os.getenv("BROWSER_MAX_MEMORY_MB", "1024"))
+BROWSER_LEASE_TIMEOUT = float(os.getenv("BROWSER_LEASE_TIMEOUT", "60"))
+BROWSER_HEALTHCHECK_TIMEOUT = float(os.getenv("BROWSER_HEALTHCHECK_TIMEOUT", "5"))
+BROWSER_PAGE_LOAD_TIMEOUT = float(os.getenv("BROWSER_PAGE_LOAD_TIMEOUT", "30"))
+
+
+class BrowserPoolExhausted(Exception):
+    pass
+
+
+def _call_with_timeout(fn, timeout: float):
+    # Selenium calls against a wedged browser can block forever, so run them on a helper thread.
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"browser call did not finish within {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
+
+
+def _process_tree(root_pid: int) -> list:
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing paren.
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids = [root_pid]
+    for pid in pids:
+        pids.extend(children.get(pid, []))
+    return pids
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class BrowserSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+        process = getattr(getattr(driver, "service", None), "process", None)
+        self.pid = process.pid if process is not None else None
+
+    def memory_mb(self):
+        if self.pid is None or not os.path.isdir("/proc"):
+            return None
+        return sum(_rss_mb(pid) for pid in _process_tree(self.pid))
+
+    def healthy(self) -> bool:
+        try:
+            return _call_with_timeout(lambda: self.driver.execute_script("return 1"), BROWSER_HEALTHCHECK_TIMEOUT) == 1
+        except Exception as e:
+            logger.warning("Browser session failed health check: %s", e)
+            return False
+
+    def reset(self):
+        def clear():
+            # delete_all_cookies() only covers the current page's domain; this clears every domain the
+            # page set cookies for. Drivers without CDP fail here and the pool recycles the session.
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            self.driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            self.driver.get("about:blank")
+
+        _call_with_timeout(clear, BROWSER_HEALTHCHECK_TIMEOUT)
+
+    def kill(self):
+        pids = _process_tree(self.pid) if self.pid is not None and os.path.isdir("/proc") else []
+        try:
+            _call_with_timeout(self.driver.quit, BROWSER_HEALTHCHECK_TIMEOUT)
+            return
+        except Exception as e:
+            logger.warning("driver.quit() failed, killing browser processes: %s", e)
+        for pid in reversed(pids):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+
+class BrowserPool:
+    def __init__(self, factory, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES, max_memory_mb: float = BROWSER_MAX_MEMORY_MB):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _create(self) -> BrowserSession:
+        driver = self.factory()
+        driver.set_page_load_timeout(BROWSER_PAGE_LOAD_TIMEOUT)
+        return BrowserSession(driver)
+
+    def warm(self, count: int = BROWSER_POOL_WARM):
+        for _ in range(min(count, self.size)):
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                session = self._create()
+            except Exception:
+                logger.exception("Failed to pre-warm browser session")
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                return
+            self._release(session)
+        logger.info("Browser pool warmed with %s sessions", len(self._idle))
+
+    def _acquire(self, timeout: float) -> BrowserSession:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._total >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        raise BrowserPoolExhausted(f"No browser session available within {timeout}s")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise BrowserPoolExhausted("Browser pool is closed")
+                session = self._idle.pop() if self._idle else None
+                if session is None:
+                    self._total += 1
+
+            if session is None:
+                try:
+                    return self._create()
+                except Exception:
+                    self._discard(None)
+                    raise
+
+            if session.healthy():
+                return session
+            logger.warning("Replacing unhealthy browser session (pid=%s)", session.pid)
+            self._discard(session)
+
+    def _release(self, session: BrowserSession):
+        with self._cond:
+            if self._closed:
+                closing = True
+            else:
+                closing = False
+                self._idle.append(session)
+                self._cond.notify()
+        if closing:
+            self._discard(session)
+
+    def _discard(self, session):
+        if session is not None:
+            session.kill()
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _should_recycle(self, session: BrowserSession) -> bool:
+        if session.pages >= self.max_pages:
+            return True
+        memory = session.memory_mb()
+        return memory is not None and memory >= self.max_memory_mb
+
+    @contextmanager
+    def lease(self, timeout: float = BROWSER_LEASE_TIMEOUT):
+        session = self._acquire(timeout)
+        try:
+            yield session
+        except Exception:
+            # A failed page load is normal; only a browser that stops answering is thrown away.
+            if session.healthy():
+                self._give_back(session)
+            else:
+                self._discard(session)
+            raise
+        except BaseException:
+            self._discard(session)
+            raise
+        self._give_back(session)
+
+    def _give_back(self, session: BrowserSession):
+        if self._should_recycle(session):
+            logger.info("Recycling browser session after %s pages (pid=%s)", session.pages, session.pid)
+            self._discard(session)
+            return
+
+        try:
+            session.reset()
+        except Exception as e:
+            logger.warning("Failed to reset browser session, discarding it: %s", e)
+            self._discard(session)
+            return
+        self._release(session)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for session in idle:
+            self._discard(session)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"size": self.size, "total": self._total, "idle": len(self._idle)}
@@ -1,7 +1,13 @@
+import logging
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from urllib.parse import urljoin, urlparse
 
+import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -9,6 +15,35 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from .browser_pool import BrowserPool
+
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "3"))
+CRAWL_PER_HOST_CONCURRENCY = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", "4"))
+CRAWL_GLOBAL_CONCURRENCY = int(os.getenv("CRAWL_GLOBAL_CONCURRENCY", "8"))
+# auto: plain HTTP first, browser only for thin pages or hosts known to need JS
+CRAWL_FETCH_MODE = os.getenv("CRAWL_FETCH_MODE", "auto")
+CRAWL_STATIC_MIN_TEXT = int(os.getenv("CRAWL_STATIC_MIN_TEXT", "200"))
+CRAWL_HTTP_TIMEOUT = float(os.getenv("CRAWL_HTTP_TIMEOUT", "10"))
+CRAWL_HTTP_POOL_SIZE = int(os.getenv("CRAWL_HTTP_POOL_SIZE", "16"))
+HTML_PARSER = "lxml"
+
+logger = logging.getLogger(__name__)
+
+_global_semaphore = threading.BoundedSemaphore(CRAWL_GLOBAL_CONCURRENCY)
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+_js_hosts = set()
+_js_hosts_lock = threading.Lock()
+
+http_session = requests.Session()
+http_session.headers.update({
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36 OmniAgent",
+    "Accept": "text/html,application/xhtml+xml",
+})
+_http_adapter = HTTPAdapter(pool_connections=CRAWL_HTTP_POOL_SIZE, pool_maxsize=CRAWL_HTTP_POOL_SIZE)
+http_session.mount("http://", _http_adapter)
+http_session.mount("https://", _http_adapter)
+
 
 def create_driver():
     options = Options()
@@ -25,6 +60,9 @@ def create_driver():
     return webdriver.Chrome(service=service, options=options)
 
 
+browser_pool = BrowserPool(create_driver)
+
+
 def clean_text(soup):
     for tag in soup(["script", "style", "noscript", "header", "footer", "svg"]):
         tag.decompose()
@@ -41,66 +79,244 @@ def should_visit(url):
     return not any(word in url.lower() for word in blacklist)
 
 
-def crawl_website(start_url: str, max_pages: int = 10, max_depth: int = 2):
-    driver = create_driver()
+def get_host_semaphore(host: str) -> threading.BoundedSemaphore:
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(CRAWL_PER_HOST_CONCURRENCY)
+        return _host_semaphores[host]
+
+
+def fetch_page(driver, url: str, base_domain: str):
+    # Page loads are capped per host and across every crawl running in this process.
+    with _global_semaphore, get_host_semaphore(urlparse(url).netloc):
+        driver.get(url)
+
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+
+        soup = BeautifulSoup(driver.page_source, "html.parser")
+        hrefs = [link.get_attribute("href") for link in driver.find_elements(By.TAG_NAME, "a")]
+
+    return build_record(url, base_domain, soup, hrefs)
+
+
+def build_record(url: str, base_domain: str, soup, hrefs):
+    text = clean_text(soup)
+
+    title_tag = soup.find("title")
+    title = title_tag.get_text(strip=True) if title_tag else None
+
+    # Collect internal links
+    links = []
+    for href in hrefs:
+        if not href:
+            continue
+
+        full_url = urljoin(url, href)
+        parsed = urlparse(full_url)
+
+        clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+        if parsed.netloc == base_domain and should_visit(clean_url):
+            links.append(clean_url)
+
+    return {"url": url, "text": text, "title": title}, links
+
+
+class PageGone(Exception):
+    pass
+
+
+def fetch_page_static(url: str, base_domain: str, known: dict = None):
+    headers = {}
+    if known:
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+
+    with _global_semaphore, get_host_semaphore(urlparse(url).netloc):
+        response = http_session.get(url, headers=headers, timeout=CRAWL_HTTP_TIMEOUT)
+
+    if response.status_code == 304 and known:
+        record = {
+            "url": url,
+            "text": None,
+            "title": known.get("title"),
+            "not_modified": True,
+            "etag": response.headers.get("ETag", known.get("etag")),
+            "last_modified": response.headers.get("Last-Modified", known.get("last_modified")),
+        }
+        return record, known.get("links") or []
+    if response.status_code in (404, 410):
+        raise PageGone(f"{url} returned {response.status_code}")
+    response.raise_for_status()
+
+    content_type = response.headers.get("Content-Type", "")
+    if "html" not in content_type:
+        raise ValueError(f"Unsupported content type {content_type!r}")
+
+    soup = BeautifulSoup(response.content, HTML_PARSER)
+    # Links are read before clean_text drops header/footer, matching what the browser sees.
+    hrefs = [link.get("href") for link in soup.find_all("a", href=True)]
+    record, links = build_record(url, base_domain, soup, hrefs)
+    record["etag"] = response.headers.get("ETag")
+    record["last_modified"] = response.headers.get("Last-Modified")
+    return record, links
+
+
+def mark_needs_js(host: str):
+    with _js_hosts_lock:
+        if host not in _js_hosts:
+            logger.info("Learned that %s needs JavaScript rendering; using the browser from now on", host)
+        _js_hosts.add(host)
+
+
+def needs_js(host: str) -> bool:
+    with _js_hosts_lock:
+        return host in _js_hosts
+
+
+def fetch_page_pooled(url: str, base_domain: str):
+    with browser_pool.lease() as session:
+        session.pages += 1
+        return fetch_page(session.driver, url, base_domain)
+
+
+def fetch_page_auto(url: str, base_domain: str, mode: str = CRAWL_FETCH_MODE, known: dict = None):
+    if mode == "browser":
+        return fetch_page_pooled(url, base_domain)
+    if mode == "static":
+        return fetch_page_static(url, base_domain, known)
+
+    host = urlparse(url).netloc
+    if needs_js(host):
+        return fetch_page_pooled(url, base_domain)
+
+    try:
+        record, links = fetch_page_static(url, base_domain, known)
+    except PageGone:
+        raise
+    except Exception as e:
+        logger.info("Static fetch of %s failed (%s), falling back to the browser", url, e)
+        return fetch_page_pooled(url, base_domain)
+
+    if record.get("not_modified") or len(record["text"] or "") >= CRAWL_STATIC_MIN_TEXT:
+        return record, links
+
+    browser_record, browser_links = fetch_page_pooled(url, base_domain)
+    # Only remember the host when rendering actually recovered the content.
+    if len(browser_record["text"] or "") >= CRAWL_STATIC_MIN_TEXT:
+        mark_needs_js(host)
+    return browser_record, browser_links
+
+
+# known_pages (url -> stored etag/last_modified/title/links) turns on conditional requests; unchanged
+# pages come back with not_modified=True and no text. Fetch errors are reported through `failures`.
+def crawl_website(
+    start_url: str,
+    max_pages: int = 10,
+    max_depth: int = 2,
+    concurrency: int = None,
+    mode: str = None,
+    known_pages: dict = None,
+    failures: dict = None,
+):
+    concurrency = CRAWL_CONCURRENCY if concurrency is None else concurrency
+    mode = mode or CRAWL_FETCH_MODE
+    known_pages = known_pages or {}
+    failures = {} if failures is None else failures
+    if concurrency > 1:
+        return crawl_website_concurrent(start_url, max_pages, max_depth, concurrency, mode, known_pages, failures)
 
     base_domain = urlparse(start_url).netloc
     visited = set()
     queue = [(start_url, 0)]
     results = []
 
-    try:
-        while queue and len(visited) < max_pages:
-            url, depth = queue.pop(0)
-
-            if url in visited or depth > max_depth:
-                continue
+    while queue and len(visited) < max_pages:
+        url, depth = queue.pop(0)
 
-            try:
-                driver.get(url)
+        if url in visited or depth > max_depth:
+            continue
 
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
+        try:
+            record, links = fetch_page_auto(url, base_domain, mode, known_pages.get(url))
+            record["links"] = links
+            visited.add(url)
+            results.append(record)
+            failures.pop(url, None)
 
-                visited.add(url)
+            for link in links:
+                if link not in visited:
+                    queue.append((link, depth + 1))
 
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-                text = clean_text(soup)
+        except Exception as e:
+            failures[url] = e
+            logger.warning("Error crawling %s: %s", url, e)
 
-                title_tag = soup.find("title")
-                title = title_tag.get_text(strip=True) if title_tag else None
+    return results
 
-                results.append({
-                    "url": url,
-                    "text": text,
-                    "title": title,
-                })
- 
-                # Collect internal links
-                links = driver.find_elements(By.TAG_NAME, "a")
 
-                for link in links:
-                    href = link.get_attribute("href")
-                    if not href:
-                        continue
+def crawl_website_concurrent(
+    start_url: str,
+    max_pages: int = 10,
+    max_depth: int = 2,
+    concurrency: int = CRAWL_CONCURRENCY,
+    mode: str = CRAWL_FETCH_MODE,
+    known_pages: dict = None,
+    failures: dict = None,
+):
+    known_pages = known_pages or {}
+    failures = {} if failures is None else failures
+    base_domain = urlparse(start_url).netloc
+    visited = set()
+    level = [start_url]
+    depth = 0
+    results = []
 
-                    full_url = urljoin(url, href)
-                    parsed = urlparse(full_url)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawl-fetcher")
+    try:
+        # One depth at a time, like the serial BFS: a page is always reached at its shallowest depth,
+        # so max_depth and the max_pages cutoff pick the same pages whichever fetch finishes first.
+        while level and depth <= max_depth and len(visited) < max_pages:
+            pending = deque(url for url in dict.fromkeys(level) if url not in visited)
+            in_flight = {}
+            fetched = []
+            sequence = 0
+            while pending or in_flight:
+                # Same stop rule as the serial crawl: failed pages do not count towards max_pages.
+                while pending and len(in_flight) < concurrency and len(visited) + len(in_flight) < max_pages:
+                    url = pending.popleft()
+                    future = executor.submit(fetch_page_auto, url, base_domain, mode, known_pages.get(url))
+                    in_flight[future] = (sequence, url)
+                    sequence += 1
 
-                    clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+                if not in_flight:
+                    break
 
-                    if (
-                        parsed.netloc == base_domain and
-                        clean_url not in visited and
-                        should_visit(clean_url)
-                    ):
-                        queue.append((clean_url, depth + 1))
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    order, url = in_flight.pop(future)
+                    try:
+                        record, links = future.result()
+                    except Exception as e:
+                        failures[url] = e
+                        logger.warning("Error crawling %s: %s", url, e)
+                        continue
 
-            except Exception as e:
-                print(f"Error crawling {url}: {e}")
+                    record["links"] = links
+                    visited.add(url)
+                    failures.pop(url, None)
+                    fetched.append((order, record))
 
+            # Keep discovery order so results[0] is still the start page.
+            fetched.sort(key=lambda item: item[0])
+            results.extend(record for _, record in fetched)
+            level = [link for _, record in fetched for link in record["links"] if link not in visited]
+            depth += 1
     finally:
-        driver.quit()
+        executor.shutdown(wait=True, cancel_futures=True)
 
-    return results
\ No newline at end of file
+    return results
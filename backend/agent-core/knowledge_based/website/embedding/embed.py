@@ -1,30 +1,34 @@
-from sentence_transformers import SentenceTransformer
+import hashlib
+from knowledge_based.embedding.chunking import chunk_pages
+from knowledge_based.embedding.engine import encode, EMBED_BATCH_SIZE
+from knowledge_based.pipeline import batched
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50):
-    words = text.split()
-    chunks = []
+def website_source_id(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
 
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i:i + chunk_size])
-        if chunk:
-            chunks.append(chunk)
 
-    return chunks
+def page_chunks(pages):
+    # One page at a time, like sync_website: no chunk straddles two pages.
+    return (chunk["text"] for chunk in chunk_pages(pages))
 
 
-def embed_websiteText(website_data):
+def iter_website_batches(pages, with_vectors: bool = True, batch_size: int = EMBED_BATCH_SIZE):
+    for chunks in batched(page_chunks(pages), batch_size):
+        yield chunks, encode(chunks) if with_vectors else None
 
 
-    if not website_data:
+def embed_websiteText(pages, with_vectors: bool = True):
+
+
+    if not pages:
         return {
             "status": "error",
             "message": "No website data provided"
         }
 
     try:
-        chunks = chunk_text(website_data)
+        chunks = list(page_chunks(pages))
 
         if not chunks:
             return {
@@ -32,10 +36,7 @@ def embed_websiteText(website_data):
                 "message": "No chunks created from website data"
             }
 
-        embeddings = []
-        for chunk in chunks:
-            embedding = model.encode(chunk)
-            embeddings.append(embedding.tolist())
+        embeddings = encode(chunks) if with_vectors else None
 
         return {
             "status": "success",
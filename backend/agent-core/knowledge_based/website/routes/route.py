@@ -1,9 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from ..crawl.crawl import crawl_website
-from ..embedding.embed import embed_websiteText
-from db.qdrant.qdrant_client import upsert_embedding
-import hashlib
+from ..embedding.embed import embed_websiteText, iter_website_batches, website_source_id
+from ..sync.sync import apply_website_changes, crawl_website_changes
+from db.qdrant.qdrant_client import upsert_embedding_async
+from knowledge_based.embedding.transport import (
+    embedding_options, embedding_response, embedding_stream, ndjson_lines, wants_vectors,
+)
+from knowledge_based.executors import cpu_executor, browser_executor
+from knowledge_based.jobs.jobs import job_queue
+from db.supabase.connectDB import engine
 router = APIRouter()
 
 
@@ -14,6 +24,7 @@ class WebsiteEmbedRequest(BaseModel):
 class WebsiteEmbedUpsertRequest(BaseModel):
     url: str
     user_id: str
+    async_mode: bool = False
 
 
 class CrawlRequest(BaseModel):
@@ -21,59 +32,87 @@ class CrawlRequest(BaseModel):
     max_pages: int = 10
 
 @router.post("/embedding")
-async def embed_website(request: WebsiteEmbedRequest):
-    website_text = ""
+async def embed_website(
+    request: WebsiteEmbedRequest,
+    http_request: Request,
+    format: Optional[str] = Query(None),
+    dtype: str = Query("float32"),
+    vectors: str = Query("list"),
+):
+    options = embedding_options(http_request.headers.get("accept"), format, dtype, vectors)
     try:
-        results = crawl_website(request.url)
+        results = await browser_executor.run(crawl_website, request.url)
         title = results[0].get("title") if results else None
-        source_id=hashlib.sha256(request.url.encode()).hexdigest()[:6]
-        for page in results:
-            if page.get("text"):
-                website_text += page["text"] + "\n\n"
+        source_id = website_source_id(request.url)
+        pages = [page["text"] for page in results if page.get("text") and page["text"].strip()]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    if not website_text.strip():
+    if not pages:
         raise HTTPException(status_code=422, detail="No text extracted from the website")
 
+    meta = {"status": "success", "message": "Website embedded successfully", "title": title, "source_id": source_id}
     try:
-        embed_result = embed_websiteText(website_text)
+        if options["format"] == "ndjson":
+            lines = ndjson_lines(meta, iter_website_batches(pages, wants_vectors(options)), options)
+            return embedding_stream(await cpu_executor.stream(lines))
+        embed_result = await cpu_executor.run(embed_websiteText, pages, wants_vectors(options))
         if embed_result.get("status") == "error":
             return {"status": "error", "message": embed_result["message"]}
-        return {
-            "status": "success",
-            "message": "Website embedded successfully",
-            "title": title,
-            "source_id": source_id,
-            "chunks": embed_result["chunks"],
-            "embeddings": embed_result["embeddings"],
-            "total_chunks": embed_result["total_chunks"],
-        }
+        return embedding_response(meta, embed_result["chunks"], embed_result["embeddings"], options)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/embedding/upsert")
 async def embed_website_upsert(request: WebsiteEmbedUpsertRequest):
-    website_text = ""
+    if request.async_mode:
+        if engine is None:
+            raise HTTPException(status_code=503, detail="Database not configured: async ingestion is unavailable")
+        job_id = await run_in_threadpool(job_queue.submit_website, request.user_id, request.url)
+        return JSONResponse(
+            status_code=202,
+            content={"status": "accepted", "job_id": job_id, "status_url": f"/jobs/{job_id}"},
+        )
+
+    if engine is not None:
+        # Page state lives in Postgres, so re-runs only re-embed pages that changed. The crawl holds a
+        # browser slot; chunking, encoding and the Qdrant writes run on the CPU pool like any embed.
+        try:
+            crawl = await browser_executor.run(crawl_website_changes, request.user_id, request.url)
+            if crawl.get("status") == "error":
+                raise HTTPException(status_code=422, detail=crawl.get("message", "Sync failed"))
+            result = await cpu_executor.run(apply_website_changes, request.user_id, request.url, crawl)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        if result.get("status") == "error":
+            raise HTTPException(status_code=422, detail=result.get("message", "Sync failed"))
+        return result
+
     try:
-        results = crawl_website(request.url)
+        results = await browser_executor.run(crawl_website, request.url)
         title = results[0].get("title") if results else None
-        source_id=hashlib.sha256(request.url.encode()).hexdigest()[:6]
-        for page in results:
-            if page.get("text"):
-                website_text += page["text"] + "\n\n"
+        source_id = website_source_id(request.url)
+        pages = [page["text"] for page in results if page.get("text") and page["text"].strip()]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    if not website_text.strip():
+    if not pages:
         raise HTTPException(status_code=422, detail="No text extracted from the website")
 
     try:
-        embed_result = embed_websiteText(website_text)
+        embed_result = await cpu_executor.run(embed_websiteText, pages)
         if embed_result.get("status") == "error":
             raise HTTPException(status_code=400, detail=embed_result.get("message", "Embed failed"))
-        result = upsert_embedding(
+        result = await upsert_embedding_async(
             user_id=request.user_id,
             source_id=source_id,
             source_title=title or request.url,
@@ -93,7 +132,7 @@ async def embed_website_upsert(request: WebsiteEmbedUpsertRequest):
 @router.post("/crawl")
 async def crawl_only(request: CrawlRequest):
     try:
-        results = crawl_website(request.url, max_pages=request.max_pages)
+        results = await browser_executor.run(crawl_website, request.url, max_pages=request.max_pages)
         return {
             "status": "success",
             "pages": len(results),
@@ -102,6 +141,8 @@ async def crawl_only(request: CrawlRequest):
                 for r in results
             ],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Crawl failed: {str(e)}")
 
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+
+from db.supabase.connectDB import get_db_session
+from db.supabase.crud import upsert_user_source, get_source_pages, upsert_source_page, delete_source_pages
+from db.qdrant.qdrant_client import collection_name, delete_page_points, retire_legacy_source, upsert_page_points
+from knowledge_based.embedding.engine import encode
+from ..crawl.crawl import crawl_website, PageGone
+from knowledge_based.embedding.chunking import chunk_text
+from ..embedding.embed import website_source_id
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode()).hexdigest()
+
+
+def _is_gone(url: str, crawled: set, failures: dict, crawl_complete: bool) -> bool:
+    if url in crawled:
+        return False
+    if isinstance(failures.get(url), PageGone):
+        return True
+    # A page that errored for any other reason, or was cut off by max_pages, is kept.
+    return url not in failures and crawl_complete
+
+
+def crawl_website_changes(user_id: str, url: str, max_pages: int = 10, max_depth: int = 2, progress=None):
+    source_id = website_source_id(url)
+
+    with get_db_session() as db:
+        known_pages = {
+            page.url: {
+                "title": page.title,
+                "etag": page.etag,
+                "last_modified": page.last_modified,
+                "content_hash": page.content_hash,
+                "links": page.links or [],
+            }
+            for page in get_source_pages(db, user_id, source_id)
+        }
+
+    if progress is not None:
+        progress("crawling", 0, 0)
+
+    failures = {}
+    results = crawl_website(url, max_pages=max_pages, max_depth=max_depth, known_pages=known_pages, failures=failures)
+    if not results:
+        return {"status": "error", "message": "No text extracted from the website"}
+
+    changed = []
+    unchanged = []
+    for record in results:
+        if record.get("not_modified"):
+            record["content_hash"] = known_pages[record["url"]]["content_hash"]
+            unchanged.append(record)
+            continue
+        record["content_hash"] = content_hash(record.get("text"))
+        known = known_pages.get(record["url"])
+        if known and known["content_hash"] == record["content_hash"]:
+            unchanged.append(record)
+        else:
+            changed.append(record)
+
+    if not unchanged and not any(record.get("text") for record in changed):
+        return {"status": "error", "message": "No text extracted from the website"}
+
+    crawled = {record["url"] for record in results}
+    crawl_complete = len(results) < max_pages
+    removed = [page_url for page_url in known_pages if _is_gone(page_url, crawled, failures, crawl_complete)]
+
+    return {
+        "status": "crawled",
+        "source_id": source_id,
+        "known_pages": known_pages,
+        "results": results,
+        "changed": changed,
+        "unchanged": unchanged,
+        "removed": removed,
+    }
+
+
+def apply_website_changes(user_id: str, url: str, crawl: dict, progress=None):
+    source_id = crawl["source_id"]
+    known_pages = crawl["known_pages"]
+    results = crawl["results"]
+    changed = crawl["changed"]
+    unchanged = crawl["unchanged"]
+    removed = crawl["removed"]
+
+    page_chunks = [(record["url"], chunk_text(record.get("text") or "")) for record in changed]
+    all_chunks = [chunk for _, chunks in page_chunks for chunk in chunks]
+
+    if progress is not None:
+        progress("embedding", 0, 0)
+    vectors = encode(all_chunks)
+
+    pages = []
+    offset = 0
+    for page_url, chunks in page_chunks:
+        pages.append((page_url, chunks, vectors[offset:offset + len(chunks)]))
+        offset += len(chunks)
+
+    if progress is not None:
+        progress("upserting", len(all_chunks), 0)
+
+    # Upsert before deleting: point ids are deterministic, so a sync that dies halfway leaves
+    # the previous content searchable and the retry rewrites the same points.
+    points_upserted, point_ids = upsert_page_points(user_id, source_id, pages)
+    if not known_pages:
+        # First incremental sync: clear points written before per-page tracking existed.
+        delete_page_points(user_id, source_id, keep_ids=point_ids)
+    else:
+        delete_page_points(user_id, source_id, [record["url"] for record in changed], keep_ids=point_ids)
+        delete_page_points(user_id, source_id, removed)
+
+    chunk_counts = {page_url: len(chunks) for page_url, chunks in page_chunks}
+    title = results[0].get("title") or url
+    with get_db_session() as db:
+        supabase_user_source, supabase_is_new = upsert_user_source(db, user_id, source_id, title, "website")
+        supabase_record_id = supabase_user_source.id
+        for record in changed + unchanged:
+            fields = {
+                "title": record.get("title"),
+                "etag": record.get("etag"),
+                "last_modified": record.get("last_modified"),
+                "content_hash": record["content_hash"],
+                "links": record.get("links") or [],
+            }
+            if record["url"] in chunk_counts:
+                fields["chunk_count"] = chunk_counts[record["url"]]
+            upsert_source_page(db, user_id, source_id, record["url"], commit=False, **fields)
+        db.commit()
+        delete_source_pages(db, user_id, source_id, removed)
+    retire_legacy_source(user_id, source_id)
+
+    logger.info(
+        "Synced website %s for user=%s: %s changed, %s unchanged, %s removed, %s points upserted",
+        url, user_id, len(changed), len(unchanged), len(removed), points_upserted,
+    )
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "collection": collection_name,
+        "source_id": source_id,
+        "title": title,
+        "pages_crawled": len(results),
+        "pages_changed": len(changed),
+        "pages_unchanged": len(unchanged),
+        "pages_removed": len(removed),
+        "chunks_embedded": len(all_chunks),
+        "points_upserted": points_upserted,
+        "supabase_status": "created" if supabase_is_new else "updated",
+        "supabase_record_id": supabase_record_id,
+    }
+
+
+def sync_website(user_id: str, url: str, max_pages: int = 10, max_depth: int = 2, progress=None):
+    crawl = crawl_website_changes(user_id, url, max_pages=max_pages, max_depth=max_depth, progress=progress)
+    if crawl["status"] == "error":
+        return crawl
+    return apply_website_changes(user_id, url, crawl, progress=progress)
@@ -1,6 +1,9 @@
 import uvicorn
 
-from app import app
+# Spawned worker processes (PDF extraction) re-import this file as __mp_main__; skipping the app
+# import there keeps them from each loading the whole application, while `uvicorn main:app` works.
+if __name__ != "__mp_main__":
+    from app import app
 
 if __name__ == "__main__":
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0fomniagent.proto\x12\tomniagent\"H\n\x12SaveAccountRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x14\n\x0cphone_number\x18\x02 \x01(\t\x12\x0b\n\x03jid\x18\x03 \x01(\t\"j\n\x13SaveAccountResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cphone_number\x18\x03 \x01(\t\x12\x0b\n\x03jid\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\"C\n\x13UpdateStatusRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0b\n\x03jid\x18\x03 \x01(\t\"k\n\x14UpdateStatusResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cphone_number\x18\x03 \x01(\t\x12\x0b\n\x03jid\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\")\n\x11GetAccountRequest\x12\x14\n\x0cphone_number\x18\x01 \x01(\t\"g\n\x12GetAccountResponse\x12\r\n\x05\x66ound\x18\x01 \x01(\x08\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x14\n\x0cphone_number\x18\x03 \x01(\t\x12\x0b\n\x03jid\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t2\x82\x02\n\x0fWhatsappService\x12L\n\x0bSaveAccount\x12\x1d.omniagent.SaveAccountRequest\x1a\x1e.omniagent.SaveAccountResponse\x12V\n\x13UpdateAccountStatus\x12\x1e.omniagent.UpdateStatusRequest\x1a\x1f.omniagent.UpdateStatusResponse\x12I\n\nGetAccount\x12\x1c.omniagent.GetAccountRequest\x1a\x1d.omniagent.GetAccountResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0fomniagent.proto\x12\tomniagent\"H\n\x12SaveAccountRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x14\n\x0cphone_number\x18\x02 \x01(\t\x12\x0b\n\x03jid\x18\x03 \x01(\t\"j\n\x13SaveAccountResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cphone_number\x18\x03 \x01(\t\x12\x0b\n\x03jid\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\"C\n\x13UpdateStatusRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0b\n\x03jid\x18\x03 \x01(\t\"k\n\x14UpdateStatusResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cphone_number\x18\x03 \x01(\t\x12\x0b\n\x03jid\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\")\n\x11GetAccountRequest\x12\x14\n\x0cphone_number\x18\x01 \x01(\t\"g\n\x12GetAccountResponse\x12\r\n\x05\x66ound\x18\x01 \x01(\x08\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x14\n\x0cphone_number\x18\x03 \x01(\t\x12\x0b\n\x03jid\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\"\x9f\x01\n\rSearchRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05query\x18\x02 \x01(\t\x12\r\n\x05top_k\x18\x03 \x01(\x05\x12\x12\n\nsource_ids\x18\x04 \x03(\t\x12\x13\n\x0bsource_type\x18\x05 \x01(\t\x12\x0f\n\x07hnsw_ef\x18\x06 \x01(\x05\x12\x17\n\x0fscore_threshold\x18\x07 \x01(\x02\x12\x0c\n\x04mode\x18\x08 \x01(\t\"w\n\tSearchHit\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\r\n\x05score\x18\x02 \x01(\x02\x12\x11\n\tsource_id\x18\x03 \x01(\t\x12\x13\n\x0bsource_type\x18\x04 \x01(\t\x12\x13\n\x0b\x63hunk_index\x18\x05 \x01(\x05\x12\x10\n\x08page_url\x18\x06 \x01(\t\"F\n\rSearchTimings\x12\x10\n\x08\x65mbed_ms\x18\x01 \x01(\x01\x12\x11\n\tsearch_ms\x18\x02 \x01(\x01\x12\x10\n\x08total_ms\x18\x03 \x01(\x01\"\xa8\x01\n\x0eSearchResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\"\n\x04hits\x18\x03 \x03(\x0b\x32\x14.omniagent.SearchHit\x12)\n\x07timings\x18\x04 \x01(\x0b\x32\x18.omniagent.SearchTimings\x12\x17\n\x0fquery_cache_hit\x18\x05 \x01(\x08\x12\x0c\n\x04mode\x18\x06 \x01(\t2\x82\x02\n\x0fWhatsappService\x12L\n\x0bSaveAccount\x12\x1d.omniagent.SaveAccountRequest\x1a\x1e.omniagent.SaveAccountResponse\x12V\n\x13UpdateAccountStatus\x12\x1e.omniagent.UpdateStatusRequest\x1a\x1f.omniagent.UpdateStatusResponse\x12I\n\nGetAccount\x12\x1c.omniagent.GetAccountRequest\x1a\x1d.omniagent.GetAccountResponse2Q\n\x10KnowledgeService\x12=\n\x06Search\x12\x18.omniagent.SearchRequest\x1a\x19.omniagent.SearchResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -43,6 +43,16 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GETACCOUNTREQUEST']._serialized_end=431
   _globals['_GETACCOUNTRESPONSE']._serialized_start=433
   _globals['_GETACCOUNTRESPONSE']._serialized_end=536
-  _globals['_WHATSAPPSERVICE']._serialized_start=539
-  _globals['_WHATSAPPSERVICE']._serialized_end=797
+  _globals['_SEARCHREQUEST']._serialized_start=539
+  _globals['_SEARCHREQUEST']._serialized_end=698
+  _globals['_SEARCHHIT']._serialized_start=700
+  _globals['_SEARCHHIT']._serialized_end=819
+  _globals['_SEARCHTIMINGS']._serialized_start=821
+  _globals['_SEARCHTIMINGS']._serialized_end=891
+  _globals['_SEARCHRESPONSE']._serialized_start=894
+  _globals['_SEARCHRESPONSE']._serialized_end=1062
+  _globals['_WHATSAPPSERVICE']._serialized_start=1065
+  _globals['_WHATSAPPSERVICE']._serialized_end=1323
+  _globals['_KNOWLEDGESERVICE']._serialized_start=1325
+  _globals['_KNOWLEDGESERVICE']._serialized_end=1406
 # @@protoc_insertion_point(module_scope)
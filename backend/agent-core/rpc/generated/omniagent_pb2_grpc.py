@@ -181,3 +181,75 @@ class WhatsappService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+
+class KnowledgeServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Search = channel.unary_unary(
+                '/omniagent.KnowledgeService/Search',
+                request_serializer=omniagent__pb2.SearchRequest.SerializeToString,
+                response_deserializer=omniagent__pb2.SearchResponse.FromString,
+                _registered_method=True)
+
+
+class KnowledgeServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def Search(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_KnowledgeServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Search': grpc.unary_unary_rpc_method_handler(
+                    servicer.Search,
+                    request_deserializer=omniagent__pb2.SearchRequest.FromString,
+                    response_serializer=omniagent__pb2.SearchResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'omniagent.KnowledgeService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('omniagent.KnowledgeService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class KnowledgeService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Search(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/omniagent.KnowledgeService/Search',
+            omniagent__pb2.SearchRequest.SerializeToString,
+            omniagent__pb2.SearchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
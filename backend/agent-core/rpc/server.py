@@ -10,6 +10,7 @@ from db.supabase.crud.WhatshappAccount_crud import (
     update_whatshapp_account_by_phone,
     update_whatshapp_account_status_by_jid,
 )
+from knowledge_based.search.search import search, SEARCH_TOP_K
 
 logger = logging.getLogger(__name__)
 
@@ -124,6 +125,56 @@ class WhatsappServicer(omniagent_pb2_grpc.WhatsappServiceServicer):
             return omniagent_pb2.GetAccountResponse(found=False)
 
 
+class KnowledgeServicer(omniagent_pb2_grpc.KnowledgeServiceServicer):
+
+    def Search(self, request: omniagent_pb2.SearchRequest, context):
+        logger.info(f"[Search] user_id={request.user_id} top_k={request.top_k} sources={len(request.source_ids)}")
+        try:
+            result = search(
+                user_id=request.user_id,
+                query=request.query,
+                top_k=request.top_k or SEARCH_TOP_K,
+                source_ids=list(request.source_ids) or None,
+                source_type=request.source_type or None,
+                hnsw_ef=request.hnsw_ef or None,
+                score_threshold=request.score_threshold or None,
+                mode=request.mode or "auto",
+            )
+            timings = result["timings_ms"]
+            return omniagent_pb2.SearchResponse(
+                success=True,
+                message="ok",
+                hits=[
+                    omniagent_pb2.SearchHit(
+                        text=hit["text"] or "",
+                        score=hit["score"],
+                        source_id=hit["source_id"] or "",
+                        source_type=hit["source_type"] or "",
+                        chunk_index=hit["chunk_index"] or 0,
+                        page_url=hit["page_url"] or "",
+                    )
+                    for hit in result["results"]
+                ],
+                timings=omniagent_pb2.SearchTimings(
+                    embed_ms=timings["embed"],
+                    search_ms=timings["search"],
+                    total_ms=timings["total"],
+                ),
+                query_cache_hit=result["query_cache_hit"],
+                mode=result["mode"],
+            )
+
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return omniagent_pb2.SearchResponse(success=False, message=str(e))
+        except Exception as e:
+            logger.error(f"[Search] error: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return omniagent_pb2.SearchResponse(success=False, message=str(e))
+
+
 def serve() -> grpc.Server:
     server = grpc.server(
         futures.ThreadPoolExecutor(max_workers=10),
@@ -133,6 +184,7 @@ def serve() -> grpc.Server:
         ],
     )
     omniagent_pb2_grpc.add_WhatsappServiceServicer_to_server(WhatsappServicer(), server)
+    omniagent_pb2_grpc.add_KnowledgeServiceServicer_to_server(KnowledgeServicer(), server)
     server.add_insecure_port(f"0.0.0.0:{GRPC_PORT}")
     server.start()
     logger.info(f"gRPC server listening on port {GRPC_PORT}")
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import re
+import tempfile
+
+# Point every module-level client at throwaway state before anything from the app is imported.
+_tmp = tempfile.mkdtemp(prefix="agent-core-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["EMBED_CACHE_ENABLED"] = "0"
+os.environ["EMBED_CACHE_PATH"] = os.path.join(_tmp, "embeddings.sqlite3")
+os.environ["EMBED_WORKERS"] = "0"
+os.environ["SOURCE_REGISTRY_ENABLED"] = "0"
+
+import numpy as np
+import pytest
+
+
+class StubTokenizer:
+    # Word-piece-like offsets: words split into 4-character pieces, punctuation on its own.
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False, **kwargs):
+        offsets = []
+        for match in re.finditer(r"\w+|[^\w\s]", text):
+            for start in range(match.start(), match.end(), 4):
+                offsets.append((start, min(start + 4, match.end())))
+        return {"offset_mapping": offsets}
+
+
+class StubModel:
+    # Deterministic stand-in for the SentenceTransformer: unit vectors derived from the text hash.
+    max_seq_length = 256
+    tokenizer = StubTokenizer()
+
+    def __init__(self, dimension: int = 384, delay: float = 0.0):
+        self.dimension = dimension
+        self.delay = delay
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        self.batches.append(list(texts))
+        if self.delay:
+            import time
+            time.sleep(self.delay)
+        vectors = np.stack([embed_text(text, self.dimension) for text in texts])
+        return vectors
+
+
+def embed_text(text: str, dimension: int = 384) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    from knowledge_based.embedding import engine
+
+    model = StubModel()
+    monkeypatch.setattr(engine.models, "_model", model)
+    return model
+
+
+class AsyncShim:
+    # Async facade over the in-memory client, so async code paths see the same points.
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+
+class RecordingClient:
+    # Wraps a QdrantClient and records every call, for settings local mode accepts but ignores.
+    def __init__(self, client):
+        self._client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def call(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return method(*args, **kwargs)
+
+        return call
+
+    def called(self, name) -> list:
+        return [(args, kwargs) for called, args, kwargs in self.calls if called == name]
+
+
+@pytest.fixture
+def database():
+    from db.supabase.connectDB import Base, engine, init_db
+
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    return engine
+
+
+@pytest.fixture
+def qdrant(database, monkeypatch):
+    from qdrant_client import QdrantClient
+    from db.qdrant import qdrant_client, schema
+
+    client = QdrantClient(":memory:")
+    monkeypatch.setattr(qdrant_client, "client", client)
+    monkeypatch.setattr(qdrant_client, "async_client", AsyncShim(client))
+    monkeypatch.setattr(qdrant_client.bulk_writer, "client", client)
+    monkeypatch.setattr(qdrant_client.bulk_writer, "async_client", AsyncShim(client))
+    schema.reset_schema_state()
+    qdrant_client.ensure_collection()
+    yield client
+    schema.reset_schema_state()
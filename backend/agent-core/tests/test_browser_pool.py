@@ -0,0 +1,71 @@
+import pytest
+
+from knowledge_based.website.crawl.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.calls = []
+        self.quit_called = False
+
+    def set_page_load_timeout(self, timeout):
+        pass
+
+    def execute_script(self, script):
+        self.calls.append(("script", script))
+        return 1
+
+    def execute_cdp_cmd(self, command, params):
+        self.calls.append(("cdp", command))
+
+    def get(self, url):
+        self.calls.append(("get", url))
+
+    def quit(self):
+        self.quit_called = True
+
+
+class NoCdpDriver(FakeDriver):
+    execute_cdp_cmd = None
+
+
+def test_reset_clears_cookies_for_every_domain():
+    pool = BrowserPool(FakeDriver, size=1)
+    with pool.lease() as session:
+        driver = session.driver
+
+    assert ("cdp", "Network.clearBrowserCookies") in driver.calls
+    assert driver.calls[-1] == ("get", "about:blank")
+    assert pool.stats() == {"size": 1, "total": 1, "idle": 1}
+
+
+def test_session_that_cannot_be_reset_is_recycled():
+    pool = BrowserPool(NoCdpDriver, size=1)
+    with pool.lease() as session:
+        driver = session.driver
+
+    assert driver.quit_called
+    assert pool.stats() == {"size": 1, "total": 0, "idle": 0}
+    with pool.lease() as session:
+        assert session.driver is not driver
+
+
+def test_sessions_are_recycled_after_max_pages():
+    pool = BrowserPool(FakeDriver, size=1, max_pages=2)
+    with pool.lease() as session:
+        session.pages = 2
+        driver = session.driver
+
+    assert driver.quit_called
+    assert pool.stats()["total"] == 0
+
+
+def test_failed_page_keeps_a_healthy_session():
+    pool = BrowserPool(FakeDriver, size=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease() as session:
+            driver = session.driver
+            raise RuntimeError("page load failed")
+
+    assert not driver.quit_called
+    assert pool.stats()["idle"] == 1
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from qdrant_client.models import PointStruct
+
+from db.qdrant.bulk_writer import BulkWriter
+from tests.conftest import AsyncShim
+
+
+class FakeClient:
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.calls = []
+        self.failures = failures
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, collection_name, points, wait, shard_key_selector=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            failing = self.failures > 0
+            self.failures -= failing
+        try:
+            time.sleep(self.delay)
+            if failing:
+                raise ConnectionError("qdrant unavailable")
+            with self._lock:
+                self.calls.append((len(points), wait))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def points(count: int) -> list:
+    return [PointStruct(id=i, vector=[0.0, 1.0], payload={}) for i in range(count)]
+
+
+def writer(client, **kwargs) -> BulkWriter:
+    return BulkWriter(client, "test", async_client=AsyncShim(client), backoff=0, **kwargs)
+
+
+def test_points_go_out_in_batches_and_only_the_last_one_waits():
+    client = FakeClient()
+    result = writer(client, batch_size=10, concurrency=2).write(points(35))
+
+    assert result == {"points_upserted": 35, "batches": 4, "operation_id": None}
+    assert sorted(size for size, _ in client.calls) == [5, 10, 10, 10]
+    assert client.calls[-1] == (5, True)
+    assert [wait for _, wait in client.calls[:-1]] == [False] * 3
+
+
+def test_concurrency_is_bounded():
+    client = FakeClient(delay=0.02)
+    writer(client, batch_size=1, concurrency=3).write(points(20))
+
+    assert 1 < client.max_active <= 3
+
+
+def test_failed_batches_are_retried():
+    client = FakeClient(failures=2)
+    result = writer(client, batch_size=10, retries=3).write(points(30))
+
+    assert result["points_upserted"] == 30
+    assert sum(size for size, _ in client.calls) == 30
+
+
+def test_write_fails_once_retries_run_out():
+    client = FakeClient(failures=100)
+    with pytest.raises(ConnectionError):
+        writer(client, batch_size=10, retries=1).write(points(50))
+    assert client.active == 0
+
+
+def test_progress_reports_running_totals():
+    totals = []
+    writer(FakeClient(), batch_size=10, concurrency=1).write(points(25), progress=totals.append)
+
+    assert totals == [10, 20, 25]
+
+
+def test_async_write_matches_sync():
+    client = FakeClient()
+    result = asyncio.run(writer(client, batch_size=10, concurrency=2).write_async(points(35)))
+
+    assert result == {"points_upserted": 35, "batches": 4, "operation_id": None}
+    assert client.calls[-1] == (5, True)
+
+
+def test_async_write_fails_once_retries_run_out():
+    client = FakeClient(failures=100)
+    with pytest.raises(ConnectionError):
+        asyncio.run(writer(client, batch_size=10, retries=1).write_async(points(50)))
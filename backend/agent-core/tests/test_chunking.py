@@ -0,0 +1,50 @@
+import re
+
+from knowledge_based.embedding.chunking import chunk_page, chunk_pages, count_tokens
+from knowledge_based.website.embedding.embed import embed_websiteText, iter_website_batches
+
+SENTENCES = [f"Sentence number {i} talks about topic {i % 7} in some detail." for i in range(120)]
+
+
+def test_chunks_cover_every_sentence_within_the_token_limit(stub_model):
+    text = " ".join(SENTENCES)
+    chunks = list(chunk_page(text, max_tokens=64, overlap=16))
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk["text"] == text[chunk["start"]:chunk["end"]]
+        assert count_tokens(chunk["text"]) <= 64
+    for sentence in SENTENCES:
+        assert any(sentence in chunk["text"] for chunk in chunks)
+    # Consecutive chunks overlap or are separated by whitespace only.
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert not text[previous["end"]:chunk["start"]].strip()
+
+
+def test_overlong_sentences_are_split_on_token_boundaries(stub_model):
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = list(chunk_page(text, max_tokens=50, overlap=10))
+
+    assert all(chunk["tokens"] <= 50 for chunk in chunks)
+    assert chunks[0]["start"] == 0 and chunks[-1]["end"] == len(text)
+    assert all(re.fullmatch(r"word\d+( word\d+)*", chunk["text"]) for chunk in chunks)
+
+
+def test_chunks_never_cross_pages(stub_model):
+    pages = ["First page. " * 20, "", "Second page. " * 20]
+    chunks = list(chunk_pages(pages, max_tokens=40))
+
+    assert {chunk["page"] for chunk in chunks} == {0, 2}
+    assert not any("First" in chunk["text"] and "Second" in chunk["text"] for chunk in chunks)
+
+
+def test_website_embedding_chunks_each_page_separately(stub_model):
+    pages = ["Alpha page text. " * 3, "Beta page text. " * 3]
+
+    result = embed_websiteText(pages)
+    batches = list(iter_website_batches(pages, batch_size=1))
+
+    assert result["status"] == "success"
+    assert result["chunks"] == [page.strip() for page in pages]
+    assert [chunk for chunks, _ in batches for chunk in chunks] == result["chunks"]
+    assert result["embeddings"].shape == (2, 384)
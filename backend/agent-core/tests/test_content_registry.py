@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from db.supabase.connectDB import get_db_session
+from db.supabase.models.sourceContent import SourceContentChunk
+from knowledge_based.embedding import registry
+from tests.conftest import embed_text
+
+
+@pytest.fixture(autouse=True)
+def enabled(database, stub_model, monkeypatch):
+    monkeypatch.setattr(registry, "SOURCE_REGISTRY_ENABLED", True)
+
+
+def producer(batches: list, calls: list):
+    def produce():
+        calls.append(1)
+        for chunks in batches:
+            yield chunks, np.stack([embed_text(chunk, 8) for chunk in chunks])
+    return produce
+
+
+def stored_rows(digest: str) -> int:
+    with get_db_session() as db:
+        return db.query(SourceContentChunk).filter(SourceContentChunk.content_hash == digest).count()
+
+
+def test_repeat_upload_replays_stored_batches():
+    batches = [["a", "b", "c"], ["d", "e", "f"], ["g"]]
+    calls = []
+    digest = registry.content_hash(b"document")
+
+    first = list(registry.source_batches(digest, "pdf", producer(batches, calls), batch_size=3))
+    second = list(registry.source_batches(digest, "pdf", producer(batches, calls), batch_size=3))
+
+    assert len(calls) == 1
+    assert [chunks for chunks, _ in second] == batches
+    for (_, expected), (_, replayed) in zip(first, second):
+        np.testing.assert_array_equal(expected, replayed)
+
+
+def test_batches_are_written_as_they_stream():
+    digest = registry.content_hash(b"streamed")
+    batches = registry.source_batches(digest, "pdf", producer([["a", "b"], ["c", "d"], ["e"]], []))
+
+    next(batches)
+    next(batches)
+    # The first batch is in the database before the rest of the document has been produced.
+    assert stored_rows(digest) == 2
+    assert registry.lookup(digest) is None
+
+    list(batches)
+    assert stored_rows(digest) == 5
+    assert registry.lookup(digest)["chunk_count"] == 5
+
+
+def test_abandoned_ingest_is_not_published():
+    calls = []
+    digest = registry.content_hash(b"abandoned")
+    batches = registry.source_batches(digest, "pdf", producer([["a"], ["b"]], calls))
+    next(batches)
+    batches.close()
+
+    assert registry.lookup(digest) is None
+    assert len(list(registry.source_batches(digest, "pdf", producer([["a"], ["b"]], calls)))) == 2
+    assert len(calls) == 2
+    assert registry.lookup(digest)["chunk_count"] == 2
+
+
+def test_entries_from_another_model_are_rebuilt(monkeypatch):
+    calls = []
+    digest = registry.content_hash(b"model change")
+    list(registry.source_batches(digest, "pdf", producer([["a"]], calls)))
+
+    monkeypatch.setattr(registry, "MODEL_ID", "another-model")
+    list(registry.source_batches(digest, "pdf", producer([["a"]], calls)))
+
+    assert len(calls) == 2
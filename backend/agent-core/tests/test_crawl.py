@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from benchmarks.site_server import SyntheticSite
+from knowledge_based.website.crawl import crawl
+from knowledge_based.website.crawl.crawl import crawl_website
+
+
+def urls(records):
+    return [record["url"] for record in records]
+
+
+@pytest.mark.parametrize("max_pages,max_depth", [(10, 2), (40, 3), (200, 1), (7, 5)])
+def test_concurrent_crawl_matches_serial_bfs(max_pages, max_depth):
+    with SyntheticSite(pages=60) as site:
+        serial = crawl_website(site.url, max_pages, max_depth, concurrency=1, mode="static")
+        concurrent = crawl_website(site.url, max_pages, max_depth, concurrency=4, mode="static")
+
+    assert urls(concurrent) == urls(serial)
+    assert concurrent[0]["url"] == site.url
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    # start -> a, b; a -> c -> y (fast); b -> y (slow). y is at depth 2 through b, 3 through c.
+    links = {"start": ["a", "b"], "a": ["c"], "b": ["y"], "c": ["y"], "y": ["z"], "z": []}
+    delays = {"b": 0.2}
+    failing = set()
+
+    def fetch_page_auto(url, base_domain, mode, known=None):
+        time.sleep(delays.get(url, 0))
+        if url in failing:
+            raise RuntimeError("boom")
+        return {"url": url, "text": url}, links[url]
+
+    monkeypatch.setattr(crawl, "fetch_page_auto", fetch_page_auto)
+    return failing
+
+
+def test_concurrent_crawl_reaches_pages_at_their_shallowest_depth(graph):
+    serial = crawl_website("start", max_pages=10, max_depth=3, concurrency=1)
+    concurrent = crawl_website("start", max_pages=10, max_depth=3, concurrency=4)
+
+    # Reached through the fast branch first, y would sit at depth 3 and z would be cut off.
+    assert urls(serial) == urls(concurrent) == ["start", "a", "b", "c", "y", "z"]
+
+
+def test_failed_pages_do_not_count_towards_max_pages(graph):
+    graph.add("a")
+    failures = {}
+
+    records = crawl_website("start", max_pages=3, max_depth=3, concurrency=4, failures=failures)
+
+    assert urls(records) == ["start", "b", "y"]
+    assert list(failures) == ["a"]
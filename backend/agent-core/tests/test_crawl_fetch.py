@@ -0,0 +1,88 @@
+from urllib.parse import urlparse
+
+import pytest
+import requests
+
+from benchmarks.site_server import SyntheticSite
+from benchmarks.synthetic import make_text
+from knowledge_based.website.crawl import crawl
+from knowledge_based.website.crawl.crawl import PageGone, fetch_page_auto, fetch_page_static
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    # Stands in for the Chromium pool: "renders" the page by running nothing, just returning its
+    # text as the browser would see it after the page's script ran.
+    calls = []
+
+    def fetch_page_pooled(url, base_domain):
+        calls.append(url)
+        html = requests.get(url).text
+        return {"url": url, "text": make_text(300, seed=1), "title": "rendered"}, [url] if "/page/" in html else []
+
+    monkeypatch.setattr(crawl, "fetch_page_pooled", fetch_page_pooled)
+    monkeypatch.setattr(crawl, "_js_hosts", set())
+    return calls
+
+
+def host(url: str) -> str:
+    return urlparse(url).netloc
+
+
+def test_static_fetch_reads_text_title_links_and_validators():
+    with SyntheticSite(pages=5) as site:
+        record, links = fetch_page_static(site.url, host(site.url))
+
+    assert record["title"] == "Page 0"
+    assert len(record["text"]) > crawl.CRAWL_STATIC_MIN_TEXT
+    assert "site header" not in record["text"]
+    assert record["etag"]
+    assert links and all(link.startswith(f"http://{host(site.url)}/page/") for link in links)
+
+
+def test_static_fetch_revalidates_with_etag():
+    with SyntheticSite(pages=5) as site:
+        record, links = fetch_page_static(site.url, host(site.url))
+        known = {**record, "links": links}
+        again, again_links = fetch_page_static(site.url, host(site.url), known)
+
+    assert again["not_modified"] is True
+    assert again["text"] is None
+    assert again_links == links
+
+
+def test_static_fetch_reports_removed_pages():
+    with SyntheticSite(pages=5) as site:
+        site.removed.add(0)
+        with pytest.raises(PageGone):
+            fetch_page_static(site.url, host(site.url))
+
+
+def test_auto_mode_uses_plain_http_for_server_rendered_pages(browser):
+    with SyntheticSite(pages=5) as site:
+        record, _ = fetch_page_auto(site.url, host(site.url), mode="auto")
+
+    assert record["title"] == "Page 0"
+    assert browser == []
+
+
+def test_auto_mode_falls_back_to_the_browser_and_remembers_js_hosts(browser):
+    with SyntheticSite(pages=5, js_only=True) as site:
+        first, _ = fetch_page_auto(site.url, host(site.url), mode="auto")
+        requests_after_first = site.requests
+        second_url = site.url.replace("/page/0", "/page/1")
+        second, _ = fetch_page_auto(second_url, host(site.url), mode="auto")
+
+    assert first["title"] == second["title"] == "rendered"
+    assert browser == [site.url, second_url]
+    assert crawl.needs_js(host(site.url))
+    # Once the host is known to need JS, its pages skip the static attempt: only the browser fetched.
+    assert site.requests == requests_after_first + 1
+
+
+def test_static_mode_never_uses_the_browser(browser):
+    with SyntheticSite(pages=5, js_only=True) as site:
+        record, _ = fetch_page_auto(site.url, host(site.url), mode="static")
+
+    assert len(record["text"]) < crawl.CRAWL_STATIC_MIN_TEXT
+    assert browser == []
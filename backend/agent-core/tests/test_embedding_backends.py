@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("onnxruntime", reason='needs optimum-onnx (uv pip install "optimum-onnx[onnxruntime]")')
+
+from benchmarks.bench_embedding_backends import encode, make_chunks, parity
+from knowledge_based.embedding.engine import load_model
+
+MIN_COSINE = 0.98
+
+# Downloads the model and its quantized exports on first run.
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(scope="module")
+def backends():
+    try:
+        return load_model("torch"), load_model("onnx")
+    except OSError as e:
+        pytest.skip(f"model files unavailable: {e}")
+
+
+def test_int8_onnx_matches_torch(backends):
+    torch_model, onnx_model = backends
+    texts = make_chunks(128)
+
+    reference = encode(torch_model, texts, 32)
+    candidate = encode(onnx_model, texts, 32)
+    result = parity(reference, candidate, k=10)
+
+    assert candidate.shape == reference.shape == (128, 384)
+    assert result["min"] >= MIN_COSINE
+    assert result["max_abs_norm_diff"] < 1e-3
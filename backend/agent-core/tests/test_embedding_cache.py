@@ -0,0 +1,62 @@
+import numpy as np
+
+from knowledge_based.embedding import engine as engine_module
+from knowledge_based.embedding.cache import EmbeddingCache, cache_key
+from knowledge_based.embedding.engine import EmbeddingEngine
+from tests.conftest import StubModel, embed_text
+
+
+def vectors(texts):
+    return np.stack([embed_text(text) for text in texts])
+
+
+def test_cache_opens_lazily(tmp_path):
+    path = tmp_path / "nested" / "embeddings.sqlite3"
+    cache = EmbeddingCache(str(path), 1 << 20)
+
+    assert not path.exists()
+    assert cache.get_many([cache_key("model", "text")]) == {}
+    assert path.exists()
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), 1 << 20)
+    keys = [cache_key("model", f"text {i}") for i in range(3)]
+    cache.put_many(keys, vectors(["a", "b", "c"]))
+
+    found = cache.get_many(keys + [cache_key("model", "missing")])
+
+    np.testing.assert_allclose(found[keys[1]], embed_text("b"))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 1, 3)
+    assert stats["hit_rate"] == 0.75
+    assert stats["bytes"] == 3 * 384 * 4
+
+
+def test_keys_are_per_model():
+    assert cache_key("model-a", "text") != cache_key("model-b", "text")
+
+
+def test_eviction_keeps_the_cache_under_budget(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), 10 * 384 * 4)
+    texts = [f"text {i}" for i in range(20)]
+    for text in texts:
+        cache.put_many([cache_key("model", text)], vectors([text]))
+
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    # Least recently used entries go first.
+    assert cache.get_many([cache_key("model", texts[0])]) == {}
+    assert cache.get_many([cache_key("model", texts[-1])])
+
+
+def test_encode_only_embeds_cache_misses(tmp_path, monkeypatch):
+    model = StubModel()
+    monkeypatch.setattr(engine_module, "engine", EmbeddingEngine(lambda: model, max_wait_ms=0))
+    monkeypatch.setattr(engine_module, "cache", EmbeddingCache(str(tmp_path / "cache.sqlite3"), 1 << 20))
+
+    engine_module.encode(["a", "b"])
+    result = engine_module.encode(["b", "c", "c"])
+
+    np.testing.assert_allclose(result, vectors(["b", "c", "c"]))
+    assert [list(batch) for batch in model.batches] == [["a", "b"], ["c"]]
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from knowledge_based.embedding.engine import EmbeddingEngine
+from tests.conftest import StubModel, embed_text
+
+
+def test_encode_returns_vectors_in_request_order():
+    model = StubModel()
+    engine = EmbeddingEngine(lambda: model, batch_size=4, max_wait_ms=0)
+    texts = [f"chunk {i}" for i in range(10)]
+
+    vectors = engine.encode(texts)
+
+    assert vectors.shape == (10, 384)
+    np.testing.assert_allclose(vectors, np.stack([embed_text(text) for text in texts]))
+    assert all(len(batch) <= 4 for batch in model.batches)
+
+
+def test_concurrent_requests_share_a_forward_pass():
+    model = StubModel(delay=0.05)
+    engine = EmbeddingEngine(lambda: model, batch_size=64, max_wait_ms=50)
+    results = {}
+
+    def client(i):
+        results[i] = engine.encode([f"request {i}"])
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(len(batch) for batch in model.batches) == 8
+    assert len(model.batches) < 8
+    for i, vector in results.items():
+        np.testing.assert_allclose(vector[0], embed_text(f"request {i}"))
+
+
+def test_small_request_interleaves_with_a_large_one():
+    model = StubModel(delay=0.02)
+    engine = EmbeddingEngine(lambda: model, batch_size=8, max_wait_ms=0)
+    large = threading.Thread(target=engine.encode, args=([f"large {i}" for i in range(80)],))
+    large.start()
+    while not model.batches:
+        time.sleep(0.001)
+
+    engine.encode(["small"])
+    large.join()
+
+    position = next(i for i, batch in enumerate(model.batches) if "small" in batch)
+    # The small request rides in the next batch or the one after, not after all ten large ones.
+    assert position <= 2
+    assert len(model.batches) >= 10
+
+
+def test_priority_requests_go_first():
+    model = StubModel(delay=0.02)
+    engine = EmbeddingEngine(lambda: model, batch_size=8, max_wait_ms=0)
+    bulk = [threading.Thread(target=engine.encode, args=([f"bulk {n} {i}" for i in range(40)],)) for n in range(3)]
+    for thread in bulk:
+        thread.start()
+    while not model.batches:
+        time.sleep(0.001)
+
+    engine.encode(["query"], priority=True)
+    for thread in bulk:
+        thread.join()
+
+    position = next(i for i, batch in enumerate(model.batches) if "query" in batch)
+    assert position <= 1
+    assert model.batches[position][0] == "query"
+
+
+def test_failed_batch_fails_only_its_requests():
+    class FlakyModel(StubModel):
+        def encode(self, texts, **kwargs):
+            if any("bad" in text for text in texts):
+                raise RuntimeError("boom")
+            return super().encode(texts, **kwargs)
+
+    model = FlakyModel()
+    engine = EmbeddingEngine(lambda: model, batch_size=4, max_wait_ms=0)
+
+    with pytest.raises(RuntimeError):
+        engine.encode(["ok", "bad", "ok", "ok", "more", "more"])
+    assert engine.encode(["fine"]).shape == (1, 384)
+
+
+def test_empty_request():
+    engine = EmbeddingEngine(lambda: StubModel(), batch_size=4)
+    assert engine.encode([]).shape == (0, 384)
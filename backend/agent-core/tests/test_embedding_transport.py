@@ -0,0 +1,77 @@
+import json
+import struct
+
+import msgpack
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.synthetic import make_pdf
+from knowledge_based.executors import cpu_executor
+from knowledge_based.pdf.router.router import router as pdf_router
+
+
+@pytest.fixture
+def client(stub_model):
+    app = FastAPI()
+    app.include_router(pdf_router, prefix="/pdf")
+    with TestClient(app) as client:
+        yield client
+
+
+def post_pdf(client, pdf: bytes, **kwargs):
+    return client.post("/pdf/embedding", files={"file": ("doc.pdf", pdf)}, **kwargs)
+
+
+def test_formats_carry_the_same_vectors(client):
+    pdf = make_pdf(3)
+    reference = post_pdf(client, pdf).json()
+    vectors = np.array(reference["embeddings"], dtype=np.float32)
+
+    packed = msgpack.unpackb(post_pdf(client, pdf, headers={"Accept": "application/msgpack"}).content)
+    raw = post_pdf(client, pdf, params={"format": "raw", "dtype": "float16"}).content
+    header_length = struct.unpack("<I", raw[:4])[0]
+    header = json.loads(raw[4:4 + header_length])
+
+    assert packed["chunks"] == reference["chunks"]
+    np.testing.assert_array_equal(np.frombuffer(packed["embeddings"], "<f4").reshape(packed["shape"]), vectors)
+    assert (4 + header_length) % 8 == 0
+    raw_vectors = np.frombuffer(raw[4 + header_length:], "<f2").reshape(header["shape"])
+    np.testing.assert_allclose(raw_vectors, vectors, atol=1e-3)
+
+
+def test_ndjson_streams_every_chunk(client):
+    pdf = make_pdf(3)
+    reference = post_pdf(client, pdf).json()
+
+    response = post_pdf(client, pdf, params={"format": "ndjson", "vectors": "base64"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert lines[0]["type"] == "meta" and lines[-1] == {"type": "end", "total_chunks": len(reference["chunks"])}
+    assert [line["text"] for line in lines[1:-1]] == reference["chunks"]
+    assert cpu_executor.stats()["in_flight"] == 0
+
+
+def test_ndjson_rejects_corrupt_input_before_streaming(client):
+    response = post_pdf(client, b"%PDF-1.4 not really a pdf", params={"format": "ndjson"})
+
+    assert response.status_code == 500
+    assert "meta" not in response.text
+    assert cpu_executor.stats()["in_flight"] == 0
+
+
+def test_ndjson_is_subject_to_executor_backpressure(client, monkeypatch):
+    monkeypatch.setattr(cpu_executor, "_in_flight", cpu_executor.max_workers + cpu_executor.max_queue)
+
+    response = post_pdf(client, make_pdf(1), params={"format": "ndjson"})
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+@pytest.mark.parametrize("params,status", [({"format": "xml"}, 400), ({"dtype": "int8"}, 400),
+                                           ({"format": "raw", "vectors": "none"}, 406)])
+def test_invalid_options(client, params, status):
+    assert post_pdf(client, make_pdf(1), params=params).status_code == status
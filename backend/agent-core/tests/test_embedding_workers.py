@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from knowledge_based.embedding import engine as engine_module
+from knowledge_based.embedding.engine import EmbeddingEngine
+from knowledge_based.embedding.workers import core_slices
+from tests.conftest import StubModel, embed_text
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="worker processes are forked")
+
+
+def test_core_slices_cover_every_core_once():
+    assert core_slices(2, [0, 1, 2, 3]) == [[0, 1], [2, 3]]
+    assert core_slices(3, [0, 1, 2, 3]) == [[0, 1], [2], [3]]
+    assert core_slices(3, [0]) == [[0], [0], [0]]
+
+
+def test_workers_encode_with_the_parents_model():
+    model = StubModel()
+    engine = EmbeddingEngine(lambda: model, batch_size=4, max_wait_ms=0, workers=2,
+                             reload_in_worker=lambda threads: model)
+    try:
+        assert engine.start_workers()
+        texts = [f"chunk {i}" for i in range(10)]
+        vectors = engine.encode(texts)
+    finally:
+        engine.shutdown_workers()
+
+    np.testing.assert_allclose(vectors, np.stack([embed_text(text) for text in texts]))
+    # The forward passes ran in the children.
+    assert model.batches == []
+
+
+def test_failing_worker_start_falls_back_to_in_process():
+    def reload(threads):
+        raise RuntimeError("model cannot load")
+
+    model = StubModel()
+    engine = EmbeddingEngine(lambda: model, batch_size=4, max_wait_ms=0, workers=2, reload_in_worker=reload)
+
+    assert engine.start_workers() is False
+    assert engine.encode(["a", "b"]).shape == (2, 384)
+    assert engine.workers == 0
+    assert model.batches == [["a", "b"]]
+
+
+def test_repeatedly_crashing_workers_fall_back_to_in_process():
+    parent = os.getpid()
+
+    class CrashingModel(StubModel):
+        def encode(self, texts, **kwargs):
+            if os.getpid() != parent:
+                os._exit(1)
+            return super().encode(texts, **kwargs)
+
+    model = CrashingModel()
+    engine = EmbeddingEngine(lambda: model, batch_size=4, max_wait_ms=0, workers=1,
+                             reload_in_worker=lambda threads: model)
+    failures = 0
+    try:
+        for _ in range(engine_module.EMBED_WORKER_MAX_RESTARTS + 1):
+            try:
+                engine.encode(["x"])
+            except Exception:
+                failures += 1
+        vectors = engine.encode(["y"])
+    finally:
+        engine.shutdown_workers()
+
+    assert failures == engine_module.EMBED_WORKER_MAX_RESTARTS
+    assert engine.workers == 0
+    np.testing.assert_allclose(vectors[0], embed_text("y"))
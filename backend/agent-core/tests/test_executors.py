@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from knowledge_based.executors import BoundedExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1, retry_after=7)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_returns_results_and_errors(executor):
+    async def main():
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(lambda: 1 / 0)
+
+    asyncio.run(main())
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_saturated_executor_rejects_with_retry_after(executor):
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert executor.stats() == {"max_workers": 1, "max_queue": 1, "in_flight": 2, "queued": 1}
+
+        with pytest.raises(HTTPException) as rejected:
+            await executor.run(time.sleep, 0)
+        assert rejected.value.status_code == 503
+        assert rejected.value.headers == {"Retry-After": "7"}
+
+        release.set()
+        await asyncio.gather(*running)
+        assert await executor.run(lambda: "admitted") == "admitted"
+
+    asyncio.run(main())
+
+
+def test_blocking_work_does_not_block_the_event_loop(executor):
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.ensure_future(ticker())
+        await executor.run(time.sleep, 0.2)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 5
+
+
+def test_stream_yields_everything_and_frees_its_slot(executor):
+    async def main():
+        stream = await executor.stream(iter(range(5)))
+        assert executor.stats()["in_flight"] == 1
+        return [item async for item in stream]
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_stream_errors_before_the_first_item_are_raised_up_front(executor):
+    def items():
+        raise ValueError("bad input")
+        yield
+
+    async def main():
+        with pytest.raises(ValueError):
+            await executor.stream(items())
+
+    asyncio.run(main())
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_abandoned_stream_closes_its_iterator(executor):
+    closed = threading.Event()
+
+    def items():
+        try:
+            yield from range(100)
+        finally:
+            closed.set()
+
+    async def main():
+        stream = await executor.stream(items())
+        async for item in stream:
+            if item == 2:
+                break
+        await stream.aclose()
+
+    asyncio.run(main())
+    assert closed.wait(1)
+    assert executor.stats()["in_flight"] == 0
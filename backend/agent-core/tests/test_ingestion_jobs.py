@@ -0,0 +1,91 @@
+import threading
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import make_pdf
+from db.supabase.connectDB import get_db_session
+from db.supabase.models.ingestionJob import IngestionJob
+from db.supabase.crud import (
+    claim_ingestion_job,
+    create_ingestion_job,
+    get_ingestion_job,
+    update_ingestion_job,
+)
+from knowledge_based.jobs import jobs
+from knowledge_based.jobs.jobs import IngestionJobQueue, _lease_expired_before
+
+
+def new_job(job_id: str, status: str = "queued", age_seconds: int = 0):
+    with get_db_session() as db:
+        create_ingestion_job(db, job_id, "u1", "pdf", source_title="doc.pdf", payload=make_pdf(2))
+        update_ingestion_job(db, job_id, status=status)
+        if age_seconds:
+            db.query(IngestionJob).filter(IngestionJob.id == job_id).update(
+                {"updated_at": datetime.utcnow() - timedelta(seconds=age_seconds)}
+            )
+            db.commit()
+
+
+def status(job_id: str) -> str:
+    with get_db_session() as db:
+        return get_ingestion_job(db, job_id).status
+
+
+def test_claim_is_exclusive(database):
+    new_job("j1")
+    with get_db_session() as db:
+        assert claim_ingestion_job(db, "j1", _lease_expired_before()) is True
+        assert claim_ingestion_job(db, "j1", _lease_expired_before()) is False
+
+
+def test_only_stale_running_jobs_are_reclaimed(database):
+    new_job("fresh", status="running")
+    new_job("stale", status="running", age_seconds=jobs.INGEST_JOB_LEASE_SECONDS + 60)
+    new_job("done", status="succeeded", age_seconds=jobs.INGEST_JOB_LEASE_SECONDS + 60)
+    with get_db_session() as db:
+        assert claim_ingestion_job(db, "fresh", _lease_expired_before()) is False
+        assert claim_ingestion_job(db, "stale", _lease_expired_before()) is True
+        assert claim_ingestion_job(db, "done", _lease_expired_before()) is False
+
+
+def test_job_seen_by_two_processes_runs_once(database, monkeypatch):
+    runs = []
+    started = threading.Barrier(2)
+
+    def fake_pdf_job(job):
+        runs.append(job.id)
+        return {"status": "success", "points_upserted": 3}
+
+    monkeypatch.setattr(jobs, "_run_pdf_job", fake_pdf_job)
+    new_job("j1")
+    queues = [IngestionJobQueue(workers=1), IngestionJobQueue(workers=1)]
+
+    def run(queue):
+        started.wait()
+        queue._run("j1")
+
+    threads = [threading.Thread(target=run, args=(queue,)) for queue in queues]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert runs == ["j1"]
+    assert status("j1") == "succeeded"
+
+
+def test_pdf_job_end_to_end(qdrant, stub_model):
+    queue = IngestionJobQueue(workers=1)
+    queue.start()
+    try:
+        job_id = queue.submit_pdf("u1", "doc.pdf", make_pdf(3))
+        for _ in range(200):
+            if status(job_id) in ("succeeded", "failed"):
+                break
+            threading.Event().wait(0.05)
+    finally:
+        queue.stop()
+
+    with get_db_session() as db:
+        job = get_ingestion_job(db, job_id)
+        assert (job.status, job.stage, job.payload) == ("succeeded", "completed", None)
+        assert job.chunks_embedded == job.points_upserted > 0
@@ -0,0 +1,89 @@
+import asyncio
+import uuid
+
+import numpy as np
+from qdrant_client.models import PointStruct
+
+from benchmarks.site_server import SyntheticSite
+from db.qdrant.qdrant_client import get_source_id_by_title, upsert_embedding, upsert_embedding_async
+from db.supabase.connectDB import get_db_session
+from db.supabase.crud import create_user_source, get_user_sources
+from knowledge_based.pdf.embedding.embedding import pdf_source_id
+from knowledge_based.website.embedding.embed import website_source_id
+from knowledge_based.website.sync.sync import sync_website
+from tests.conftest import embed_text
+
+
+def ingest_legacy(client, user_id, source_id, title, source_type="pdf"):
+    # What the old code left behind: 6-char ids and random point ids.
+    legacy_id = source_id[:6]
+    with get_db_session() as db:
+        create_user_source(db, user_id, legacy_id, title, source_type)
+    client.upsert("OmniAgent", points=[
+        PointStruct(id=str(uuid.uuid4()), vector={"": embed_text(title).tolist()},
+                    payload={"user_id": user_id, "source_id": legacy_id, "text": title})
+    ])
+    return legacy_id
+
+
+def source_ids(client, user_id):
+    points, _ = client.scroll("OmniAgent", limit=1000, with_payload=True)
+    return {point.payload["source_id"] for point in points if point.payload["user_id"] == user_id}
+
+
+def rows(user_id):
+    with get_db_session() as db:
+        return sorted((row.source_id, row.source_title) for row in get_user_sources(db, user_id))
+
+
+def test_reingest_replaces_the_legacy_source(qdrant):
+    source_id = pdf_source_id(b"%PDF report")
+    ingest_legacy(qdrant, "alice", source_id, "report.pdf")
+
+    result = upsert_embedding("alice", source_id, "report.pdf", ["a"], np.stack([embed_text("a")]), "pdf")
+
+    assert result["status"] == "success"
+    assert rows("alice") == [(source_id, "report.pdf")]
+    assert source_ids(qdrant, "alice") == {source_id}
+    assert get_source_id_by_title("alice", "report.pdf") == source_id
+
+
+def test_async_reingest_replaces_the_legacy_source(qdrant):
+    source_id = pdf_source_id(b"%PDF report")
+    ingest_legacy(qdrant, "alice", source_id, "report.pdf")
+
+    asyncio.run(upsert_embedding_async("alice", source_id, "report.pdf", ["a"], np.stack([embed_text("a")]), "pdf"))
+
+    assert rows("alice") == [(source_id, "report.pdf")]
+    assert source_ids(qdrant, "alice") == {source_id}
+
+
+def test_other_users_legacy_sources_are_untouched(qdrant):
+    source_id = pdf_source_id(b"%PDF report")
+    legacy_id = ingest_legacy(qdrant, "bob", source_id, "report.pdf")
+
+    upsert_embedding("alice", source_id, "report.pdf", ["a"], np.stack([embed_text("a")]), "pdf")
+
+    assert rows("bob") == [(legacy_id, "report.pdf")]
+    assert source_ids(qdrant, "bob") == {legacy_id}
+
+
+def test_failed_reingest_keeps_the_legacy_source(qdrant):
+    source_id = pdf_source_id(b"%PDF report")
+    legacy_id = ingest_legacy(qdrant, "alice", source_id, "report.pdf")
+
+    result = upsert_embedding("alice", source_id, "report.pdf", ["a", "b"], np.stack([embed_text("a")]), "pdf")
+
+    assert result["status"] == "error"
+    assert rows("alice") == [(legacy_id, "report.pdf")]
+    assert source_ids(qdrant, "alice") == {legacy_id}
+
+
+def test_website_sync_replaces_the_legacy_source(qdrant, stub_model):
+    with SyntheticSite(pages=3) as site:
+        source_id = website_source_id(site.url)
+        ingest_legacy(qdrant, "alice", source_id, "Page 0", "website")
+        sync_website("alice", site.url, max_pages=10, max_depth=3)
+
+    assert rows("alice") == [(source_id, "Page 0")]
+    assert source_ids(qdrant, "alice") == {source_id}
@@ -0,0 +1,82 @@
+import json
+import threading
+
+import pytest
+
+from knowledge_based.embedding import engine as engine_module
+from knowledge_based.embedding.engine import EmbeddingEngine, ModelRegistry
+from tests.conftest import StubModel
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    loaded = []
+
+    def load_model(backend, threads):
+        loaded.append(backend)
+        return StubModel(delay=0.01)
+
+    monkeypatch.setattr(engine_module, "load_model", load_model)
+    return loaded
+
+
+def test_nothing_is_loaded_until_first_use(loads):
+    registry = ModelRegistry()
+
+    assert loads == []
+    assert registry.status()["loaded"] is False
+    assert registry.ready is False
+
+
+def test_concurrent_callers_share_one_model(loads):
+    registry = ModelRegistry()
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_warm_up_runs_full_batches_then_reports_ready(loads):
+    registry = ModelRegistry()
+    engine = EmbeddingEngine(registry.get, batch_size=8, max_wait_ms=0)
+
+    registry.warm_up(engine, batches=2)
+
+    model = registry.get()
+    assert [len(batch) for batch in model.batches] == [8, 8]
+    assert all(len(text.split()) == model.max_seq_length for batch in model.batches for text in batch)
+    status = registry.status()
+    assert status["ready"] is True and status["loaded"] is True
+    assert status["load_ms"] is not None and status["warmup_ms"] is not None
+
+
+def test_failed_warm_up_stays_unready(monkeypatch):
+    def load_model(backend, threads):
+        raise OSError("model files missing")
+
+    monkeypatch.setattr(engine_module, "load_model", load_model)
+    registry = ModelRegistry()
+
+    registry.warm_up(EmbeddingEngine(registry.get))
+
+    assert registry.ready is False
+    assert registry.status()["error"] == "model files missing"
+
+
+def test_readiness_endpoint_follows_the_registry(loads, monkeypatch):
+    import app
+
+    registry = ModelRegistry()
+    monkeypatch.setattr(app, "embedding_models", registry)
+
+    before = app.readiness()
+    registry.warm_up(EmbeddingEngine(registry.get, batch_size=2, max_wait_ms=0), batches=1)
+    after = app.readiness()
+
+    assert before.status_code == 503 and json.loads(before.body)["ready"] is False
+    assert after.status_code == 200 and json.loads(after.body)["ready"] is True
@@ -0,0 +1,45 @@
+from concurrent.futures import Future
+
+from benchmarks.synthetic import make_pdf
+from knowledge_based.pdf.embedding.extract import extract_pdf_text, iter_pdf_pages, iter_pdf_pages_parallel, shutdown_pool
+
+
+def test_parallel_extraction_matches_serial():
+    pdf = make_pdf(40)
+    try:
+        serial = list(iter_pdf_pages(pdf, parallel=False))
+        parallel = list(iter_pdf_pages(pdf, parallel=True))
+    finally:
+        shutdown_pool()
+
+    assert parallel == serial
+    assert len(serial) == 40
+    assert serial[0].startswith("\n--- Page 1 ---")
+    assert serial[-1].startswith("\n--- Page 40 ---")
+
+
+def test_extract_text_joins_pages_in_order():
+    text = extract_pdf_text(make_pdf(3), parallel=False)
+
+    assert text.index("--- Page 1 ---") < text.index("--- Page 2 ---") < text.index("--- Page 3 ---")
+
+
+def test_parallel_extraction_keeps_a_bounded_window_in_flight():
+    submitted = []
+
+    class RecordingPool:
+        def submit(self, fn, *args):
+            submitted.append(args[1])
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+    pdf = make_pdf(10)
+    pages = iter_pdf_pages_parallel(pdf, 10, RecordingPool(), pages_per_task=2, max_in_flight=2)
+
+    assert next(pages).startswith("\n--- Page 1 ---")
+    # Taking the first range refilled the window: ranges 2 and 4 are in flight, 6 and 8 wait.
+    assert submitted == [0, 2, 4]
+    rest = list(pages)
+    assert len(rest) == 9 and rest[-1].startswith("\n--- Page 10 ---")
+    assert submitted == [0, 2, 4, 6, 8]
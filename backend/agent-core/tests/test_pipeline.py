@@ -0,0 +1,86 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_pdf
+from knowledge_based.embedding.chunking import chunk_page
+from knowledge_based.pdf.embedding.embedding import embed_pdf, iter_pdf_embeddings
+from knowledge_based.pdf.embedding.extract import iter_pdf_pages
+from knowledge_based.pipeline import batched, prefetch
+from tests.conftest import embed_text
+
+
+def test_batched():
+    assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batched([], 3)) == []
+
+
+def test_prefetch_keeps_order_and_re_raises():
+    def items():
+        yield from range(5)
+        raise ValueError("extraction failed")
+
+    seen = []
+    with pytest.raises(ValueError):
+        for item in prefetch(items(), maxsize=2):
+            seen.append(item)
+    assert seen == [0, 1, 2, 3, 4]
+
+
+def test_prefetch_stays_a_bounded_distance_ahead():
+    produced = []
+
+    def items():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    stream = prefetch(items(), maxsize=3)
+    assert next(stream) == 0
+    time.sleep(0.2)
+    # The item being handed over, the full queue and the one blocked in put().
+    assert len(produced) <= 1 + 3 + 1
+    stream.close()
+
+
+def test_prefetch_stops_the_producer_when_the_consumer_stops():
+    finished = threading.Event()
+
+    def items():
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            finished.set()
+
+    for item in prefetch(items(), maxsize=2):
+        if item == 3:
+            break
+    assert finished.wait(2)
+
+
+def test_pdf_pipeline_streams_page_chunks_in_bounded_batches(stub_model):
+    pdf = make_pdf(6)
+    expected = [chunk["text"] for page in iter_pdf_pages(pdf, parallel=False) for chunk in chunk_page(page)]
+
+    batches = list(iter_pdf_embeddings(pdf, batch_size=4))
+
+    assert all(len(chunks) <= 4 for chunks, _ in batches)
+    assert len(batches) > 1
+    assert [chunk for chunks, _ in batches for chunk in chunks] == expected
+    for chunks, vectors in batches:
+        np.testing.assert_allclose(vectors, np.stack([embed_text(chunk) for chunk in chunks]))
+
+
+def test_embed_pdf_collects_the_streamed_batches(stub_model):
+    pdf = make_pdf(3)
+
+    result = embed_pdf(pdf)
+    chunks_only = embed_pdf(pdf, with_vectors=False)
+
+    assert result["status"] == "success"
+    assert result["embeddings"].shape == (result["total_chunks"], 384)
+    assert chunks_only["chunks"] == result["chunks"]
+    assert chunks_only["embeddings"] is None
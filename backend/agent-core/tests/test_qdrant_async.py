@@ -0,0 +1,62 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from db.qdrant import connectDB, qdrant_client
+from db.qdrant.qdrant_client import (
+    check_if_file_exists, check_if_file_exists_async, delete_user_file_async, upsert_embedding, upsert_embedding_async,
+)
+from tests.conftest import RecordingClient, embed_text
+
+
+def embeddings(chunks):
+    return np.stack([embed_text(chunk) for chunk in chunks])
+
+
+@pytest.fixture
+def sync_calls(qdrant, monkeypatch):
+    # Async paths must not fall back to the blocking client.
+    recording = RecordingClient(qdrant)
+    monkeypatch.setattr(qdrant_client, "client", recording)
+    monkeypatch.setattr(qdrant_client.bulk_writer, "client", recording)
+    return recording.calls
+
+
+def test_clients_share_grpc_and_timeout_settings():
+    assert connectDB.client_options["prefer_grpc"] is connectDB.QDRANT_PREFER_GRPC
+    assert connectDB.client_options["timeout"] == connectDB.QDRANT_TIMEOUT
+
+
+def test_async_upsert_matches_sync(qdrant, sync_calls):
+    chunks = ["a", "b", "c"]
+    result = asyncio.run(upsert_embedding_async("alice", "doc", "Doc", chunks, embeddings(chunks), "pdf"))
+    again = asyncio.run(upsert_embedding_async("alice", "doc", "Doc", chunks, embeddings(chunks), "pdf"))
+
+    assert (result["status"], result["points_upserted"]) == ("success", 3)
+    assert (again["points_upserted"], again["points_unchanged"]) == (0, 3)
+    assert qdrant.count("OmniAgent").count == 3
+    assert sync_calls == []
+
+
+def test_async_exists_and_delete(qdrant, sync_calls):
+    upsert_embedding("alice", "doc", "Doc", ["a"], embeddings(["a"]), "pdf")
+    sync_calls.clear()
+
+    async def main():
+        exists = await check_if_file_exists_async("alice", "doc")
+        deleted = await delete_user_file_async("alice", "Doc")
+        return exists, deleted, await check_if_file_exists_async("alice", "doc")
+
+    exists, deleted, exists_after = asyncio.run(main())
+
+    assert sync_calls == []
+    assert exists is True and exists_after is False
+    assert deleted["status"] == "success"
+    assert not check_if_file_exists("alice", "doc")
+
+
+def test_deleting_an_unknown_file(qdrant):
+    result = asyncio.run(delete_user_file_async("alice", "Missing"))
+
+    assert result == {"status": "error", "message": "file not found"}
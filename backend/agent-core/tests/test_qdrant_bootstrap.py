@@ -0,0 +1,66 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from db.qdrant import qdrant_client, schema
+from db.qdrant.qdrant_client import check_if_file_exists, upsert_embedding
+from tests.conftest import RecordingClient, embed_text
+
+PROBES = {"collection_exists", "get_collection", "get_collections", "create_collection", "create_payload_index"}
+
+
+@pytest.fixture
+def recording():
+    schema.reset_schema_state()
+    yield RecordingClient(QdrantClient(":memory:"))
+    schema.reset_schema_state()
+
+
+def test_bootstrap_creates_the_collection_and_every_index(recording):
+    state = schema.ensure_collection(recording, "OmniAgent")
+
+    (_, create), = recording.called("create_collection")
+    assert create["vectors_config"].size == 384
+    assert create["vectors_config"].distance == Distance.COSINE
+    assert create["hnsw_config"].ef_construct == schema.QDRANT_HNSW_EF_CONSTRUCT
+    assert create["optimizers_config"].indexing_threshold == schema.QDRANT_INDEXING_THRESHOLD
+    assert state["created"] is True
+    assert state["payload_indexes"] == sorted(schema.PAYLOAD_INDEXES)
+    assert {args[1] for args, _ in recording.called("create_payload_index")} == set(schema.PAYLOAD_INDEXES)
+
+
+def test_schema_state_is_cached_after_the_first_call(recording):
+    first = schema.ensure_collection(recording, "OmniAgent")
+    calls = len(recording.calls)
+
+    assert schema.ensure_collection(recording, "OmniAgent") is first
+    assert len(recording.calls) == calls
+
+
+def test_existing_collection_is_not_recreated(recording):
+    schema.ensure_collection(recording, "OmniAgent")
+    schema.reset_schema_state()
+    recording.calls.clear()
+
+    state = schema.ensure_collection(recording, "OmniAgent")
+
+    assert state["created"] is False
+    assert not recording.called("create_collection")
+
+
+def test_vector_size_mismatch_fails_loudly(recording):
+    recording.create_collection("OmniAgent", vectors_config=VectorParams(size=768, distance=Distance.COSINE))
+
+    with pytest.raises(ValueError, match="vector size 768"):
+        schema.ensure_collection(recording, "OmniAgent")
+
+
+def test_request_paths_never_probe_the_schema(qdrant, monkeypatch):
+    recording = RecordingClient(qdrant)
+    monkeypatch.setattr(qdrant_client, "client", recording)
+    monkeypatch.setattr(qdrant_client.bulk_writer, "client", recording)
+
+    upsert_embedding("alice", "doc", "Doc", ["a", "b"], [embed_text("a"), embed_text("b")], "pdf")
+    check_if_file_exists("alice", "doc")
+
+    assert not PROBES & {name for name, _, _ in recording.calls}
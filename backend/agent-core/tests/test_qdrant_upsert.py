@@ -0,0 +1,89 @@
+import numpy as np
+
+from db.qdrant import qdrant_client
+from db.qdrant.qdrant_client import point_id, upsert_embedding, upsert_embedding_batches
+from tests.conftest import embed_text
+
+
+def embeddings(chunks):
+    return np.stack([embed_text(chunk) for chunk in chunks])
+
+
+def stored(client, source_id="doc", user_id="alice"):
+    points, _ = client.scroll("OmniAgent", limit=1000, with_payload=True)
+    return sorted(
+        (p.payload["chunk_index"], p.payload["text"]) for p in points
+        if p.payload["source_id"] == source_id and p.payload["user_id"] == user_id
+    )
+
+
+def upsert(chunks, user_id="alice", source_id="doc"):
+    return upsert_embedding(user_id, source_id, "Doc", chunks, embeddings(chunks), "pdf")
+
+
+def test_point_ids_are_deterministic():
+    assert point_id("alice", "doc", 0, "h") == point_id("alice", "doc", 0, "h")
+    assert len({point_id("alice", "doc", 0, "h"), point_id("bob", "doc", 0, "h"),
+                point_id("alice", "doc", 1, "h"), point_id("alice", "doc", 0, "g")}) == 4
+
+
+def test_reingesting_writes_only_changed_chunks(qdrant):
+    first = upsert(["a", "b", "c", "d"])
+    second = upsert(["a", "B", "c", "d"])
+
+    assert (first["points_upserted"], first["points_unchanged"], first["supabase_status"]) == (4, 0, "created")
+    assert (second["points_upserted"], second["points_unchanged"], second["points_deleted"]) == (1, 3, 1)
+    assert second["supabase_status"] == "updated"
+    assert stored(qdrant) == [(0, "a"), (1, "B"), (2, "c"), (3, "d")]
+
+
+def test_identical_reingest_is_a_no_op(qdrant):
+    upsert(["a", "b"])
+    result = upsert(["a", "b"])
+
+    assert (result["points_upserted"], result["points_unchanged"], result["points_deleted"]) == (0, 2, 0)
+
+
+def test_shorter_version_deletes_trailing_chunks(qdrant):
+    upsert(["a", "b", "c", "d"])
+    result = upsert(["a", "b"])
+
+    assert result["points_deleted"] == 2
+    assert stored(qdrant) == [(0, "a"), (1, "b")]
+
+
+def test_sources_and_users_do_not_interfere(qdrant):
+    upsert(["a", "b"])
+    upsert(["x"], source_id="other")
+    upsert(["a"], user_id="bob")
+
+    assert stored(qdrant) == [(0, "a"), (1, "b")]
+    assert stored(qdrant, "other") == [(0, "x")]
+    assert stored(qdrant, user_id="bob") == [(0, "a")]
+    assert qdrant.count("OmniAgent").count == 4
+
+
+def test_retry_after_a_failed_write_only_sends_what_is_missing(qdrant, monkeypatch):
+    chunks = [f"chunk {i}" for i in range(9)]
+    vectors = embeddings(chunks)
+
+    def failing_batches():
+        # The writer holds the latest batch back, so only the first one reaches Qdrant.
+        yield chunks[:3], vectors[:3]
+        yield chunks[3:6], vectors[3:6]
+        raise RuntimeError("encoder crashed")
+
+    monkeypatch.setattr(qdrant_client.bulk_writer, "batch_size", 3)
+    failed = upsert_embedding_batches("alice", "doc", "Doc", failing_batches(), "pdf")
+    retried = upsert_embedding_batches("alice", "doc", "Doc", [(chunks, vectors)], "pdf")
+
+    assert failed["status"] == "error"
+    assert (retried["points_upserted"], retried["points_unchanged"]) == (6, 3)
+    assert stored(qdrant) == list(enumerate(chunks))
+
+
+def test_mismatched_chunks_and_embeddings_are_rejected(qdrant):
+    result = upsert_embedding("alice", "doc", "Doc", ["a", "b"], embeddings(["a"]), "pdf")
+
+    assert result["status"] == "error"
+    assert qdrant.count("OmniAgent").count == 0
@@ -0,0 +1,68 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from db.qdrant.qdrant_client import upsert_embedding_batches
+from knowledge_based.search import search as search_module
+from knowledge_based.search.search import search, search_async
+from tests.conftest import embed_text
+
+
+def ingest(user_id: str, source_id: str, source_type: str, chunks: list):
+    embeddings = np.stack([embed_text(chunk) for chunk in chunks])
+    result = upsert_embedding_batches(user_id, source_id, f"{source_id}.title", [(chunks, embeddings)], source_type)
+    assert result["status"] == "success"
+
+
+@pytest.fixture
+def corpus(qdrant, stub_model, monkeypatch):
+    monkeypatch.setattr(search_module, "query_cache", search_module.QueryEmbeddingCache())
+    ingest("alice", "a-pdf", "pdf", ["refund policy for invoices", "order SKU-4821 shipped late", "office hours"])
+    ingest("alice", "a-site", "website", ["pricing page", "refund policy for invoices"])
+    ingest("bob", "b-pdf", "pdf", ["refund policy for invoices", "bob's private notes"])
+    return qdrant
+
+
+def test_results_are_scoped_to_the_user(corpus):
+    result = search("alice", "refund policy for invoices", top_k=10, mode="dense")
+
+    assert result["status"] == "success"
+    assert {hit["source_id"] for hit in result["results"]} <= {"a-pdf", "a-site"}
+    assert result["results"][0]["text"] == "refund policy for invoices"
+
+
+def test_source_filters(corpus):
+    by_type = search("alice", "refund policy for invoices", top_k=10, source_type="website", mode="dense")
+    by_id = search("alice", "refund policy for invoices", top_k=10, source_ids=["a-pdf"], mode="dense")
+
+    assert {hit["source_type"] for hit in by_type["results"]} == {"website"}
+    assert {hit["source_id"] for hit in by_id["results"]} == {"a-pdf"}
+
+
+def test_identifier_query_is_answered_lexically(corpus):
+    result = search("alice", "SKU-4821", top_k=3)
+
+    assert result["mode"] == "sparse"
+    assert result["results"][0]["text"] == "order SKU-4821 shipped late"
+
+
+def test_repeat_query_hits_the_query_cache(corpus):
+    first = search("alice", "office hours", mode="dense")
+    second = search("alice", "office hours", mode="dense")
+
+    assert first["query_cache_hit"] is False
+    assert second["query_cache_hit"] is True
+
+
+def test_async_search_matches_sync(corpus):
+    sync_result = search("bob", "refund policy for invoices", mode="dense")
+    async_result = asyncio.run(search_async("bob", "refund policy for invoices", mode="dense"))
+
+    assert [hit["text"] for hit in async_result["results"]] == [hit["text"] for hit in sync_result["results"]]
+
+
+@pytest.mark.parametrize("kwargs", [{"query": "  "}, {"top_k": 0}, {"top_k": 10_000}, {"mode": "fuzzy"}])
+def test_invalid_requests_are_rejected(corpus, kwargs):
+    with pytest.raises(ValueError):
+        search("alice", **{"query": "refund", **kwargs})
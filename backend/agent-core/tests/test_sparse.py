@@ -0,0 +1,57 @@
+import numpy as np
+
+from db.qdrant.qdrant_client import upsert_embedding
+from db.qdrant.sparse import encode_document, encode_query, is_lexical_query, tokenize
+from tests.conftest import embed_text
+
+
+def test_identifiers_are_kept_whole_and_split():
+    terms = tokenize("Order SKU-4821 failed with ERR_503")
+
+    assert {"sku-4821", "sku", "4821", "err_503", "503"} <= set(terms)
+    assert "with" not in terms
+
+
+def test_phone_numbers_match_without_separators_or_prefix():
+    terms = set(tokenize("Call +91-98765-43210"))
+
+    assert {"91-98765-43210", "919876543210", "9876543210"} <= terms
+
+
+def test_lexical_queries():
+    assert is_lexical_query("SKU-4821")
+    assert is_lexical_query("what is ERR_503")
+    assert not is_lexical_query("how do refunds work")
+    assert not is_lexical_query("the")
+
+
+def test_document_weights_saturate_with_term_frequency():
+    once = encode_document("invoice")
+    many = encode_document("invoice " * 10)
+
+    assert len(once.indices) == len(many.indices) == 1
+    assert once.values[0] < many.values[0] < 2.2
+
+
+def test_query_vector_is_binary_and_deduplicated():
+    query = encode_query("invoice invoice refund")
+
+    assert len(query.indices) == 2
+    assert query.values == [1.0, 1.0]
+    assert encode_query("the a of").indices == []
+
+
+def test_shared_terms_share_ids():
+    document = encode_document("refund for invoice SKU-4821")
+    query = encode_query("SKU-4821")
+
+    assert set(query.indices) <= set(document.indices)
+
+
+def test_ingestion_stores_a_sparse_vector_next_to_the_dense_one(qdrant):
+    chunk = "Replacement part SKU-4821 ships in two days."
+    upsert_embedding("alice", "doc", "Doc", [chunk], np.stack([embed_text(chunk)]), "pdf")
+
+    (point,), _ = qdrant.scroll("OmniAgent", limit=10, with_vectors=True)
+    assert len(point.vector[""]) == 384
+    assert list(point.vector["bm25"].indices) == encode_document(chunk).indices
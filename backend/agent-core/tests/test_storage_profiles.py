@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import BinaryQuantization, Disabled, ScalarQuantization, ScalarType
+
+from db.qdrant import migrate, schema
+from tests.conftest import RecordingClient
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    schema.reset_schema_state()
+    client = RecordingClient(QdrantClient(":memory:"))
+    monkeypatch.setattr(migrate, "client", client)
+    yield client
+    schema.reset_schema_state()
+
+
+def collection_info(quantization=None, vectors_on_disk=False, payload_on_disk=False):
+    return SimpleNamespace(config=SimpleNamespace(
+        quantization_config=quantization,
+        params=SimpleNamespace(vectors=SimpleNamespace(on_disk=vectors_on_disk), on_disk_payload=payload_on_disk),
+    ))
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError, match="Unknown Qdrant storage profile"):
+        schema.storage_profile("compressed")
+
+
+@pytest.mark.parametrize("name,kind", [("scalar", ScalarQuantization), ("binary", BinaryQuantization)])
+def test_quantized_profiles_create_an_on_disk_collection(recording, monkeypatch, name, kind):
+    monkeypatch.setattr(schema, "QDRANT_STORAGE_PROFILE", name)
+    state = schema.ensure_collection(recording, "OmniAgent")
+
+    (_, create), = recording.called("create_collection")
+    assert isinstance(create["quantization_config"], kind)
+    assert create["vectors_config"].on_disk is True
+    assert create["on_disk_payload"] is True
+    assert state["storage_profile"] == name
+
+
+def test_scalar_profile_is_int8_kept_in_ram():
+    config = schema.quantization_config(schema.storage_profile("scalar"))
+
+    assert config.scalar.type == ScalarType.INT8
+    assert config.scalar.always_ram is True
+    assert schema.quantization_config(schema.storage_profile("memory")) is None
+
+
+def test_quantized_search_rescores_with_oversampling():
+    assert schema.search_params(64, schema.storage_profile("memory")).quantization is None
+    params = schema.search_params(64, schema.storage_profile("scalar"))
+    assert params.hnsw_ef == 64
+    assert (params.quantization.rescore, params.quantization.oversampling) == (True, 2.0)
+
+
+def test_describe_storage():
+    scalar = schema.quantization_config(schema.storage_profile("scalar"))
+    info = collection_info(scalar, vectors_on_disk=True, payload_on_disk=True)
+
+    assert schema.describe_storage(info) == {"quantization": "int8", "vectors_on_disk": True, "payload_on_disk": True}
+    assert schema.storage_matches(info, schema.storage_profile("scalar"))
+    assert not schema.storage_matches(collection_info(), schema.storage_profile("scalar"))
+
+
+def test_migration_converts_in_place(recording):
+    schema.ensure_collection(recording, "OmniAgent")
+
+    dry_run = migrate.migrate_storage("OmniAgent", "scalar", dry_run=True)
+    assert dry_run["status"] == "dry_run" and not recording.called("update_collection")
+
+    result = migrate.migrate_storage("OmniAgent", "scalar")
+    (_, update), = recording.called("update_collection")
+    assert result["changed"] is True
+    assert isinstance(update["quantization_config"], ScalarQuantization)
+    assert update["vectors_config"][""].on_disk is True
+    assert update["collection_params"].on_disk_payload is True
+
+
+def test_migration_back_to_memory_disables_quantization(recording):
+    recording.create_collection("OmniAgent", vectors_config=schema.vectors_config(schema.storage_profile("memory")))
+    schema.apply_storage_profile(recording, "OmniAgent", schema.storage_profile("memory"))
+
+    (_, update), = recording.called("update_collection")
+    assert update["quantization_config"] == Disabled.DISABLED
+
+
+def test_matching_collection_is_left_alone(recording):
+    schema.ensure_collection(recording, "OmniAgent")
+
+    result = migrate.migrate_storage("OmniAgent", "memory")
+
+    assert result["changed"] is False
+    assert not recording.called("update_collection")
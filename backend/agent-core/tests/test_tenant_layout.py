@@ -0,0 +1,88 @@
+import pytest
+from qdrant_client import QdrantClient
+
+from db.qdrant import migrate, qdrant_client, schema
+from db.qdrant.qdrant_client import upsert_embedding
+from tests.conftest import RecordingClient, embed_text
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    schema.reset_schema_state()
+    client = RecordingClient(QdrantClient(":memory:"))
+    monkeypatch.setattr(migrate, "client", client)
+    yield client
+    schema.reset_schema_state()
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(schema, "QDRANT_SHARD_GROUPS", 4)
+    monkeypatch.setattr(schema, "QDRANT_DEDICATED_TENANTS", ["whale"])
+
+
+def test_user_id_is_a_tenant_index(recording):
+    schema.ensure_collection(recording, "OmniAgent")
+
+    indexes = {args[1]: kwargs["field_schema"] for args, kwargs in recording.called("create_payload_index")}
+    assert indexes["user_id"].is_tenant is True
+
+
+def test_tenant_hnsw_builds_per_tenant_graphs():
+    tenant = schema.hnsw_config(tenant=True)
+    shared = schema.hnsw_config(tenant=False)
+
+    assert (tenant.m, tenant.payload_m) == (0, schema.QDRANT_HNSW_PAYLOAD_M)
+    assert (shared.m, shared.payload_m) == (schema.QDRANT_HNSW_M, None)
+
+
+def test_no_shard_keys_without_groups():
+    assert schema.shard_key_for("alice") is None
+    assert schema.all_shard_keys() == []
+
+
+def test_tenants_hash_into_groups_and_heavy_tenants_get_their_own(sharded):
+    keys = {schema.shard_key_for(f"user-{i}") for i in range(100)}
+
+    assert keys == {f"group-{i}" for i in range(4)}
+    assert schema.shard_key_for("user-7") == schema.shard_key_for("user-7")
+    assert schema.shard_key_for("whale") == "tenant-whale"
+    assert schema.all_shard_keys() == ["group-0", "group-1", "group-2", "group-3", "tenant-whale"]
+
+
+def test_writes_are_routed_to_the_tenants_shard(qdrant, sharded, monkeypatch):
+    writes = []
+
+    def write(points, progress=None, shard_key=None):
+        count = len(list(points))
+        writes.append((count, shard_key))
+        return {"points_upserted": count, "batches": 1, "operation_id": None}
+
+    monkeypatch.setattr(qdrant_client, "get_source_point_ids", lambda user_id, source_id: set())
+    monkeypatch.setattr(qdrant_client, "delete_point_ids", lambda user_id, ids: None)
+    monkeypatch.setattr(qdrant_client.bulk_writer, "write", write)
+    upsert_embedding("whale", "doc", "Doc", ["a", "b"], [embed_text("a"), embed_text("b")], "pdf")
+
+    assert writes == [(2, "tenant-whale")]
+
+
+def test_bootstrap_refuses_an_unsharded_collection_when_groups_are_set(recording, sharded):
+    recording.create_collection("OmniAgent", vectors_config=schema.vectors_config())
+
+    with pytest.raises(ValueError, match="not custom-sharded"):
+        schema.ensure_collection(recording, "OmniAgent")
+
+
+def test_in_place_migration_switches_to_the_tenant_layout(recording):
+    recording.create_collection("OmniAgent", vectors_config=schema.vectors_config())
+
+    planned = migrate.migrate_tenants_in_place("OmniAgent", dry_run=True)
+    assert not recording.called("create_payload_index")
+
+    result = migrate.migrate_tenants_in_place("OmniAgent")
+    (args, index), = recording.called("create_payload_index")
+    (_, update), = recording.called("update_collection")
+
+    assert planned["steps"] == result["steps"] == ["tenant_index", "tenant_hnsw"]
+    assert args[1] == "user_id" and index["field_schema"].is_tenant is True
+    assert update["hnsw_config"].m == 0
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.dialects import postgresql
+
+from db.supabase.connectDB import get_db_session, init_db
+from db.supabase.crud import get_user_sources, upsert_user_source
+from db.supabase.crud import userSource_crud
+from db.supabase.models.userModel import UserSource
+
+
+def test_upsert_inserts_then_updates_in_one_write(database):
+    statements = []
+
+    def record(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database, "before_cursor_execute", record)
+    try:
+        with get_db_session() as db:
+            created, created_is_new = upsert_user_source(db, "u1", "s1", "title", "pdf")
+            updated, updated_is_new = upsert_user_source(db, "u1", "s1", "title", "pdf")
+            other, other_is_new = upsert_user_source(db, "u1", "s1", "other title", "pdf")
+    finally:
+        event.remove(database, "before_cursor_execute", record)
+
+    assert (created_is_new, updated_is_new, other_is_new) == (True, False, True)
+    assert created.id == updated.id != other.id
+    assert updated.updated_at > updated.created_at
+    writes = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len(writes) == 3
+    assert all("ON CONFLICT" in statement for statement in writes)
+
+
+def test_conflict_updates_the_source_type(database):
+    with get_db_session() as db:
+        upsert_user_source(db, "u1", "s1", "title", "pdf")
+        source, is_new = upsert_user_source(db, "u1", "s1", "title", "website")
+        assert not is_new
+        assert [row.source_type for row in get_user_sources(db, "u1")] == ["website"]
+    assert source.source_type == "website"
+
+
+def test_is_new_does_not_depend_on_the_clock(database, monkeypatch):
+    frozen = datetime(2024, 1, 1)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return frozen
+
+    monkeypatch.setattr(userSource_crud, "datetime", FrozenDatetime)
+    with get_db_session() as db:
+        _, created_is_new = upsert_user_source(db, "u1", "s1", "title", "pdf")
+        _, updated_is_new = upsert_user_source(db, "u1", "s1", "title", "pdf")
+
+    assert (created_is_new, updated_is_new) == (True, False)
+
+
+def test_postgres_reads_is_new_from_xmax():
+    statement = userSource_crud._upsert_statement("postgresql", "u1", "s1", "title", "pdf", datetime(2024, 1, 1))
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "DO UPDATE SET source_type" in sql
+    assert sql.endswith("xmax = 0")
+
+
+def test_returned_row_is_usable_after_commit(database):
+    with get_db_session() as db:
+        source, _ = upsert_user_source(db, "u1", "s1", "title", "website")
+        assert (source.id, source.source_type) == (1, "website")
+        assert len(get_user_sources(db, "u1")) == 1
+
+
+def test_init_db_removes_duplicates_before_the_unique_index(database):
+    with database.begin() as connection:
+        connection.execute(text("DROP INDEX uq_user_sources_user_source_title"))
+        for source_id in ("s1", "s1", "s2", "s1"):
+            connection.execute(
+                UserSource.__table__.insert().values(
+                    user_id="u1", source_id=source_id, source_title="title", source_type="pdf"
+                )
+            )
+
+    init_db()
+
+    with get_db_session() as db:
+        rows = sorted((row.id, row.source_id) for row in get_user_sources(db, "u1"))
+    assert rows == [(1, "s1"), (3, "s2")]
+    indexes = {index["name"]: index for index in inspect(database).get_indexes("user_sources")}
+    assert indexes["uq_user_sources_user_source_title"]["unique"]
@@ -0,0 +1,97 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.site_server import SyntheticSite, make_page
+from db.supabase.connectDB import get_db_session
+from db.supabase.crud import get_source_pages
+from knowledge_based.website.embedding.embed import website_source_id
+from knowledge_based.website.routes import route
+from knowledge_based.website.sync import sync
+from knowledge_based.website.sync.sync import sync_website
+
+COUNTS = ("pages_crawled", "pages_changed", "pages_unchanged", "pages_removed")
+
+
+def counts(result):
+    return tuple(result[key] for key in COUNTS)
+
+
+def page_urls(client):
+    points, _ = client.scroll("OmniAgent", limit=1000, with_payload=True)
+    return {point.payload["page_url"] for point in points}
+
+
+def test_resync_only_re_embeds_changed_pages(qdrant, stub_model):
+    with SyntheticSite(pages=8) as site:
+        first = sync_website("alice", site.url, max_pages=20, max_depth=5)
+        points = qdrant.count("OmniAgent").count
+        embedded = sum(len(batch) for batch in stub_model.batches)
+
+        second = sync_website("alice", site.url, max_pages=20, max_depth=5)
+
+        assert counts(first) == (8, 8, 0, 0)
+        assert first["points_upserted"] == points == first["chunks_embedded"]
+        assert counts(second) == (8, 0, 8, 0)
+        assert second["chunks_embedded"] == second["points_upserted"] == 0
+        assert sum(len(batch) for batch in stub_model.batches) == embedded
+        assert qdrant.count("OmniAgent").count == points
+
+
+def test_edited_and_removed_pages(qdrant, stub_model):
+    with SyntheticSite(pages=8) as site:
+        sync_website("alice", site.url, max_pages=20, max_depth=5)
+        site.edits[3] = make_page(3, 8).replace(b"<h1>", b"<h1>Edited ")
+        site.removed.add(5)
+
+        result = sync_website("alice", site.url, max_pages=20, max_depth=5)
+        base = site.url.rsplit("/", 1)[0]
+
+    assert counts(result) == (7, 1, 6, 1)
+    assert f"{base}/5" not in page_urls(qdrant)
+    assert f"{base}/3" in page_urls(qdrant)
+    with get_db_session() as db:
+        pages = {page.url: page for page in get_source_pages(db, "alice", website_source_id(site.url))}
+    assert len(pages) == 7 and f"{base}/5" not in pages
+    assert all(page.etag for page in pages.values())
+
+
+def test_pages_cut_off_by_max_pages_are_kept(qdrant, stub_model):
+    with SyntheticSite(pages=8) as site:
+        sync_website("alice", site.url, max_pages=20, max_depth=5)
+        result = sync_website("alice", site.url, max_pages=3, max_depth=5)
+
+    assert result["pages_removed"] == 0
+    assert len(page_urls(qdrant)) == 8
+
+
+def test_sources_are_tracked_per_user(qdrant, stub_model):
+    with SyntheticSite(pages=4) as site:
+        sync_website("alice", site.url, max_pages=20, max_depth=5)
+        result = sync_website("bob", site.url, max_pages=20, max_depth=5)
+
+    assert counts(result) == (4, 4, 0, 0)
+
+
+def test_route_crawls_on_the_browser_pool_and_embeds_on_the_cpu_pool(qdrant, stub_model, monkeypatch):
+    threads = {}
+
+    def record(name, fn):
+        def wrapper(*args, **kwargs):
+            threads[name] = threading.current_thread().name
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(route, "crawl_website_changes", record("crawl", sync.crawl_website_changes))
+    monkeypatch.setattr(route, "apply_website_changes", record("apply", sync.apply_website_changes))
+    app = FastAPI()
+    app.include_router(route.router, prefix="/website")
+
+    with SyntheticSite(pages=4) as site, TestClient(app) as client:
+        response = client.post("/website/embedding/upsert", json={"url": site.url, "user_id": "alice"})
+
+    assert response.status_code == 200
+    assert counts(response.json()) == (4, 4, 0, 0)
+    assert threads["crawl"].startswith("browser-executor")
+    assert threads["apply"].startswith("cpu-executor")